@@ -1,7 +1,6 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query, Header
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 import json
-import io
 from typing import Optional
 from app.batch_analysis.domain.use_cases import BatchAnalysisUseCase
 from app.batch_analysis.domain.services import BatchAnalysisService
@@ -28,7 +27,9 @@ async def start_batch_analysis(
     user_id: str = Form(...),
     batch_test_types: str = Form(...),
     file_name: str = Form(None),
-    use_statistical_test: str = Form("true")
+    use_statistical_test: str = Form("true"),
+    analysis_mode: str = Form("full"),
+    concurrency: Optional[int] = Form(None)
 ):
     """배치 분석 시작 (자동 이어하기 지원)"""
     try:
@@ -48,6 +49,8 @@ async def start_batch_analysis(
                 raise HTTPException(status_code=400, detail="ft_test 또는 chi_square 통계 검정을 사용하려면 raw_data_file이 필요합니다.")
             raw_data_content = await raw_data_file.read()
             raw_data_filename = raw_data_file.filename
+        if analysis_mode not in ("full", "fast"):
+            raise HTTPException(status_code=400, detail="analysis_mode는 full 또는 fast여야 합니다.")
         # 요청 객체 생성
         final_file_name = file_name or file.filename or "unknown_file"
         # --- 자동 이어하기 로직 추가 ---
@@ -66,7 +69,9 @@ async def start_batch_analysis(
             lang=lang,
             user_id=user_id,
             batch_test_types=test_type_map,
-            use_statistical_test=use_statistical_test_bool
+            use_statistical_test=use_statistical_test_bool,
+            analysis_mode=analysis_mode,
+            concurrency=concurrency
         )
         use_case = get_batch_analysis_use_case()
         result = await use_case.start_batch_analysis(request)
@@ -86,6 +91,26 @@ async def get_batch_status(job_id: str = Query(...)):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get("/status/changes")
+async def get_batch_status_changes(
+    job_id: str = Query(...),
+    since: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None)
+):
+    """배치 분석 증분 상태 조회 (질문별 상태 + since 이후 바뀐 결과, 변경이 없으면 304)"""
+    use_case = get_batch_analysis_use_case()
+    result = await use_case.get_batch_status_changes(job_id, since, if_none_match)
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result.get("error"))
+    headers = {"ETag": result["etag"], "Cache-Control": "no-cache"}
+    if result["not_modified"]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(
+        {k: v for k, v in result.items() if k not in ("not_modified", "etag")},
+        headers=headers
+    )
+
+
 @router.post("/cancel")
 async def cancel_batch_analysis(job_id: str):
     """배치 분석 취소"""
@@ -120,24 +145,15 @@ async def get_batch_logs(job_id: str = Query(...)):
 
 
 @router.get("/download")
-async def download_batch_results(job_id: str = Query(...)):
-    """배치 분석 결과 다운로드"""
-    try:
-        use_case = get_batch_analysis_use_case()
-        result = await use_case.download_batch_results(job_id)
-        
-        if not result["success"]:
-            raise HTTPException(status_code=500, detail=result.get("error", "다운로드 실패"))
-        
-        # JSON 파일로 스트리밍 응답
-        json_data = json.dumps(result["data"], ensure_ascii=False, indent=2)
-        buf = io.BytesIO(json_data.encode("utf-8"))
-        
-        return StreamingResponse(
-            buf, 
-            media_type="application/json", 
-            headers={"Content-Disposition": f"attachment; filename=batch_{job_id}_results.json"}
-        )
-        
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+async def download_batch_results(job_id: str = Query(...), format: str = Query("json")):
+    """배치 분석 결과 다운로드 (format: json, ndjson, xlsx / 결과를 page 단위로 읽으며 바로 전송)"""
+    use_case = get_batch_analysis_use_case()
+    result = await use_case.export_batch_results(job_id, format)
+    if not result["success"]:
+        raise HTTPException(status_code=400, detail=result.get("error", "다운로드 실패"))
+    
+    return StreamingResponse(
+        result["stream"],
+        media_type=result["media_type"],
+        headers={"Content-Disposition": f"attachment; filename={result['filename']}"}
+    ) 
\ No newline at end of file
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from typing import Dict
+import asyncio
+from app.batch_analysis.domain.services import BatchAnalysisService
+from app.batch_analysis.infra.batch_analysis_repository import BatchAnalysisRepository
+from app.batch_analysis.infra.progress_hub import get_batch_progress_hub
+
+ws_router = APIRouter()
+
+# job_id별 DB 변경 확인 태스크 (다른 프로세스에서 실행 중인 job을 구독할 때만, 구독자 수와 무관하게 job당 하나)
+batch_progress_watchers: Dict[str, asyncio.Task] = {}
+
+
+def _ensure_watcher(service: BatchAnalysisService, job_id: str) -> None:
+    task = batch_progress_watchers.get(job_id)
+    if task is not None and not task.done():
+        return
+    task = asyncio.create_task(service.watch_batch_progress(job_id))
+    batch_progress_watchers[job_id] = task
+    task.add_done_callback(lambda _: batch_progress_watchers.pop(job_id, None) if batch_progress_watchers.get(job_id) is task else None)
+
+
+@ws_router.websocket("/ws/batch-analysis-progress/{job_id}")
+async def websocket_batch_analysis_progress(websocket: WebSocket, job_id: str):
+    """배치 분석 진행 push (연결 시 snapshot, 이후 question/step/result/job 이벤트)"""
+    await websocket.accept()
+    hub = get_batch_progress_hub()
+    # snapshot을 읽는 사이의 이벤트를 놓치지 않도록 먼저 구독
+    queue = hub.subscribe(job_id)
+    sender = None
+    try:
+        service = BatchAnalysisService(BatchAnalysisRepository(), None)
+        snapshot = await service.get_batch_progress_snapshot(job_id)
+        await websocket.send_json(snapshot)
+        if not snapshot["live"]:
+            if any(row.get("status") in ("pending", "running") for row in snapshot["states"]):
+                _ensure_watcher(service, job_id)
+            elif snapshot["states"]:
+                # 이미 끝난 job은 종료 이벤트까지 바로 보냄
+                cancelled = any(row.get("status") == "cancelled" for row in snapshot["states"])
+                await websocket.send_json({"type": "job", "job_id": job_id, "status": "cancelled" if cancelled else "done"})
+
+        async def send_events():
+            while True:
+                await websocket.send_json(await queue.get())
+
+        sender = asyncio.create_task(send_events())
+        while True:
+            # 클라이언트로부터 ping/pong 등 메시지 수신 대기 (keepalive)
+            await websocket.receive_text()
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        print(f"[WebSocket][batch-analysis] 오류 (job_id: {job_id}): {e}")
+    finally:
+        if sender is not None:
+            sender.cancel()
+        hub.unsubscribe(job_id, queue)
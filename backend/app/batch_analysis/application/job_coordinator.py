@@ -0,0 +1,54 @@
+from typing import Optional
+import asyncio
+import os
+from app.batch_analysis.domain.services import BatchAnalysisService
+
+
+# 큐에 등록된 job의 종료 여부를 확인하는 주기 (초)
+BATCH_COORDINATOR_INTERVAL_S = float(os.getenv("BATCH_COORDINATOR_INTERVAL_S", "15"))
+
+
+class BatchJobCoordinator:
+    """모든 질문이 종료 상태(done/failed/cancelled)가 된 job을 마무리
+
+    보통은 마지막 질문을 끝낸 worker가 마무리하지만, 그 worker가 마무리 전에 죽거나
+    질문이 lease 만료로 failed 처리된 경우에도 job 상태가 남지 않도록 주기적으로 확인.
+    finish_job이 조건부 update라 여러 worker에서 같이 실행해도 한 곳만 마무리.
+    """
+
+    def __init__(self, queue, service: BatchAnalysisService, interval_s: float = BATCH_COORDINATOR_INTERVAL_S):
+        self.queue = queue
+        self.service = service
+        self.interval_s = interval_s
+
+    async def sweep(self) -> int:
+        """종료된 job을 마무리하고 마무리한 job 수 반환"""
+        finished = 0
+        for job_id in await self.queue.active_job_ids():
+            if await self.finish_if_done(job_id):
+                finished += 1
+        return finished
+
+    async def finish_if_done(self, job_id: str) -> bool:
+        """질문이 모두 종료 상태면 job 마무리 (이 호출이 마무리했으면 True)"""
+        counts = await self.queue.job_counts(job_id)
+        if counts.get("queued") or counts.get("leased"):
+            return False
+        if not await self.queue.finish_job(job_id):
+            return False
+        # 질문별 사용량은 worker마다 나뉘어 있으므로 여기서는 상태만 기록
+        await self.service.finish_job(job_id, None, "cancelled" if counts.get("cancelled") else "done")
+        print(f"[batch_coordinator] job {job_id} 완료 ({counts})")
+        return True
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            try:
+                await self.sweep()
+            except Exception as e:
+                print(f"[batch_coordinator] 확인 실패: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=self.interval_s)
+            except asyncio.TimeoutError:
+                pass
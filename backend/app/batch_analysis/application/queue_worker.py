@@ -0,0 +1,219 @@
+from typing import Dict, Any, Optional
+import asyncio
+import os
+import socket
+import uuid
+from app.batch_analysis.application.job_coordinator import BatchJobCoordinator
+from app.batch_analysis.domain.services import BatchAnalysisService
+from app.batch_analysis.infra.result_write_buffer import ResultWriteBuffer
+from app.batch_analysis.infra.work_queue import BatchWorkQueue, QueueItem, BATCH_QUEUE_LEASE_S, LEASE_EXHAUSTED_ERROR
+from app.utils.llm_budget import LLMBudget
+from app.utils.cancellation import CancellationToken, get_cancellation_registry
+
+
+# worker 프로세스 하나가 동시에 처리하는 질문 수
+BATCH_WORKER_CONCURRENCY = int(os.getenv("BATCH_WORKER_CONCURRENCY", "8"))
+# 처리할 질문이 없을 때 큐를 다시 확인하는 주기 (초)
+BATCH_WORKER_POLL_INTERVAL_S = float(os.getenv("BATCH_WORKER_POLL_INTERVAL_S", "2.0"))
+
+
+class _JobRuntime:
+    """worker 안에서 job 단위로 공유하는 입력/예산/결과 버퍼/취소 토큰"""
+    def __init__(self, request_data: Dict[str, Any], context, budget: LLMBudget, writes: ResultWriteBuffer, cancel_token: CancellationToken):
+        self.request_data = request_data
+        self.context = context
+        self.budget = budget
+        self.writes = writes
+        self.cancel_token = cancel_token
+        self.active = 0
+        # job 하나가 worker의 동시 처리 슬롯을 모두 차지하지 않도록 job 설정(concurrency)만큼만 동시 분석
+        self.slots = asyncio.Semaphore(BatchAnalysisService.job_concurrency(request_data, len(context.question_keys)))
+
+
+class BatchQueueWorker:
+    """배치 큐에서 질문 lease를 받아 분석하는 worker
+
+    시작 시 만료된 lease를 되돌려(이전 프로세스가 죽으며 남긴 질문 포함) 이어서 처리하고,
+    처리 중인 질문은 lease의 1/3 주기로 heartbeat. 모든 질문이 끝난 job은 한 worker만 마무리(상태/예산 로그).
+    poll 주기마다 처리 중인 job의 취소 표시를 확인해 해당 질문 태스크(진행 중인 LLM 호출 포함)를 중단.
+    """
+
+    def __init__(self, queue: BatchWorkQueue, service: BatchAnalysisService, worker_id: Optional[str] = None,
+                 concurrency: int = BATCH_WORKER_CONCURRENCY, lease_s: float = BATCH_QUEUE_LEASE_S,
+                 poll_interval_s: float = BATCH_WORKER_POLL_INTERVAL_S):
+        self.queue = queue
+        self.service = service
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.concurrency = max(1, concurrency)
+        self.lease_s = lease_s
+        self.poll_interval_s = poll_interval_s
+        self._active: Dict[asyncio.Task, QueueItem] = {}
+        self._jobs: Dict[str, _JobRuntime] = {}
+        self._job_locks: Dict[str, asyncio.Lock] = {}
+        self.processed = 0
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> None:
+        """stop이 설정될 때까지 질문을 가져와 처리 (종료 시 남은 lease는 반납)"""
+        stop = stop or asyncio.Event()
+        recovered = await self._requeue_expired()
+        print(f"[batch_worker] {self.worker_id} 시작 (동시 처리 {self.concurrency}개, 만료 lease {recovered}건 재등록)")
+        heartbeat = asyncio.create_task(self._heartbeat_loop())
+        try:
+            while not stop.is_set():
+                free = self.concurrency - len(self._active)
+                items = await self.queue.claim(self.worker_id, free, self.lease_s) if free > 0 else []
+                for item in items:
+                    task = asyncio.create_task(self._process(item))
+                    self._active[task] = item
+                    task.add_done_callback(self._active.pop)
+                if items:
+                    continue
+                # 처리할 질문이 없거나 슬롯이 모두 찼으면 하나가 끝나거나 poll 주기가 지날 때까지 대기
+                waiters = [asyncio.create_task(stop.wait())] + list(self._active)
+                await asyncio.wait(waiters, timeout=self.poll_interval_s, return_when=asyncio.FIRST_COMPLETED)
+                waiters[0].cancel()
+                await self._check_cancellations()
+                await self._requeue_expired()
+        finally:
+            heartbeat.cancel()
+            await self._shutdown()
+
+    async def _shutdown(self) -> None:
+        """진행 중인 질문을 중단하고 lease를 반납해 다른 worker(또는 재시작한 자신)가 이어서 처리하게 함"""
+        pending = dict(self._active)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        # 중단된 질문의 pending 전이를 먼저 기록한 뒤 lease 반납 (반납 후 running이 덮어쓰지 않도록)
+        for job_id, runtime in self._jobs.items():
+            try:
+                await runtime.writes.close()
+            except Exception as e:
+                # 기록하지 못한 질문도 lease 반납 후 다시 처리되므로 종료는 계속
+                print(f"[batch_worker] job {job_id} 결과 기록 실패, lease 반납 후 재처리: {e}")
+            get_cancellation_registry().release(job_id)
+        self._jobs.clear()
+        if pending:
+            await self.queue.release(self.worker_id, list(pending.values()))
+        print(f"[batch_worker] {self.worker_id} 종료 (처리 {self.processed}건, 반납 {len(pending)}건)")
+
+    async def _requeue_expired(self) -> int:
+        """만료된 lease 재등록, 시도 횟수를 넘겨 failed가 된 질문은 결과 행도 error로 기록하고 job 종료 여부를 다시 확인"""
+        try:
+            recovered, failed = await self.queue.requeue_expired()
+            for item in failed:
+                await self.service.repository.update_result(item.job_id, item.question_key, "error", None, LEASE_EXHAUSTED_ERROR)
+            # 이 worker가 처리 중인 job은 마지막 질문을 끝낼 때 _settle_job이 확인
+            coordinator = BatchJobCoordinator(self.queue, self.service)
+            for job_id in {item.job_id for item in failed} - set(self._jobs):
+                await coordinator.finish_if_done(job_id)
+            return recovered
+        except Exception as e:
+            print(f"[batch_worker] 만료 lease 확인 실패: {e}")
+            return 0
+
+    async def _check_cancellations(self) -> None:
+        """다른 프로세스(웹의 /cancel)에서 취소 표시한 job의 질문 태스크 중단"""
+        try:
+            cancelled = await self.queue.cancelled_job_ids(list(self._jobs))
+        except Exception as e:
+            print(f"[batch_worker] 취소 확인 실패: {e}")
+            return
+        for job_id in cancelled:
+            runtime = self._jobs.get(job_id)
+            if runtime is not None and not runtime.cancel_token.cancelled:
+                get_cancellation_registry().cancel(job_id, "사용자 취소")
+
+    async def _heartbeat_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_s / 3)
+            items = list(self._active.values())
+            if not items:
+                continue
+            try:
+                held = await self.queue.heartbeat(self.worker_id, items, self.lease_s)
+                if len(held) < len(items):
+                    print(f"[batch_worker] {self.worker_id}: lease {len(items) - len(held)}건 만료 (다른 worker가 이어받음)")
+            except Exception as e:
+                print(f"[batch_worker] heartbeat 실패: {e}")
+
+    async def _job_runtime(self, job_id: str) -> Optional[_JobRuntime]:
+        """job 입력을 큐에서 복원해 worker 안에서 한 번만 파싱"""
+        lock = self._job_locks.setdefault(job_id, asyncio.Lock())
+        async with lock:
+            runtime = self._jobs.get(job_id)
+            if runtime is not None:
+                return runtime
+            request_data = await self.queue.get_job_request(job_id)
+            if request_data is None:
+                return None
+            context = await self.service.workflow.build_context(
+                request_data["file_content"],
+                request_data["file_name"],
+                request_data.get("raw_data_content") if request_data.get("use_statistical_test", True) else None
+            )
+            runtime = _JobRuntime(
+                request_data,
+                context,
+                LLMBudget(f"batch:{job_id}"),
+                ResultWriteBuffer(self.service.repository, job_id, lease_owner=self.worker_id if self.queue.LEASES_RESULT_ROWS else None).start(),
+                get_cancellation_registry().token(job_id)
+            )
+            self._jobs[job_id] = runtime
+            return runtime
+
+    async def _process(self, item: QueueItem) -> None:
+        try:
+            runtime = await self._job_runtime(item.job_id)
+            if runtime is None:
+                raise Exception("job 입력을 찾을 수 없습니다.")
+        except Exception as e:
+            print(f"[batch_worker] job {item.job_id} 준비 실패: {e}")
+            await self.queue.complete(self.worker_id, item, "failed", str(e))
+            await self.service.repository.update_result(item.job_id, item.question_key, "error", None, str(e))
+            return
+        runtime.active += 1
+        try:
+            runtime.cancel_token.track(asyncio.current_task())
+            runtime.cancel_token.raise_if_cancelled()
+            async with runtime.slots:
+                outcome = await self.service.analyze_question(
+                    item.job_id, item.question_key, runtime.request_data, runtime.context, runtime.budget, runtime.writes, runtime.cancel_token
+                )
+            await self.queue.complete(self.worker_id, item, "done" if outcome != "error" else "failed")
+            self.processed += 1
+        except asyncio.CancelledError:
+            # job 취소면 질문을 cancelled로 끝내고, worker 종료면 그대로 전파 (lease는 _shutdown이 반납)
+            if not runtime.cancel_token.cancelled:
+                raise
+            runtime.writes.set_status(item.question_key, "cancelled")
+            await self.queue.complete(self.worker_id, item, "cancelled")
+        finally:
+            runtime.active -= 1
+        if runtime.active == 0:
+            await self._settle_job(item.job_id, runtime)
+
+    async def _settle_job(self, job_id: str, runtime: _JobRuntime) -> None:
+        """이 worker에서 job의 질문이 모두 끝나면 결과를 기록하고, job 전체가 끝났으면 마무리
+
+        더 가져올 질문이 없으면 파싱 결과를 버리고, 다른 worker의 질문까지 끝났으면 마무리는 finish_job을 얻은 한 곳만.
+        """
+        await runtime.writes.flush()
+        counts = await self.queue.job_counts(job_id)
+        if counts.get("queued") or runtime.active or self._jobs.get(job_id) is not runtime:
+            return
+        del self._jobs[job_id]
+        self._job_locks.pop(job_id, None)
+        get_cancellation_registry().release(job_id)
+        final_status = "cancelled" if counts.get("cancelled") else "done"
+        try:
+            await runtime.writes.close()
+        except Exception as e:
+            # 재시도 후에도 결과를 기록하지 못하면 job을 error로 마무리
+            print(f"[batch_worker] job {job_id} 결과 기록 실패: {e}")
+            final_status = "error"
+        if counts.get("leased"):
+            return
+        if await self.queue.finish_job(job_id):
+            await self.service.finish_job(job_id, runtime.budget, final_status)
+            print(f"[batch_worker] job {job_id} 완료 ({counts})")
@@ -1,9 +1,11 @@
 from typing import Dict, Any, Optional
-from app.batch_analysis.domain.use_cases import BatchAnalysisUseCase
-from app.batch_analysis.domain.services import BatchAnalysisService
-from app.batch_analysis.infra.openai_client import OpenAIClient
-from app.batch_analysis.infra.excel_loader import ExcelLoader
-from app.batch_analysis.infra.statistical_test import StatisticalTester
+import asyncio
+from app.single_analysis.domain.use_cases import TableAnalysisUseCase
+from app.single_analysis.domain.services import TableAnalysisService
+from app.single_analysis.domain.entities import AnalysisContext
+from app.single_analysis.infra.openai_client import OpenAIClient
+from app.single_analysis.infra.excel_loader import ExcelLoader
+from app.single_analysis.infra.statistical_test import StatisticalTester
 
 class TableAnalysisWorkflow:
     """Clean Architecture 기반 테이블 분석 워크플로우 어댑터"""
@@ -11,14 +13,19 @@ class TableAnalysisWorkflow:
         self.openai_client = OpenAIClient()
         self.excel_loader = ExcelLoader()
         self.statistical_tester = StatisticalTester()
-        self.service = BatchAnalysisService(self.openai_client, self.excel_loader, self.statistical_tester)
-        self.use_case = BatchAnalysisUseCase(self.service)
+        # 질문별 분석은 단일 분석 파이프라인을 그대로 사용
+        self.service = TableAnalysisService(self.openai_client, self.excel_loader, self.statistical_tester)
+        self.use_case = TableAnalysisUseCase(self.service)
 
     async def load_survey_tables(self, file_content: bytes, file_name: str) -> Dict[str, Any]:
         """설문 테이블 로드"""
         # ExcelLoader의 load_survey_tables 직접 사용
         return self.excel_loader.load_survey_tables(file_content, file_name)
 
+    async def build_context(self, file_content: bytes, file_name: str, raw_data_content: Optional[bytes] = None) -> AnalysisContext:
+        """job 입력(통계표, Raw Data)을 한 번만 파싱 (이벤트 루프를 막지 않도록 스레드에서 실행)"""
+        return await asyncio.to_thread(self.service.build_context, file_content, file_name, raw_data_content)
+
     async def decide_batch_test_types(self, question_infos: list, lang: str = "한국어") -> dict:
         """배치 분석용: 여러 질문에 대해 통계 검정 방법을 일괄 결정"""
         try:
@@ -43,15 +50,11 @@ class TableAnalysisWorkflow:
         
         return await self.use_case.execute(file_content, file_name, options, **kwargs)
 
-    async def execute_batch(self, file_content: bytes, file_name: str, test_type_map: Dict[str, str], lang: str = "한국어", user_id: Optional[str] = None, raw_data_content: Optional[bytes] = None, raw_data_filename: Optional[str] = None, use_statistical_test: bool = True) -> Dict[str, Any]:
-        """배치 분석 실행 (여기서는 각 질문별로 use_case.execute를 반복 호출)"""
-        # 테이블 파싱
-        parsed = self.excel_loader.load_survey_tables(file_content, file_name)
-        tables = parsed["tables"]
-        question_texts = parsed["question_texts"]
-        question_keys = parsed["question_keys"]
+    async def execute_batch(self, file_content: bytes, file_name: str, test_type_map: Dict[str, str], lang: str = "한국어", user_id: Optional[str] = None, raw_data_content: Optional[bytes] = None, raw_data_filename: Optional[str] = None, use_statistical_test: bool = True, analysis_mode: str = "full") -> Dict[str, Any]:
+        """배치 분석 실행 (job context를 한 번 만들고 각 질문별로 use_case.execute를 반복 호출)"""
+        context = await self.build_context(file_content, file_name, raw_data_content if use_statistical_test else None)
         results = {}
-        for key in question_keys:
+        for key in context.question_keys:
             current_test_type = test_type_map.get(key, "ft_test")
             if not use_statistical_test:
                 current_test_type = "manual"
@@ -61,19 +64,15 @@ class TableAnalysisWorkflow:
                 "lang": lang,
                 "user_id": user_id,
                 "use_statistical_test": use_statistical_test,
-                "test_type": current_test_type
+                "test_type": current_test_type,
+                "analysis_mode": analysis_mode,
+                "context": context
             }
-            kwargs = {}
-            if use_statistical_test and current_test_type in ["ft_test", "chi_square"]:
-                if raw_data_content is not None:
-                    kwargs["raw_data_content"] = raw_data_content
-                if raw_data_filename is not None:
-                    kwargs["raw_data_filename"] = raw_data_filename
             result = await self.use_case.execute(
                 file_content=file_content,
                 file_name=file_name,
                 options=options,
-                **kwargs
+                use_statistical_test=use_statistical_test
             )
             results[key] = result["result"] if result["success"] else {"error": result.get("error")}
         return {"success": True, "result": results} 
\ No newline at end of file
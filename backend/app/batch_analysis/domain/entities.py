@@ -20,6 +20,7 @@ class BatchAnalysisResult:
     def __init__(self, **kwargs):
         self.job_id = kwargs.get("job_id", "")
         self.question_key = kwargs.get("question_key", "")
+        self.question = kwargs.get("question", None)
         self.status = kwargs.get("status", "pending")  # pending, running, done, error, cancelled
         self.result = kwargs.get("result", None)
         self.error = kwargs.get("error", None)
@@ -46,6 +47,8 @@ class BatchAnalysisRequest(BaseModel):
     user_id: str
     batch_test_types: Dict[str, str]  # question_key -> test_type 매핑
     use_statistical_test: bool = True
+    analysis_mode: str = "full"  # full: 분석-검증-수정-다듬기 체인, fast: 단일 호출 분석
+    concurrency: Optional[int] = None  # job 내 동시 처리 질문 수 (None이면 BATCH_ANALYSIS_CONCURRENCY)
 
 
 class BatchAnalysisResponse(BaseModel):
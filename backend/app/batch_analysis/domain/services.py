@@ -1,11 +1,27 @@
 from typing import Dict, Any, List, Optional
 import asyncio
+import hashlib
+import json
+import os
 from datetime import datetime
 from app.batch_analysis.domain.entities import BatchAnalysisJob, BatchAnalysisResult, BatchAnalysisLog
 from app.batch_analysis.infra.batch_analysis_repository import BatchAnalysisRepository
+from app.batch_analysis.infra.result_write_buffer import ResultWriteBuffer
+from app.batch_analysis.infra.work_queue import get_work_queue
+from app.batch_analysis.infra.result_exporter import EXPORT_FORMATS, stream_export
+from app.batch_analysis.infra.progress_hub import get_batch_progress_hub
+from app.utils.llm_budget import LLMBudget
+from app.utils.cancellation import CancellationToken, get_cancellation_registry
 # from app.batch_analysis.application.workflow import TableAnalysisWorkflow  # 순환참조 방지 위해 제거
 
 
+# job별 동시 처리 질문 수 (요청의 concurrency가 우선, 상한 BATCH_ANALYSIS_MAX_CONCURRENCY)
+BATCH_ANALYSIS_CONCURRENCY = int(os.getenv("BATCH_ANALYSIS_CONCURRENCY", "4"))
+BATCH_ANALYSIS_MAX_CONCURRENCY = int(os.getenv("BATCH_ANALYSIS_MAX_CONCURRENCY", "16"))
+# 다른 프로세스에서 실행 중인 job의 진행 상황을 DB에서 확인하는 주기 (초)
+BATCH_PROGRESS_POLL_INTERVAL_S = float(os.getenv("BATCH_PROGRESS_POLL_INTERVAL_S", "2.0"))
+
+
 class BatchAnalysisService:
     """배치 분석 비즈니스 로직 서비스"""
     
@@ -26,31 +42,39 @@ class BatchAnalysisService:
             # 2. DB에 작업 저장
             await self.repository.create_job(job)
             
-            # 3. 테이블 파싱 및 질문 목록 추출
-            parsed_data = await self.workflow.load_survey_tables(
-                request_data["file_content"], 
-                request_data["file_name"]
+            # 3. 통계표/Raw Data를 job 단위로 한 번만 파싱 (질문별 파이프라인이 공유)
+            context = await self.workflow.build_context(
+                request_data["file_content"],
+                request_data["file_name"],
+                request_data.get("raw_data_content") if request_data.get("use_statistical_test", True) else None
             )
-            question_keys = parsed_data["question_keys"]
-            question_texts = parsed_data.get("question_texts", {})
+            question_keys = context.question_keys
+            question_texts = context.question_texts
             
-            # 4. 각 질문별로 결과 레코드 생성
-            for key in question_keys:
-                result = BatchAnalysisResult(
+            # 4. 각 질문별 결과 레코드 일괄 생성
+            await self.repository.create_results_bulk([
+                BatchAnalysisResult(
                     job_id=job.id,
                     question_key=key,
+                    question=question_texts.get(key, ""),
                     status="pending"
                 )
-                # question 필드도 포함
-                setattr(result, "question", question_texts.get(key, ""))
-                await self.repository.create_result(result)
-            
-            # 5. 비동기 분석 시작
-            asyncio.create_task(self._analyze_questions_async(
-                job.id, 
-                request_data, 
-                question_keys
-            ))
+                for key in question_keys
+            ])
+            
+            # 5. 분석 시작: 큐가 설정되어 있으면 worker 프로세스에 맡기고, 아니면 이 프로세스에서 비동기 실행
+            queue = get_work_queue()
+            if queue is not None:
+                await queue.enqueue(job.id, request_data, question_keys)
+            else:
+                # 방금 만든 레코드는 모두 pending이므로 상태 조회 생략
+                asyncio.create_task(self._analyze_questions_async(
+                    job.id, 
+                    request_data, 
+                    question_keys,
+                    context,
+                    status_map={key: "pending" for key in question_keys}
+                ))
             
             return {
                 "success": True,
@@ -63,75 +87,199 @@ class BatchAnalysisService:
                 "error": str(e)
             }
     
-    async def _analyze_questions_async(self, job_id: str, request_data: Dict[str, Any], question_keys: List[str]):
-        """비동기로 모든 질문 분석 수행"""
+    async def _analyze_questions_async(self, job_id: str, request_data: Dict[str, Any], question_keys: List[str], context=None, status_map: Optional[Dict[str, str]] = None):
+        """비동기로 모든 질문 분석 수행 (context: job 단위로 파싱한 AnalysisContext)
+
+        job별 동시성(concurrency)만큼의 worker가 질문 큐를 나눠 처리하고, 각 질문은 전역 LLM limiter 슬롯 안에서 실행.
+        status_map(question_key -> status)이 없으면 한 번의 조회로 불러와 완료된 질문을 건너뜀.
+        """
+        # job 전체 토큰/시간 예산 (질문별 사용량은 각 결과에, 전체 사용량은 로그에 기록)
+        budget = LLMBudget(f"batch:{job_id}")
+        # /cancel 시 worker 태스크와 진행 중인 LLM 호출을 중단하는 토큰
+        registry = get_cancellation_registry()
+        cancel_token = registry.token(job_id)
+        # WebSocket 구독자에게 질문별 상태/단계/결과 push
+        get_batch_progress_hub().start(job_id)
+        # 질문별 상태 전이는 모아서 주기적으로 기록
+        writes = ResultWriteBuffer(self.repository, job_id).start()
         try:
-            # question_texts를 미리 파싱
-            parsed_data = await self.workflow.load_survey_tables(
-                request_data["file_content"], 
-                request_data["file_name"]
-            )
-            question_texts = parsed_data.get("question_texts", {})
-            for key in question_keys:
+            if context is None:
+                context = await self.workflow.build_context(
+                    request_data["file_content"],
+                    request_data["file_name"],
+                    request_data.get("raw_data_content") if request_data.get("use_statistical_test", True) else None
+                )
+            
+            if status_map is None:
+                status_map = await self.repository.get_result_status_map(job_id)
+            
+            queue: asyncio.Queue = asyncio.Queue()
+            # 질문 순서대로 정렬된 처리 결과 (done/error/skipped)
+            outcomes: List[Optional[str]] = [None] * len(question_keys)
+            for index, key in enumerate(question_keys):
                 # 이미 완료된 질문은 건너뛰기
-                existing_result = await self.repository.get_result(job_id, key)
-                if existing_result and existing_result.status == "done":
-                    continue
-                
-                # 상태를 running으로 업데이트
-                await self.repository.update_result_status(job_id, key, "running")
-                
-                try:
-                    # 개별 질문 분석 실행
-                    # 통계 검정 미사용 시 test_type을 manual로 강제 설정
-                    options = {
-                        "analysis_type": False,
-                        "selected_key": key,
-                        "lang": request_data["lang"],
-                        "user_id": request_data["user_id"],
-                        "use_statistical_test": request_data.get("use_statistical_test", True)
-                    }
-                    
-                    # 통계 검정 미사용 시 test_type을 manual로 설정
-                    if not request_data.get("use_statistical_test", True):
-                        options["test_type"] = "manual"
-                    
-                    analysis_result = await self.workflow.execute(
-                        file_content=request_data["file_content"],
-                        file_name=request_data["file_name"],
-                        options=options,
-                        raw_data_content=request_data.get("raw_data_content") if request_data.get("use_statistical_test", True) else None,
-                        raw_data_filename=request_data.get("raw_data_filename") if request_data.get("use_statistical_test", True) else None
-                    )
-                    
-                    # 결과 저장 (question도 함께)
-                    await self.repository.update_result(
-                        job_id, 
-                        key, 
-                        "done", 
-                        analysis_result.get("result"),
-                        None,
-                        question_texts.get(key, "")
-                    )
-                    
-                except Exception as e:
-                    # 에러 발생 시 상태 업데이트
-                    await self.repository.update_result(
-                        job_id, 
-                        key, 
-                        "error", 
-                        None, 
-                        str(e),
-                        question_texts.get(key, "")
-                    )
-            
-            # 전체 작업 완료 시 상태 업데이트
-            await self.repository.update_job_status(job_id, "done")
+                if status_map.get(key) == "done":
+                    outcomes[index] = "skipped"
+                else:
+                    queue.put_nowait((index, key))
+            
+            async def worker():
+                while not cancel_token.cancelled:
+                    try:
+                        index, key = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    outcomes[index] = await self.analyze_question(job_id, key, request_data, context, budget, writes, cancel_token)
+            
+            # job 단위 동시 질문 수는 worker 수로 제한 (전역 LLM 동시성은 gateway가 호출 단위로 제한)
+            concurrency = self.job_concurrency(request_data, queue.qsize())
+            print(f"[batch_analysis] job {job_id}: 질문 {len(question_keys)}개 (처리 대상 {queue.qsize()}개), 동시 처리 {concurrency}개")
+            workers = [cancel_token.track(asyncio.create_task(worker())) for _ in range(concurrency)]
+            # 취소된 worker의 CancelledError는 job 취소로 처리
+            await asyncio.gather(*workers, return_exceptions=True)
+            final_status = "cancelled" if cancel_token.cancelled else "done"
+            print(f"[batch_analysis] job {job_id} {final_status}: done {outcomes.count('done')}, error {outcomes.count('error')}, skipped {outcomes.count('skipped')}, 미처리 {outcomes.count(None)}")
+            
+            # 전체 작업 완료 시 남은 결과 기록 후 상태 업데이트
+            await writes.close()
+            await self.finish_job(job_id, budget, final_status)
             
         except Exception as e:
-            # 전체 작업 에러 시 상태 업데이트
-            await self.repository.update_job_status(job_id, "error")
+            # 전체 작업 에러(마지막 결과 기록 실패 포함) 시 상태 업데이트
+            try:
+                await writes.close()
+            except Exception as close_error:
+                print(f"[batch_analysis] job {job_id} 결과 기록 실패: {close_error}")
+            await self.finish_job(job_id, budget, "error")
             print(f"Batch analysis error: {e}")
+        finally:
+            registry.release(job_id)
+    
+    @staticmethod
+    def job_concurrency(request_data: Dict[str, Any], question_count: int) -> int:
+        concurrency = request_data.get("concurrency") or BATCH_ANALYSIS_CONCURRENCY
+        return max(1, min(int(concurrency), BATCH_ANALYSIS_MAX_CONCURRENCY, max(question_count, 1)))
+    
+    async def analyze_question(self, job_id: str, key: str, request_data: Dict[str, Any], context, budget: LLMBudget, writes: ResultWriteBuffer, cancel_token: Optional[CancellationToken] = None) -> str:
+        """질문 하나 분석 후 결과 저장 (오류는 해당 질문에만 기록하고 job은 계속 진행)
+
+        job이 취소되면 cancelled, 그 밖의 이유(worker 종료 등)로 중단되면 다시 pending으로 기록하고 CancelledError를 그대로 전파.
+        """
+        question_text = context.question_texts.get(key, "")
+        hub = get_batch_progress_hub()
+        
+        # 상태를 running으로 업데이트
+        writes.set_status(key, "running")
+        hub.publish(job_id, {"type": "question", "question_key": key, "status": "running"})
+        
+        try:
+            # 개별 질문 분석 실행
+            options = {
+                "analysis_type": False,
+                "selected_key": key,
+                "lang": request_data["lang"],
+                "user_id": request_data["user_id"],
+                "use_statistical_test": request_data.get("use_statistical_test", True),
+                "analysis_mode": request_data.get("analysis_mode", "full"),
+                "budget": budget.scope(key),
+                "cancel_token": cancel_token,
+                "context": context,
+                "on_step": lambda message: hub.publish(job_id, {"type": "step", "question_key": key, "step": message}),
+                # job 시작 전에 일괄 결정한 검정 방법 (없으면 파이프라인에서 결정)
+                "test_type": (request_data.get("batch_test_types") or {}).get(key)
+            }
+            
+            # 통계 검정 미사용 시 test_type을 manual로 설정
+            if not request_data.get("use_statistical_test", True):
+                options["test_type"] = "manual"
+            
+            analysis_result = await self.workflow.execute(
+                file_content=request_data["file_content"],
+                file_name=request_data["file_name"],
+                options=options
+            )
+            if not analysis_result.get("success", True):
+                raise Exception(analysis_result.get("error") or "분석 실패")
+            
+            # 결과 저장 (question도 함께)
+            writes.set_result(key, "done", analysis_result.get("result"), None, question_text)
+            hub.publish(job_id, {"type": "result", "question_key": key, "status": "done", "result": analysis_result.get("result")})
+            return "done"
+            
+        except asyncio.CancelledError:
+            status = "cancelled" if cancel_token is not None and cancel_token.cancelled else "pending"
+            writes.set_status(key, status)
+            hub.publish(job_id, {"type": "question", "question_key": key, "status": status})
+            raise
+            
+        except Exception as e:
+            # 에러 발생 시 상태 업데이트
+            writes.set_result(key, "error", None, str(e), question_text)
+            hub.publish(job_id, {"type": "question", "question_key": key, "status": "error", "error": str(e)})
+            return "error"
+    
+    async def finish_job(self, job_id: str, budget: Optional[LLMBudget], status: str) -> None:
+        """job 최종 상태 기록 후 LLM 사용량 로그 (inline 실행, 큐 worker, coordinator 공용)"""
+        await self.repository.update_job_status(job_id, status)
+        get_batch_progress_hub().finish(job_id, status)
+        if budget is not None:
+            await self._log_budget(job_id, budget)
+    
+    async def get_batch_progress_snapshot(self, job_id: str) -> Dict[str, Any]:
+        """WebSocket 연결 시 보내는 현재 상태 (DB 상태 + 지금까지의 결과, 이 프로세스에서 실행 중이면 최신 상태/단계로 덮어씀)"""
+        states = {row["question_key"]: row for row in await self.repository.get_result_states(job_id)}
+        hub = get_batch_progress_hub()
+        for key, live in hub.live_states(job_id).items():
+            states.setdefault(key, {"question_key": key}).update(live)
+        results = await self.repository.get_results_changed_since(job_id, None)
+        return {
+            "type": "snapshot",
+            "job_id": job_id,
+            "live": hub.is_live(job_id),
+            "states": sorted(states.values(), key=lambda row: row["question_key"]),
+            "results": {row["question_key"]: row["result"] for row in results}
+        }
+    
+    async def watch_batch_progress(self, job_id: str, interval_s: float = BATCH_PROGRESS_POLL_INTERVAL_S) -> None:
+        """다른 프로세스(큐 worker 등)에서 실행 중인 job의 변경을 DB에서 읽어 구독자에게 push
+
+        구독자가 모두 떠나거나, job이 이 프로세스에서 실행되기 시작하거나(그때부터는 직접 push), 모든 질문이 끝나면 종료.
+        질문별 단계(step)는 실행 프로세스 밖으로 나오지 않으므로 이 경로에서는 상태와 결과만 전달.
+        """
+        hub = get_batch_progress_hub()
+        seen: Dict[str, Any] = {row["question_key"]: (row["status"], row.get("updated_at")) for row in await self.repository.get_result_states(job_id)}
+        etag = None
+        cursor = max((updated_at for _, updated_at in seen.values() if updated_at), default=None)
+        while hub.has_subscribers(job_id) and not hub.is_live(job_id):
+            await asyncio.sleep(interval_s)
+            changes = await self.get_batch_status_changes(job_id, cursor, etag)
+            if not changes["success"] or changes["not_modified"]:
+                continue
+            etag, cursor = changes["etag"], changes["cursor"]
+            for row in changes["states"]:
+                current = (row["status"], row.get("updated_at"))
+                if seen.get(row["question_key"]) == current:
+                    continue
+                seen[row["question_key"]] = current
+                key = row["question_key"]
+                if row["status"] == "done" and key in changes["results"]:
+                    hub.publish(job_id, {"type": "result", "question_key": key, "status": "done", "result": changes["results"][key]})
+                else:
+                    hub.publish(job_id, {"type": "question", "question_key": key, "status": row["status"], "error": row.get("error")})
+            if seen and not any(status in ("pending", "running") for status, _ in seen.values()):
+                hub.publish(job_id, {"type": "job", "status": "cancelled" if changes["counts"].get("cancelled") else "done"})
+                return
+    
+    async def _log_budget(self, job_id: str, budget: LLMBudget) -> None:
+        """job 전체 LLM 사용량을 로그로 남김"""
+        try:
+            await self.repository.create_log(BatchAnalysisLog(
+                job_id=job_id,
+                event=f"budget {json.dumps(budget.finish(), ensure_ascii=False)}",
+                timestamp=datetime.utcnow()
+            ))
+        except Exception as e:
+            print(f"[batch_analysis] 예산 사용량 기록 실패 (job_id: {job_id}): {e}")
     
     async def get_batch_status(self, job_id: str) -> Dict[str, Any]:
         """배치 분석 상태 조회"""
@@ -147,15 +295,59 @@ class BatchAnalysisService:
                 "error": str(e)
             }
     
+    async def get_batch_status_changes(self, job_id: str, since: Optional[str] = None, if_none_match: Optional[str] = None) -> Dict[str, Any]:
+        """질문별 상태 전체와 since 이후 바뀐 질문의 결과만 조회
+
+        etag는 질문별 (상태, updated_at)으로 계산하므로, 클라이언트가 보낸 etag와 같으면 결과 조회 없이 not_modified만 반환.
+        응답의 cursor(가장 최근 updated_at)를 다음 조회의 since로 넘기면 됨.
+        """
+        try:
+            states = sorted(await self.repository.get_result_states(job_id), key=lambda row: row["question_key"])
+            digest = hashlib.sha1(json.dumps(
+                [(row["question_key"], row["status"], row.get("updated_at")) for row in states],
+                ensure_ascii=False
+            ).encode("utf-8")).hexdigest()[:20]
+            etag = f'"{digest}"'
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+                return {"success": True, "not_modified": True, "etag": etag}
+            
+            changed = await self.repository.get_results_changed_since(job_id, since)
+            counts: Dict[str, int] = {}
+            for row in states:
+                counts[row["status"]] = counts.get(row["status"], 0) + 1
+            cursor = max((row["updated_at"] for row in states if row.get("updated_at")), default=since)
+            return {
+                "success": True,
+                "not_modified": False,
+                "etag": etag,
+                "cursor": cursor,
+                "counts": counts,
+                "states": states,
+                "results": {row["question_key"]: row["result"] for row in changed}
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+    
     async def cancel_batch_analysis(self, job_id: str) -> Dict[str, Any]:
         """배치 분석 취소"""
         try:
             # 작업 상태를 cancelled로 업데이트
             await self.repository.update_job_status(job_id, "cancelled")
             
+            # 이 프로세스에서 실행 중이면 worker 태스크와 진행 중인 LLM 호출 중단
+            get_cancellation_registry().cancel(job_id, "사용자 취소")
+            
             # 진행 중인 질문들을 cancelled로 업데이트
             await self.repository.update_pending_results_status(job_id, "cancelled")
             
+            # 큐에서 아직 시작하지 않은 질문 제거 (진행 중인 질문은 worker가 취소 표시를 보고 중단)
+            queue = get_work_queue()
+            if queue is not None:
+                await queue.cancel_job(job_id)
+            
             # 로그 기록
             log = BatchAnalysisLog(
                 job_id=job_id,
@@ -175,8 +367,9 @@ class BatchAnalysisService:
     async def restart_batch_analysis(self, job_id: str) -> Dict[str, Any]:
         """배치 분석 재시작"""
         try:
-            # 미완료 질문들 조회
-            pending_results = await self.repository.get_pending_results(job_id)
+            # 재시작 시점의 질문별 상태를 한 번에 다시 조회해 미완료 질문 선별
+            status_map = await self.repository.get_result_status_map(job_id)
+            pending_results = [key for key, status in status_map.items() if status != "done"]
             
             if not pending_results:
                 return {
@@ -184,6 +377,14 @@ class BatchAnalysisService:
                     "error": "재시작할 질문이 없습니다."
                 }
             
+            # 큐에 job 입력이 남아 있으면 미완료 질문을 다시 등록 (worker가 이어서 처리)
+            queue = get_work_queue()
+            if queue is not None:
+                requeued = await queue.requeue_job(job_id, pending_results)
+                if requeued:
+                    await self.repository.update_results_status_bulk(job_id, requeued, "pending")
+                    await self.repository.update_job_status(job_id, "pending")
+            
             # 로그 기록
             log = BatchAnalysisLog(
                 job_id=job_id,
@@ -229,4 +430,19 @@ class BatchAnalysisService:
             return {
                 "success": False,
                 "error": str(e)
-            } 
\ No newline at end of file
+            }
+    
+    async def export_batch_results(self, job_id: str, fmt: str = "json") -> Dict[str, Any]:
+        """배치 분석 결과 스트리밍 내보내기 (page 단위로 읽어 바로 인코딩, 메모리 사용량이 질문 수와 무관)"""
+        if fmt not in EXPORT_FORMATS:
+            return {
+                "success": False,
+                "error": f"지원하지 않는 형식입니다: {fmt} ({', '.join(EXPORT_FORMATS)})"
+            }
+        media_type, extension = EXPORT_FORMATS[fmt]
+        return {
+            "success": True,
+            "stream": stream_export(self.repository.iter_results_pages(job_id), fmt),
+            "media_type": media_type,
+            "filename": f"batch_{job_id}_results.{extension}"
+        }
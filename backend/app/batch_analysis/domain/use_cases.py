@@ -18,7 +18,10 @@ class BatchAnalysisUseCase:
             "raw_data_filename": request.raw_data_filename,
             "lang": request.lang,
             "user_id": request.user_id,
-            "batch_test_types": request.batch_test_types
+            "batch_test_types": request.batch_test_types,
+            "use_statistical_test": request.use_statistical_test,
+            "analysis_mode": request.analysis_mode,
+            "concurrency": request.concurrency
         }
         
         result = await self.service.start_batch_analysis(request_data)
@@ -39,6 +42,10 @@ class BatchAnalysisUseCase:
             error=result.get("error")
         )
     
+    async def get_batch_status_changes(self, job_id: str, since: Optional[str] = None, if_none_match: Optional[str] = None) -> Dict[str, Any]:
+        """배치 분석 증분 상태 조회 유스케이스"""
+        return await self.service.get_batch_status_changes(job_id, since, if_none_match)
+    
     async def cancel_batch_analysis(self, job_id: str) -> Dict[str, Any]:
         """배치 분석 취소 유스케이스"""
         return await self.service.cancel_batch_analysis(job_id)
@@ -53,4 +60,8 @@ class BatchAnalysisUseCase:
     
     async def download_batch_results(self, job_id: str) -> Dict[str, Any]:
         """배치 분석 결과 다운로드 유스케이스"""
-        return await self.service.download_batch_results(job_id) 
\ No newline at end of file
+        return await self.service.download_batch_results(job_id)
+    
+    async def export_batch_results(self, job_id: str, fmt: str = "json") -> Dict[str, Any]:
+        """배치 분석 결과 스트리밍 내보내기 유스케이스"""
+        return await self.service.export_batch_results(job_id, fmt) 
\ No newline at end of file
@@ -1,7 +1,16 @@
-from typing import List, Optional, Dict, Any
-from datetime import datetime
+from typing import List, Optional, Dict, Any, AsyncIterator, Tuple
+from datetime import datetime, timezone
 from app.batch_analysis.domain.entities import BatchAnalysisJob, BatchAnalysisResult, BatchAnalysisLog
 from app.batch_analysis.infra.supabase_client import get_supabase
+import os
+
+
+# 결과 행 일괄 insert 시 한 번에 보내는 행 수
+BATCH_RESULT_INSERT_PAGE_SIZE = int(os.getenv("BATCH_RESULT_INSERT_PAGE_SIZE", "500"))
+# 결과 내보내기 시 한 번에 읽는 행 수 (result JSONB가 크므로 작게)
+BATCH_RESULT_EXPORT_PAGE_SIZE = int(os.getenv("BATCH_RESULT_EXPORT_PAGE_SIZE", "100"))
+# 질문별 상태 조회 시 한 번에 읽는 행 수 (PostgREST max-rows보다 크지 않게)
+BATCH_RESULT_STATE_PAGE_SIZE = int(os.getenv("BATCH_RESULT_STATE_PAGE_SIZE", "1000"))
 
 
 class BatchAnalysisRepository:
@@ -23,7 +32,7 @@ class BatchAnalysisRepository:
         """배치 분석 작업 상태 업데이트"""
         self.supabase.table("batch_analysis_jobs").update({
             "status": status,
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": datetime.now(timezone.utc).isoformat()
         }).eq("id", job_id).execute()
     
     async def create_result(self, result: BatchAnalysisResult) -> None:
@@ -37,6 +46,66 @@ class BatchAnalysisRepository:
             "error": result.error
         }).execute()
     
+    async def create_results_bulk(self, results: List[BatchAnalysisResult], page_size: int = BATCH_RESULT_INSERT_PAGE_SIZE) -> None:
+        """배치 분석 결과 행 일괄 생성 (page_size 단위로 insert)"""
+        rows = [{
+            "job_id": result.job_id,
+            "question_key": result.question_key,
+            "question": getattr(result, "question", None),
+            "status": result.status,
+            "result": result.result,
+            "error": result.error
+        } for result in results]
+        for start in range(0, len(rows), page_size):
+            self.supabase.table("batch_analysis_results").insert(rows[start:start + page_size]).execute()
+    
+    async def update_results_status_bulk(self, job_id: str, question_keys: List[str], status: str, lease_owner: Optional[str] = None) -> None:
+        """여러 질문의 상태를 한 번에 업데이트
+
+        lease_owner가 있으면 그 worker가 아직 lease를 가진 행만 바꾸고, 종료 상태(done/error/cancelled)면 소유를 해제.
+        """
+        if not question_keys:
+            return
+        update = {"status": status, "updated_at": datetime.now(timezone.utc).isoformat()}
+        if lease_owner is not None and status in ("done", "error", "cancelled"):
+            update["lease_owner"] = None
+        query = self.supabase.table("batch_analysis_results").update(update).eq("job_id", job_id).in_("question_key", question_keys)
+        if lease_owner is not None:
+            query = query.eq("lease_owner", lease_owner)
+        res = query.execute()
+        if lease_owner is not None and len(res.data or []) < len(question_keys):
+            print(f"[batch_analysis_repository] lease를 잃은 질문 {len(question_keys) - len(res.data or [])}건의 상태 기록 생략 (job_id: {job_id})")
+    
+    async def upsert_results(self, job_id: str, rows: List[Dict[str, Any]], lease_owner: Optional[str] = None) -> None:
+        """질문별 최종 결과 일괄 기록 ((job_id, question_key) unique index 필요, 없으면 행별 update로 대체)
+
+        lease_owner가 있으면 upsert 대신 그 worker가 lease를 가진 행만 행별 조건부 update (다른 worker가 이어받은 질문은 기록하지 않음).
+        """
+        if not rows:
+            return
+        now = datetime.now(timezone.utc).isoformat()
+        # update_result처럼 None인 값은 기록하지 않음 (기존 result/error/question을 지우지 않도록)
+        payload = [{**{key: value for key, value in row.items() if value is not None}, "job_id": job_id, "updated_at": now} for row in rows]
+        if lease_owner is not None:
+            for row in payload:
+                res = self.supabase.table("batch_analysis_results").update({**row, "lease_owner": None}).eq(
+                    "job_id", job_id
+                ).eq("question_key", row["question_key"]).eq("lease_owner", lease_owner).execute()
+                if not res.data:
+                    print(f"[batch_analysis_repository] lease를 잃은 질문의 결과 기록 생략 (job_id: {job_id}, question_key: {row['question_key']})")
+            return
+        # bulk upsert는 모든 행의 컬럼 구성이 같아야 하므로 키 구성별로 나눠 기록
+        groups: Dict[Tuple[str, ...], List[Dict[str, Any]]] = {}
+        for row in payload:
+            groups.setdefault(tuple(sorted(row)), []).append(row)
+        try:
+            for group in groups.values():
+                self.supabase.table("batch_analysis_results").upsert(group, on_conflict="job_id,question_key").execute()
+        except Exception as e:
+            print(f"[batch_analysis_repository] upsert 실패, 행별 update로 대체 (job_id: {job_id}): {e}")
+            for row in rows:
+                await self.update_result(job_id, row["question_key"], row["status"], row.get("result"), row.get("error"), row.get("question"))
+    
     async def get_result(self, job_id: str, question_key: str) -> Optional[BatchAnalysisResult]:
         """특정 질문의 결과 조회"""
         res = self.supabase.table("batch_analysis_results").select("*").eq("job_id", job_id).eq("question_key", question_key).execute()
@@ -54,18 +123,25 @@ class BatchAnalysisRepository:
             )
         return None
     
+    async def get_result_status_map(self, job_id: str, page_size: int = BATCH_RESULT_STATE_PAGE_SIZE) -> Dict[str, str]:
+        """작업의 질문별 상태를 가져옴 (question_key -> status, max-rows에 잘리지 않도록 page 단위 조회)"""
+        rows = self._select_all_pages(
+            lambda: self.supabase.table("batch_analysis_results").select("question_key,status").eq("job_id", job_id), page_size
+        )
+        return {row["question_key"]: row["status"] for row in rows}
+    
     async def update_result_status(self, job_id: str, question_key: str, status: str) -> None:
         """결과 상태 업데이트"""
         self.supabase.table("batch_analysis_results").update({
             "status": status,
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": datetime.now(timezone.utc).isoformat()
         }).eq("job_id", job_id).eq("question_key", question_key).execute()
     
     async def update_result(self, job_id: str, question_key: str, status: str, result: Any, error: Optional[str], question: Optional[str] = None) -> None:
         """결과 업데이트"""
         update_data = {
             "status": status,
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": datetime.now(timezone.utc).isoformat()
         }
         
         if result is not None:
@@ -82,11 +158,52 @@ class BatchAnalysisRepository:
         res = self.supabase.table("batch_analysis_results").select("question_key,status,result,error,updated_at").eq("job_id", job_id).execute()
         return res.data if res.data else []
     
+    async def get_result_states(self, job_id: str, page_size: int = BATCH_RESULT_STATE_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """질문별 상태만 조회 (result JSONB 제외, max-rows에 잘리지 않도록 page 단위 조회)"""
+        return self._select_all_pages(
+            lambda: self.supabase.table("batch_analysis_results").select("question_key,status,error,updated_at").eq("job_id", job_id), page_size
+        )
+    
+    async def get_results_changed_since(self, job_id: str, since: Optional[str], page_size: int = BATCH_RESULT_EXPORT_PAGE_SIZE) -> List[Dict[str, Any]]:
+        """updated_at이 since 이후(같은 시각 포함)인 질문의 결과 조회 (since가 없으면 결과가 있는 전체, page 단위 조회)"""
+        def build_query():
+            query = self.supabase.table("batch_analysis_results").select("question_key,result,updated_at").eq("job_id", job_id).not_.is_("result", "null")
+            if since:
+                query = query.gte("updated_at", since)
+            return query
+        return self._select_all_pages(build_query, page_size)
+    
+    def _select_all_pages(self, build_query, page_size: int) -> List[Dict[str, Any]]:
+        """build_query()로 만든 조회를 question_key 순서로 page_size 행씩 끝까지 읽음"""
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            res = build_query().order("question_key").range(start, start + page_size - 1).execute()
+            page = res.data or []
+            rows.extend(page)
+            if len(page) < page_size:
+                return rows
+            start += page_size
+    
+    async def iter_results_pages(self, job_id: str, page_size: int = BATCH_RESULT_EXPORT_PAGE_SIZE) -> AsyncIterator[List[Dict[str, Any]]]:
+        """작업의 결과를 질문 순서대로 page_size 행씩 조회"""
+        start = 0
+        while True:
+            res = self.supabase.table("batch_analysis_results").select(
+                "question_key,question,status,result,error,updated_at"
+            ).eq("job_id", job_id).order("created_at").order("question_key").range(start, start + page_size - 1).execute()
+            rows = res.data or []
+            if rows:
+                yield rows
+            if len(rows) < page_size:
+                return
+            start += page_size
+    
     async def update_pending_results_status(self, job_id: str, status: str) -> None:
         """대기 중인 결과들의 상태 업데이트"""
         self.supabase.table("batch_analysis_results").update({
             "status": status,
-            "updated_at": datetime.utcnow().isoformat()
+            "updated_at": datetime.now(timezone.utc).isoformat()
         }).eq("job_id", job_id).in_("status", ["pending", "running"]).execute()
     
     async def get_pending_results(self, job_id: str) -> List[Dict[str, Any]]:
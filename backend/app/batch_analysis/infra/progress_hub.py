@@ -0,0 +1,72 @@
+from typing import Dict, Any, Set
+import asyncio
+import os
+
+
+# 구독자 하나에 쌓아 두는 최대 이벤트 수 (넘으면 가장 오래된 이벤트부터 버림)
+BATCH_PROGRESS_QUEUE_SIZE = int(os.getenv("BATCH_PROGRESS_QUEUE_SIZE", "1000"))
+
+
+class BatchProgressHub:
+    """배치 job 진행 이벤트를 WebSocket 구독자에게 전달하는 프로세스 내 pub/sub
+
+    이 프로세스에서 실행 중인(start ~ finish) job은 질문별 최신 상태/단계를 기억해 두었다가
+    새 구독자의 snapshot에 덮어씀 (DB 기록은 결과 버퍼 때문에 조금 늦음).
+    """
+
+    def __init__(self, queue_size: int = BATCH_PROGRESS_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._live: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+    def start(self, job_id: str) -> None:
+        self._live.setdefault(job_id, {})
+
+    def is_live(self, job_id: str) -> bool:
+        return job_id in self._live
+
+    def live_states(self, job_id: str) -> Dict[str, Dict[str, Any]]:
+        return {key: dict(state) for key, state in self._live.get(job_id, {}).items()}
+
+    def has_subscribers(self, job_id: str) -> bool:
+        return bool(self._subscribers.get(job_id))
+
+    def publish(self, job_id: str, event: Dict[str, Any]) -> None:
+        """이벤트 전달 (type: question, step, result, job)"""
+        event = {"job_id": job_id, **event}
+        live = self._live.get(job_id)
+        key = event.get("question_key")
+        if live is not None and key:
+            state = live.setdefault(key, {"question_key": key})
+            if event["type"] == "step":
+                state["step"] = event.get("step")
+            else:
+                state.update({k: event[k] for k in ("status", "error") if k in event})
+        for queue in self._subscribers.get(job_id, ()):
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def finish(self, job_id: str, status: str) -> None:
+        self.publish(job_id, {"type": "job", "status": status})
+        self._live.pop(job_id, None)
+
+    def subscribe(self, job_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.setdefault(job_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, job_id: str, queue: asyncio.Queue) -> None:
+        subscribers = self._subscribers.get(job_id)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[job_id]
+
+
+_hub = BatchProgressHub()
+
+
+def get_batch_progress_hub() -> BatchProgressHub:
+    return _hub
@@ -0,0 +1,110 @@
+from typing import Dict, Any, List, AsyncIterator
+import asyncio
+import json
+import os
+import tempfile
+
+
+# XLSX를 메모리에 두는 최대 크기 (넘으면 임시 파일로)
+BATCH_EXPORT_XLSX_SPOOL_BYTES = int(os.getenv("BATCH_EXPORT_XLSX_SPOOL_BYTES", str(8 * 1024 * 1024)))
+# XLSX 응답을 보내는 chunk 크기
+BATCH_EXPORT_CHUNK_BYTES = 64 * 1024
+
+EXPORT_FORMATS = {
+    "json": ("application/json", "json"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+}
+
+_SUMMARY_HEADER = ["question_key", "question", "status", "test_type", "analysis_mode", "summary", "error", "updated_at"]
+
+
+def _dumps(row: Dict[str, Any]) -> str:
+    return json.dumps(row, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+async def iter_ndjson(pages: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """결과 행을 한 줄에 하나씩 (page 단위로 묶어 전송)"""
+    async for page in pages:
+        if page:
+            yield "".join(_dumps(row) + "\n" for row in page).encode("utf-8")
+
+
+async def iter_json(pages: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """결과 행 배열을 공백 없는 JSON으로 page마다 이어서 전송"""
+    yield b"["
+    first = True
+    async for page in pages:
+        if not page:
+            continue
+        chunk = ",".join(_dumps(row) for row in page)
+        yield (chunk if first else "," + chunk).encode("utf-8")
+        first = False
+    yield b"]"
+
+
+def _cell(value: Any) -> Any:
+    if value is None or isinstance(value, (int, float, str, bool)):
+        return value
+    return _dumps(value)
+
+
+def _significance_rows(row: Dict[str, Any]) -> List[List[Any]]:
+    """질문 하나의 유의성 검정 표 (질문 제목 행, 헤더 행, 데이터 행, 빈 행)"""
+    result = row.get("result") or {}
+    records = result.get("ft_test_result") if isinstance(result, dict) else None
+    if not records:
+        return []
+    columns: List[str] = []
+    for record in records:
+        columns.extend(col for col in record if col not in columns)
+    lines = [[row.get("question_key"), row.get("question")], ["question_key"] + columns]
+    lines.extend([row.get("question_key")] + [_cell(record.get(col)) for col in columns] for record in records)
+    lines.append([])
+    return lines
+
+
+async def iter_xlsx(pages: AsyncIterator[List[Dict[str, Any]]]) -> AsyncIterator[bytes]:
+    """요약 시트와 유의성 표 시트로 된 XLSX
+
+    write_only 모드라 행은 page마다 시트 임시 파일로 내려가고, 마지막에 zip으로 묶은 파일을 chunk 단위로 전송.
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    summary = workbook.create_sheet("요약")
+    significance = workbook.create_sheet("유의성 검정")
+    summary.append(_SUMMARY_HEADER)
+    async for page in pages:
+        for row in page:
+            result = row.get("result") if isinstance(row.get("result"), dict) else {}
+            summary.append([
+                row.get("question_key"),
+                row.get("question"),
+                row.get("status"),
+                result.get("test_type"),
+                result.get("analysis_mode"),
+                result.get("polishing_result") or result.get("table_analysis"),
+                row.get("error"),
+                _cell(row.get("updated_at")),
+            ])
+            for line in _significance_rows(row):
+                significance.append(line)
+
+    with tempfile.SpooledTemporaryFile(max_size=BATCH_EXPORT_XLSX_SPOOL_BYTES) as buf:
+        await asyncio.to_thread(workbook.save, buf)
+        buf.seek(0)
+        while True:
+            chunk = buf.read(BATCH_EXPORT_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_export(pages: AsyncIterator[List[Dict[str, Any]]], fmt: str) -> AsyncIterator[bytes]:
+    """형식별 스트리밍 인코더 (fmt: json, ndjson, xlsx)"""
+    if fmt == "ndjson":
+        return iter_ndjson(pages)
+    if fmt == "xlsx":
+        return iter_xlsx(pages)
+    return iter_json(pages)
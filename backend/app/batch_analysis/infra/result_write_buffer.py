@@ -0,0 +1,114 @@
+from typing import Dict, Any, List, Optional
+import asyncio
+import os
+from app.batch_analysis.infra.batch_analysis_repository import BatchAnalysisRepository
+
+
+# 상태 전이를 모아 DB에 기록하는 주기 (초)
+BATCH_RESULT_FLUSH_INTERVAL_S = float(os.getenv("BATCH_RESULT_FLUSH_INTERVAL_S", "1.0"))
+# close() 시 마지막 기록 실패를 재시도하는 횟수와 첫 대기 시간 (초, 매번 2배)
+BATCH_RESULT_CLOSE_RETRIES = int(os.getenv("BATCH_RESULT_CLOSE_RETRIES", "3"))
+BATCH_RESULT_CLOSE_BACKOFF_S = float(os.getenv("BATCH_RESULT_CLOSE_BACKOFF_S", "0.5"))
+
+
+class ResultWriteBuffer:
+    """batch_analysis_results 상태 전이를 모아 주기적으로 기록하는 write-behind 버퍼
+
+    같은 질문의 전이는 마지막 것만 남기고(running 직후 done이면 done만 기록),
+    상태만 바뀐 질문은 상태별 update 한 번, 결과가 있는 질문은 upsert 한 번으로 기록한다.
+    lease_owner를 주면(결과 행을 lease하는 큐) 그 worker가 lease를 가진 행에만 기록한다.
+    """
+
+    def __init__(self, repository: BatchAnalysisRepository, job_id: str, flush_interval_s: float = BATCH_RESULT_FLUSH_INTERVAL_S, lease_owner: Optional[str] = None):
+        self.repository = repository
+        self.job_id = job_id
+        self.lease_owner = lease_owner
+        self.flush_interval_s = flush_interval_s
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.flushes = 0
+        self.transitions = 0
+
+    def start(self) -> "ResultWriteBuffer":
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+        return self
+
+    def set_status(self, question_key: str, status: str) -> None:
+        self.transitions += 1
+        self._pending[question_key] = {"question_key": question_key, "status": status}
+
+    def set_result(self, question_key: str, status: str, result: Any = None, error: Optional[str] = None, question: Optional[str] = None) -> None:
+        self.transitions += 1
+        self._pending[question_key] = {
+            "question_key": question_key,
+            "status": status,
+            "result": result,
+            "error": error,
+            "question": question,
+        }
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_s)
+            # close()의 취소가 기록 도중의 batch를 잃지 않도록 보호
+            await asyncio.shield(self.flush())
+
+    async def flush(self) -> bool:
+        """pending 전이 기록 (실패하면 전이를 되돌려 두고 False)"""
+        try:
+            await self._flush_once()
+            return True
+        except Exception as e:
+            print(f"[result_write_buffer] 기록 실패, 다음 주기에 재시도 (job_id: {self.job_id}): {e}")
+            return False
+
+    async def _flush_once(self) -> None:
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            status_only: Dict[str, List[str]] = {}
+            with_result: List[Dict[str, Any]] = []
+            for key, row in batch.items():
+                if "result" in row:
+                    with_result.append(row)
+                else:
+                    status_only.setdefault(row["status"], []).append(key)
+            try:
+                for status, keys in status_only.items():
+                    await self.repository.update_results_status_bulk(self.job_id, keys, status, self.lease_owner)
+                await self.repository.upsert_results(self.job_id, with_result, self.lease_owner)
+                self.flushes += 1
+            except Exception:
+                # 그 사이 들어온 더 최신 전이는 유지
+                for key, row in batch.items():
+                    self._pending.setdefault(key, row)
+                raise
+
+    async def close(self, retries: int = BATCH_RESULT_CLOSE_RETRIES, backoff_s: float = BATCH_RESULT_CLOSE_BACKOFF_S) -> None:
+        """주기 기록 중단 후 남은 전이 모두 기록
+
+        마지막 기록은 다음 주기가 없으므로 backoff로 몇 번 재시도하고, 그래도 실패하면 예외를 올려
+        호출한 쪽이 job을 error로 마무리하게 한다.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for attempt in range(retries + 1):
+            try:
+                await self._flush_once()
+                break
+            except Exception as e:
+                if attempt >= retries:
+                    print(f"[result_write_buffer] 마지막 기록 실패, 전이 {len(self._pending)}건 미기록 (job_id: {self.job_id}): {e}")
+                    raise
+                delay = backoff_s * (2 ** attempt)
+                print(f"[result_write_buffer] 마지막 기록 실패, {delay:.1f}초 후 재시도 ({attempt + 1}/{retries}, job_id: {self.job_id}): {e}")
+                await asyncio.sleep(delay)
+        print(f"[result_write_buffer] job {self.job_id}: 전이 {self.transitions}건을 {self.flushes}회 기록으로 처리")
@@ -0,0 +1,203 @@
+from typing import Dict, Any, List, Optional, Tuple
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+import base64
+import os
+import random
+from app.batch_analysis.infra.supabase_client import get_supabase
+from app.batch_analysis.infra.work_queue import QueueItem, BATCH_QUEUE_LEASE_S, BATCH_QUEUE_MAX_ATTEMPTS, PAYLOAD_FILE_FIELDS, LEASE_EXHAUSTED_ERROR
+
+
+# claim 시 후보로 읽는 행 수 배수 (여러 worker가 같은 후보를 두고 경쟁할 때 빈손이 되지 않도록)
+BATCH_QUEUE_CLAIM_SCAN = int(os.getenv("BATCH_QUEUE_CLAIM_SCAN", "4"))
+
+# 결과 테이블 상태 -> 큐 상태
+_QUEUE_STATUS = {"pending": "queued", "running": "leased", "done": "done", "error": "failed", "cancelled": "cancelled"}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class ResultsLeaseQueue:
+    """batch_analysis_results 행을 직접 lease하는 큐 (BatchWorkQueue와 같은 인터페이스)
+
+    여러 호스트의 worker가 같은 job의 질문을 나눠 처리. 질문 상태는 결과 테이블의 status를 그대로 쓰고
+    (pending -> running + lease_owner/lease_expires_at -> done | error | cancelled),
+    claim/heartbeat/release는 현재 상태·소유자·시도 횟수를 조건으로 건 update라 행 단위로 원자적.
+    결과 버퍼도 lease_owner 조건으로 기록하므로 lease를 이어받은 worker의 결과를 이전 worker가 덮어쓰지 않음.
+    """
+
+    LEASES_RESULT_ROWS = True
+
+    def __init__(self, max_attempts: int = BATCH_QUEUE_MAX_ATTEMPTS, claim_scan: int = BATCH_QUEUE_CLAIM_SCAN):
+        self.supabase = get_supabase()
+        self.max_attempts = max_attempts
+        self.claim_scan = max(1, claim_scan)
+
+    def _results(self):
+        return self.supabase.table("batch_analysis_results")
+
+    def _inputs(self):
+        return self.supabase.table("batch_analysis_job_inputs")
+
+    # --- 웹 프로세스 측 ---
+
+    async def enqueue(self, job_id: str, request_data: Dict[str, Any], question_keys: List[str]) -> None:
+        """job 입력 보관 (질문 행은 start_batch_analysis가 pending으로 이미 생성)"""
+        payload = {k: v for k, v in request_data.items() if k not in PAYLOAD_FILE_FIELDS and k != "context"}
+        files = {
+            field: base64.b64encode(request_data[field]).decode("ascii") if request_data.get(field) else None
+            for field in PAYLOAD_FILE_FIELDS
+        }
+        self._inputs().insert({"job_id": job_id, "request_data": payload, **files, "status": "queued"}).execute()
+
+    async def requeue_job(self, job_id: str, question_keys: List[str]) -> List[str]:
+        """재시작: 진행 중이 아닌 지정 질문을 시도 횟수를 초기화해 pending으로"""
+        res = self._inputs().update({"status": "queued"}).eq("job_id", job_id).execute()
+        if not res.data or not question_keys:
+            return []
+        res = self._results().update({
+            "status": "pending",
+            "attempts": 0,
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "error": None,
+            "updated_at": _now().isoformat()
+        }).eq("job_id", job_id).in_("question_key", question_keys).neq("status", "running").execute()
+        return [row["question_key"] for row in (res.data or [])]
+
+    async def cancel_job(self, job_id: str) -> int:
+        """아직 시작하지 않은 질문을 cancelled로, job에 취소 표시 (진행 중인 질문은 worker가 표시를 보고 중단)"""
+        self._inputs().update({"status": "cancelled"}).eq("job_id", job_id).eq("status", "queued").execute()
+        res = self._results().update({
+            "status": "cancelled",
+            "updated_at": _now().isoformat()
+        }).eq("job_id", job_id).eq("status", "pending").execute()
+        return len(res.data or [])
+
+    # --- worker 측 ---
+
+    async def active_job_ids(self) -> List[str]:
+        """아직 마무리되지 않은 job (먼저 등록된 순)"""
+        res = self._inputs().select("job_id").in_("status", ["queued", "cancelled"]).order("created_at").execute()
+        return [row["job_id"] for row in (res.data or [])]
+
+    async def cancelled_job_ids(self, job_ids: List[str]) -> List[str]:
+        """job_ids 중 취소 표시된 job"""
+        if not job_ids:
+            return []
+        res = self._inputs().select("job_id").eq("status", "cancelled").in_("job_id", job_ids).execute()
+        return [row["job_id"] for row in (res.data or [])]
+
+    async def requeue_expired(self) -> Tuple[int, List[QueueItem]]:
+        """lease가 만료된 running 행을 pending으로 (시도 횟수 초과 시 error), (바뀐 행 수, error가 된 질문) 반환"""
+        now = _now().isoformat()
+        failed = self._results().update({
+            "status": "error",
+            "error": LEASE_EXHAUSTED_ERROR,
+            "lease_owner": None,
+            "updated_at": now
+        }).eq("status", "running").lt("lease_expires_at", now).gte("attempts", self.max_attempts).execute()
+        requeued = self._results().update({
+            "status": "pending",
+            "lease_owner": None,
+            "lease_expires_at": None,
+            "updated_at": now
+        }).eq("status", "running").lt("lease_expires_at", now).execute()
+        failed_items = [QueueItem(job_id=row["job_id"], question_key=row["question_key"], attempts=row.get("attempts") or 0) for row in (failed.data or [])]
+        return len(failed_items) + len(requeued.data or []), failed_items
+
+    async def claim(self, owner: str, limit: int, lease_s: float = BATCH_QUEUE_LEASE_S) -> List[QueueItem]:
+        """큐로 등록된 job의 pending 행을 조건부 update로 최대 limit개 lease"""
+        res = self._inputs().select("job_id").eq("status", "queued").execute()
+        job_ids = [row["job_id"] for row in (res.data or [])]
+        if not job_ids or limit <= 0:
+            return []
+        res = self._results().select("job_id,question_key,attempts").eq("status", "pending").in_("job_id", job_ids).order("created_at").limit(limit * self.claim_scan).execute()
+        candidates = res.data or []
+        # 같은 후보를 읽은 worker끼리 앞쪽 행만 두고 경쟁하지 않도록 후보 순서를 섞음
+        random.shuffle(candidates)
+        expires_at = (_now() + timedelta(seconds=lease_s)).isoformat()
+        items = []
+        for row in candidates:
+            if len(items) >= limit:
+                break
+            attempts = row.get("attempts") or 0
+            claimed = self._results().update({
+                "status": "running",
+                "lease_owner": owner,
+                "lease_expires_at": expires_at,
+                "attempts": attempts + 1,
+                "updated_at": _now().isoformat()
+            }).eq("job_id", row["job_id"]).eq("question_key", row["question_key"]).eq("status", "pending").eq("attempts", attempts).execute()
+            if claimed.data:
+                items.append(QueueItem(job_id=row["job_id"], question_key=row["question_key"], attempts=attempts + 1))
+        return items
+
+    async def heartbeat(self, owner: str, items: List[QueueItem], lease_s: float = BATCH_QUEUE_LEASE_S) -> List[QueueItem]:
+        """lease 연장 (job별 update 한 번), 아직 이 worker가 잡고 있는 질문만 반환"""
+        expires_at = (_now() + timedelta(seconds=lease_s)).isoformat()
+        by_job: Dict[str, List[QueueItem]] = {}
+        for item in items:
+            by_job.setdefault(item.job_id, []).append(item)
+        held = []
+        for job_id, job_items in by_job.items():
+            res = self._results().update({"lease_expires_at": expires_at}).eq("job_id", job_id).in_(
+                "question_key", [item.question_key for item in job_items]
+            ).eq("status", "running").eq("lease_owner", owner).execute()
+            held_keys = {row["question_key"] for row in (res.data or [])}
+            held.extend(item for item in job_items if item.question_key in held_keys)
+        return held
+
+    async def complete(self, owner: str, item: QueueItem, status: str = "done", error: Optional[str] = None, grace_s: float = BATCH_QUEUE_LEASE_S) -> bool:
+        """질문 처리 종료 (최종 status/result는 결과 버퍼가 lease_owner 조건으로 기록하면서 소유를 해제)
+
+        버퍼 기록이 끝내 실패하면 행이 running으로 남으므로, 만료 시각을 grace_s 뒤로 두어 그때는 다시 pending이 되게 함.
+        오류 메시지가 있는 failed와 cancelled는 여기서 바로 기록하고 소유를 해제.
+        """
+        update: Dict[str, Any] = {"lease_expires_at": (_now() + timedelta(seconds=grace_s)).isoformat()}
+        if status == "failed" and error is not None:
+            update.update({"status": "error", "error": error, "lease_owner": None, "updated_at": _now().isoformat()})
+        elif status == "cancelled":
+            update.update({"status": "cancelled", "lease_owner": None, "updated_at": _now().isoformat()})
+        res = self._results().update(update).eq("job_id", item.job_id).eq("question_key", item.question_key).eq("lease_owner", owner).execute()
+        return bool(res.data)
+
+    async def release(self, owner: str, items: List[QueueItem]) -> None:
+        """종료 시 처리하지 못한 질문을 시도 횟수를 되돌려 pending으로 반납
+
+        결과 버퍼가 먼저 pending을 기록했을 수 있으므로 status가 아니라 lease_owner로만 매칭.
+        """
+        for item in items:
+            self._results().update({
+                "status": "pending",
+                "attempts": max(0, item.attempts - 1),
+                "lease_owner": None,
+                "lease_expires_at": None,
+                "updated_at": _now().isoformat()
+            }).eq("job_id", item.job_id).eq("question_key", item.question_key).eq("lease_owner", owner).execute()
+
+    async def get_job_request(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """enqueue 시 보관한 요청(파일 포함) 복원"""
+        res = self._inputs().select("request_data,file_content,raw_data_content").eq("job_id", job_id).execute()
+        if not res.data:
+            return None
+        row = res.data[0]
+        request_data = dict(row["request_data"])
+        for field in PAYLOAD_FILE_FIELDS:
+            request_data[field] = base64.b64decode(row[field]) if row.get(field) else None
+        return request_data
+
+    async def job_counts(self, job_id: str) -> Dict[str, int]:
+        """job의 질문 상태별 개수 (큐 상태 이름으로)"""
+        res = self._results().select("status").eq("job_id", job_id).execute()
+        return dict(Counter(_QUEUE_STATUS.get(row["status"], row["status"]) for row in (res.data or [])))
+
+    async def finish_job(self, job_id: str) -> bool:
+        """모든 질문이 끝난 job을 finished로 (조건부 update라 여러 worker/coordinator 중 한 곳만 True)"""
+        counts = await self.job_counts(job_id)
+        if counts.get("queued") or counts.get("leased"):
+            return False
+        res = self._inputs().update({"status": "finished"}).eq("job_id", job_id).in_("status", ["queued", "cancelled"]).execute()
+        return bool(res.data)
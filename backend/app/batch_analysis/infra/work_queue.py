@@ -0,0 +1,408 @@
+from typing import Dict, Any, List, Optional, Tuple
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+# 배치 작업 실행 방식 (inline: 웹 프로세스에서 바로 실행, sqlite: 로컬 파일 큐, postgres: BATCH_QUEUE_DSN의 Postgres 큐,
+# supabase: 결과 테이블 행을 직접 lease해 여러 호스트의 worker가 한 job을 나눠 처리)
+BATCH_QUEUE_BACKEND = os.getenv("BATCH_QUEUE_BACKEND", "inline")
+BATCH_QUEUE_SQLITE_PATH = os.getenv("BATCH_QUEUE_SQLITE_PATH", "batch_queue.sqlite3")
+BATCH_QUEUE_DSN = os.getenv("BATCH_QUEUE_DSN") or None
+# 질문 lease 유지 시간 (worker는 이보다 짧은 주기로 heartbeat, 만료되면 다른 worker가 다시 가져감)
+BATCH_QUEUE_LEASE_S = float(os.getenv("BATCH_QUEUE_LEASE_S", "120"))
+# 질문별 최대 시도 횟수 (lease 만료로 재할당된 횟수 포함, 넘으면 failed)
+BATCH_QUEUE_MAX_ATTEMPTS = int(os.getenv("BATCH_QUEUE_MAX_ATTEMPTS", "3"))
+
+# 시도 횟수를 넘겨 failed 처리된 질문의 오류 메시지
+LEASE_EXHAUSTED_ERROR = "lease 만료 (최대 시도 횟수 초과)"
+
+# 큐에 저장하지 않는 요청 필드 (파일은 별도 컬럼, context는 worker가 다시 만듦)
+PAYLOAD_FILE_FIELDS = ("file_content", "raw_data_content")
+
+
+@dataclass
+class QueueItem:
+    """worker가 lease를 잡은 질문 하나"""
+    job_id: str
+    question_key: str
+    attempts: int
+
+
+class BatchWorkQueue(ABC):
+    """lease 기반 배치 질문 큐 (job 입력과 질문별 상태를 DB에 보관해 프로세스 재시작 후에도 이어서 처리)
+
+    질문 상태: queued -> leased -> done | failed | cancelled
+    lease가 만료된 질문은 requeue_expired()로 다시 queued가 되고, 시도 횟수가 max_attempts에 도달하면 failed.
+    하위 클래스는 연결(_connect), 스키마(SCHEMA), placeholder/잠금 구문만 정의.
+    """
+
+    SCHEMA: List[str] = []
+    PLACEHOLDER = "?"
+    # 결과 행이 아니라 큐 테이블을 lease하므로 결과 기록에 lease 조건을 걸지 않음
+    LEASES_RESULT_ROWS = False
+    LOCK_CLAUSE = ""
+
+    def __init__(self, max_attempts: int = BATCH_QUEUE_MAX_ATTEMPTS):
+        self.max_attempts = max_attempts
+        self._conn = None
+        self._lock = threading.Lock()
+
+    @abstractmethod
+    def _connect(self):
+        """DB 연결 생성"""
+
+    @abstractmethod
+    def _transaction(self):
+        """커서를 주는 트랜잭션 context manager (commit/rollback 포함)"""
+
+    def _sql(self, sql: str) -> str:
+        return sql.replace("?", self.PLACEHOLDER)
+
+    def _run_sync(self, fn, *args):
+        with self._lock:
+            if self._conn is None:
+                self._conn = self._connect()
+                with self._transaction() as cur:
+                    for statement in self.SCHEMA:
+                        cur.execute(statement)
+            return fn(*args)
+
+    async def _run(self, fn, *args):
+        """DB 호출은 이벤트 루프를 막지 않도록 스레드에서 실행"""
+        return await asyncio.to_thread(self._run_sync, fn, *args)
+
+    # --- 웹 프로세스 측 ---
+
+    async def enqueue(self, job_id: str, request_data: Dict[str, Any], question_keys: List[str]) -> None:
+        """job 입력과 질문 목록을 큐에 등록"""
+        payload = {k: v for k, v in request_data.items() if k not in PAYLOAD_FILE_FIELDS and k != "context"}
+
+        def _enqueue():
+            now = time.time()
+            with self._transaction() as cur:
+                cur.execute(
+                    self._sql("INSERT INTO batch_queue_jobs (job_id, request_data, file_content, raw_data_content, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)"),
+                    (job_id, json.dumps(payload, ensure_ascii=False), request_data.get("file_content"), request_data.get("raw_data_content"), now)
+                )
+                for position, key in enumerate(question_keys):
+                    cur.execute(
+                        self._sql("INSERT INTO batch_queue_items (job_id, question_key, position, status, attempts, enqueued_at) VALUES (?, ?, ?, 'queued', 0, ?)"),
+                        (job_id, key, position, now)
+                    )
+
+        await self._run(_enqueue)
+
+    async def requeue_job(self, job_id: str, question_keys: List[str]) -> List[str]:
+        """재시작: 지정 질문을 시도 횟수를 초기화해 다시 queued로, 다시 등록된 질문 반환 (job 입력이 큐에 남아 있어야 함)"""
+        def _requeue():
+            with self._transaction() as cur:
+                cur.execute(self._sql("SELECT 1 FROM batch_queue_jobs WHERE job_id = ?"), (job_id,))
+                if cur.fetchone() is None:
+                    return []
+                cur.execute(self._sql("UPDATE batch_queue_jobs SET status = 'queued' WHERE job_id = ?"), (job_id,))
+                requeued = []
+                for key in question_keys:
+                    # 진행 중(leased)인 질문은 현재 worker가 끝까지 처리
+                    cur.execute(
+                        self._sql("UPDATE batch_queue_items SET status = 'queued', attempts = 0, lease_owner = NULL, lease_expires_at = NULL, error = NULL WHERE job_id = ? AND question_key = ? AND status <> 'leased'"),
+                        (job_id, key)
+                    )
+                    if cur.rowcount:
+                        requeued.append(key)
+                return requeued
+
+        return await self._run(_requeue)
+
+    async def cancel_job(self, job_id: str) -> int:
+        """아직 시작하지 않은 질문을 cancelled로, job에 취소 표시 (진행 중인 질문은 worker가 표시를 보고 중단)"""
+        def _cancel():
+            with self._transaction() as cur:
+                cur.execute(self._sql("UPDATE batch_queue_jobs SET status = 'cancelled' WHERE job_id = ? AND status = 'queued'"), (job_id,))
+                cur.execute(self._sql("UPDATE batch_queue_items SET status = 'cancelled' WHERE job_id = ? AND status = 'queued'"), (job_id,))
+                return cur.rowcount
+
+        return await self._run(_cancel)
+
+    # --- worker 측 ---
+
+    async def active_job_ids(self) -> List[str]:
+        """아직 마무리되지 않은 job (먼저 등록된 순)"""
+        def _active():
+            with self._transaction() as cur:
+                cur.execute("SELECT job_id FROM batch_queue_jobs WHERE status IN ('queued', 'cancelled') ORDER BY created_at")
+                return [row[0] for row in cur.fetchall()]
+
+        return await self._run(_active)
+
+    async def cancelled_job_ids(self, job_ids: List[str]) -> List[str]:
+        """job_ids 중 취소 표시된 job"""
+        def _cancelled():
+            with self._transaction() as cur:
+                cur.execute(
+                    self._sql(f"SELECT job_id FROM batch_queue_jobs WHERE status = 'cancelled' AND job_id IN ({', '.join('?' for _ in job_ids)})"),
+                    tuple(job_ids)
+                )
+                return [row[0] for row in cur.fetchall()]
+
+        return await self._run(_cancelled) if job_ids else []
+
+    async def requeue_expired(self) -> Tuple[int, List[QueueItem]]:
+        """lease가 만료된 질문을 다시 queued로 (시도 횟수 초과 시 failed)
+
+        (바뀐 질문 수, failed가 된 질문) 반환. 결과 행은 이 큐 밖에 있으므로 failed 질문의 결과 기록은 호출부에서.
+        """
+        def _requeue_expired():
+            now = time.time()
+            with self._transaction() as cur:
+                # 취소된 job의 질문은 다시 queued로 돌리지 않음
+                cur.execute(
+                    self._sql("UPDATE batch_queue_items SET status = 'cancelled', lease_owner = NULL WHERE status = 'leased' AND lease_expires_at < ? AND job_id IN (SELECT job_id FROM batch_queue_jobs WHERE status = 'cancelled')"),
+                    (now,)
+                )
+                cur.execute(
+                    self._sql(f"SELECT job_id, question_key, attempts FROM batch_queue_items WHERE status = 'leased' AND lease_expires_at < ? AND attempts >= ?{self.LOCK_CLAUSE}"),
+                    (now, self.max_attempts)
+                )
+                failed = [QueueItem(job_id=job_id, question_key=question_key, attempts=attempts) for job_id, question_key, attempts in cur.fetchall()]
+                for item in failed:
+                    cur.execute(
+                        self._sql("UPDATE batch_queue_items SET status = 'failed', lease_owner = NULL, error = ? WHERE job_id = ? AND question_key = ? AND status = 'leased'"),
+                        (LEASE_EXHAUSTED_ERROR, item.job_id, item.question_key)
+                    )
+                cur.execute(
+                    self._sql("UPDATE batch_queue_items SET status = 'queued', lease_owner = NULL, lease_expires_at = NULL WHERE status = 'leased' AND lease_expires_at < ?"),
+                    (now,)
+                )
+                return len(failed) + cur.rowcount, failed
+
+        return await self._run(_requeue_expired)
+
+    async def claim(self, owner: str, limit: int, lease_s: float = BATCH_QUEUE_LEASE_S) -> List[QueueItem]:
+        """queued 질문을 먼저 등록된 job, 질문 순서대로 최대 limit개 lease"""
+        def _claim():
+            with self._transaction() as cur:
+                cur.execute(
+                    self._sql(f"SELECT job_id, question_key, attempts FROM batch_queue_items WHERE status = 'queued' ORDER BY enqueued_at, position LIMIT ?{self.LOCK_CLAUSE}"),
+                    (limit,)
+                )
+                rows = cur.fetchall()
+                expires_at = time.time() + lease_s
+                items = []
+                for job_id, question_key, attempts in rows:
+                    cur.execute(
+                        self._sql("UPDATE batch_queue_items SET status = 'leased', lease_owner = ?, lease_expires_at = ?, attempts = attempts + 1 WHERE job_id = ? AND question_key = ? AND status = 'queued'"),
+                        (owner, expires_at, job_id, question_key)
+                    )
+                    if cur.rowcount:
+                        items.append(QueueItem(job_id=job_id, question_key=question_key, attempts=attempts + 1))
+                return items
+
+        return await self._run(_claim)
+
+    async def heartbeat(self, owner: str, items: List[QueueItem], lease_s: float = BATCH_QUEUE_LEASE_S) -> List[QueueItem]:
+        """lease 연장, 아직 이 worker가 잡고 있는 질문만 반환 (만료 후 다른 worker에 넘어간 질문 제외)"""
+        def _heartbeat():
+            expires_at = time.time() + lease_s
+            held = []
+            with self._transaction() as cur:
+                for item in items:
+                    cur.execute(
+                        self._sql("UPDATE batch_queue_items SET lease_expires_at = ? WHERE job_id = ? AND question_key = ? AND status = 'leased' AND lease_owner = ?"),
+                        (expires_at, item.job_id, item.question_key, owner)
+                    )
+                    if cur.rowcount:
+                        held.append(item)
+            return held
+
+        return await self._run(_heartbeat)
+
+    async def complete(self, owner: str, item: QueueItem, status: str = "done", error: Optional[str] = None) -> bool:
+        """lease를 잡은 질문을 done/failed로 (lease를 잃었으면 False)"""
+        def _complete():
+            with self._transaction() as cur:
+                cur.execute(
+                    self._sql("UPDATE batch_queue_items SET status = ?, error = ?, lease_owner = NULL, lease_expires_at = NULL WHERE job_id = ? AND question_key = ? AND status = 'leased' AND lease_owner = ?"),
+                    (status, error, item.job_id, item.question_key, owner)
+                )
+                return cur.rowcount > 0
+
+        return await self._run(_complete)
+
+    async def release(self, owner: str, items: List[QueueItem]) -> None:
+        """종료 시 처리하지 못한 질문을 시도 횟수를 되돌려 queued로 반납"""
+        def _release():
+            with self._transaction() as cur:
+                for item in items:
+                    cur.execute(
+                        self._sql("UPDATE batch_queue_items SET status = 'queued', attempts = attempts - 1, lease_owner = NULL, lease_expires_at = NULL WHERE job_id = ? AND question_key = ? AND status = 'leased' AND lease_owner = ?"),
+                        (item.job_id, item.question_key, owner)
+                    )
+
+        await self._run(_release)
+
+    async def get_job_request(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """enqueue 시 저장한 요청(파일 포함) 복원"""
+        def _get():
+            with self._transaction() as cur:
+                cur.execute(self._sql("SELECT request_data, file_content, raw_data_content FROM batch_queue_jobs WHERE job_id = ?"), (job_id,))
+                return cur.fetchone()
+
+        row = await self._run(_get)
+        if row is None:
+            return None
+        request_data = json.loads(row[0])
+        request_data["file_content"] = bytes(row[1]) if row[1] is not None else None
+        request_data["raw_data_content"] = bytes(row[2]) if row[2] is not None else None
+        return request_data
+
+    async def job_counts(self, job_id: str) -> Dict[str, int]:
+        """job의 질문 상태별 개수"""
+        def _counts():
+            with self._transaction() as cur:
+                cur.execute(self._sql("SELECT status, COUNT(*) FROM batch_queue_items WHERE job_id = ? GROUP BY status"), (job_id,))
+                return {status: count for status, count in cur.fetchall()}
+
+        return await self._run(_counts)
+
+    async def finish_job(self, job_id: str) -> bool:
+        """모든 질문이 끝난 job을 finished로 (여러 worker 중 한 곳만 True를 받아 마무리 처리)"""
+        def _finish():
+            with self._transaction() as cur:
+                cur.execute(
+                    self._sql("SELECT COUNT(*) FROM batch_queue_items WHERE job_id = ? AND status IN ('queued', 'leased')"),
+                    (job_id,)
+                )
+                if cur.fetchone()[0]:
+                    return False
+                cur.execute(self._sql("UPDATE batch_queue_jobs SET status = 'finished' WHERE job_id = ? AND status IN ('queued', 'cancelled')"), (job_id,))
+                return cur.rowcount > 0
+
+        return await self._run(_finish)
+
+
+class SQLiteBatchWorkQueue(BatchWorkQueue):
+    """로컬 SQLite 파일 큐 (같은 호스트의 여러 worker 프로세스가 공유 가능)"""
+
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS batch_queue_jobs (
+            job_id TEXT PRIMARY KEY,
+            request_data TEXT NOT NULL,
+            file_content BLOB,
+            raw_data_content BLOB,
+            status TEXT NOT NULL DEFAULT 'queued',
+            created_at REAL NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS batch_queue_items (
+            job_id TEXT NOT NULL,
+            question_key TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            enqueued_at REAL NOT NULL,
+            PRIMARY KEY (job_id, question_key)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_batch_queue_items_status ON batch_queue_items (status, enqueued_at, position)",
+    ]
+
+    def __init__(self, path: str = BATCH_QUEUE_SQLITE_PATH, **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        cur = self._conn.cursor()
+        # 쓰기 잠금을 먼저 잡아 여러 worker 프로세스의 claim이 겹치지 않도록 함
+        cur.execute("BEGIN IMMEDIATE")
+        try:
+            yield cur
+            cur.execute("COMMIT")
+        except Exception:
+            cur.execute("ROLLBACK")
+            raise
+        finally:
+            cur.close()
+
+
+class PostgresBatchWorkQueue(BatchWorkQueue):
+    """Postgres 큐 (여러 호스트의 worker가 공유, psycopg 필요)"""
+
+    PLACEHOLDER = "%s"
+    LOCK_CLAUSE = " FOR UPDATE SKIP LOCKED"
+    SCHEMA = [
+        """CREATE TABLE IF NOT EXISTS batch_queue_jobs (
+            job_id TEXT PRIMARY KEY,
+            request_data TEXT NOT NULL,
+            file_content BYTEA,
+            raw_data_content BYTEA,
+            status TEXT NOT NULL DEFAULT 'queued',
+            created_at DOUBLE PRECISION NOT NULL
+        )""",
+        """CREATE TABLE IF NOT EXISTS batch_queue_items (
+            job_id TEXT NOT NULL,
+            question_key TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            lease_owner TEXT,
+            lease_expires_at DOUBLE PRECISION,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            enqueued_at DOUBLE PRECISION NOT NULL,
+            PRIMARY KEY (job_id, question_key)
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_batch_queue_items_status ON batch_queue_items (status, enqueued_at, position)",
+    ]
+
+    def __init__(self, dsn: Optional[str] = BATCH_QUEUE_DSN, **kwargs):
+        super().__init__(**kwargs)
+        if not dsn:
+            raise ValueError("BATCH_QUEUE_BACKEND=postgres에는 BATCH_QUEUE_DSN 설정이 필요합니다.")
+        self.dsn = dsn
+
+    def _connect(self):
+        try:
+            import psycopg
+        except ImportError:
+            raise RuntimeError("Postgres 배치 큐를 사용하려면 psycopg 패키지를 설치해야 합니다.")
+        return psycopg.connect(self.dsn, autocommit=True)
+
+    @contextmanager
+    def _transaction(self):
+        with self._conn.transaction():
+            with self._conn.cursor() as cur:
+                yield cur
+
+
+_work_queue = None
+
+
+def get_work_queue():
+    """설정된 배치 큐 (inline이면 None: 웹 프로세스에서 바로 실행)"""
+    global _work_queue
+    if BATCH_QUEUE_BACKEND == "inline":
+        return None
+    if _work_queue is None:
+        if BATCH_QUEUE_BACKEND == "sqlite":
+            _work_queue = SQLiteBatchWorkQueue()
+        elif BATCH_QUEUE_BACKEND == "postgres":
+            _work_queue = PostgresBatchWorkQueue()
+        elif BATCH_QUEUE_BACKEND == "supabase":
+            from app.batch_analysis.infra.results_lease_queue import ResultsLeaseQueue
+            _work_queue = ResultsLeaseQueue()
+        else:
+            raise ValueError(f"알 수 없는 BATCH_QUEUE_BACKEND: {BATCH_QUEUE_BACKEND}")
+    return _work_queue
@@ -81,7 +81,8 @@ async def analyze_fgi(
             "chunk_summaries": result.chunk_summaries,
             "chunk_details": result.chunk_details if hasattr(result, 'chunk_details') else [],
             "final_summary": result.final_summary,
-            "file_name": file_name
+            "file_name": file_name,
+            "budget": result.budget
         }
         
     except HTTPException:
@@ -44,6 +44,7 @@ class FGIAnalysisResult:
     chunk_details: List[Dict[str, Any]] = field(default_factory=list)
     error: Optional[str] = None
     analysis_id: Optional[str] = None
+    budget: Optional[Dict[str, Any]] = None  # LLM 토큰/시간 사용량
     created_at: datetime = field(default_factory=datetime.now)
 
 
@@ -159,7 +159,7 @@ class FGIAnalysisService:
             {"role": "user", "content": prompt}
         ]
         
-        summary = await self.openai_client.call(messages)
+        summary = await self.openai_client.call(messages, route="fgi.chunk_summary")
         
         if on_step:
             on_step('[FGI] LLM 요약 완료')
@@ -190,7 +190,7 @@ class FGIAnalysisService:
             {"role": "user", "content": prompt}
         ]
         
-        summary = await self.openai_client.call(messages)
+        summary = await self.openai_client.call(messages, route="fgi.final_summary")
         return summary
     
     async def extract_guide_subjects_llm(self, file_content: bytes) -> List[str]:
@@ -228,7 +228,7 @@ class FGIAnalysisService:
                 {"role": "user", "content": prompt}
             ]
             
-            llm_response = await self.openai_client.call(messages)
+            llm_response = await self.openai_client.call(messages, route="fgi.extract_subjects")
             
             # LLM 응답을 줄 단위로 파싱 + 불필요한 줄 필터링
             filter_phrases = [
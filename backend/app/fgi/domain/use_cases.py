@@ -3,9 +3,17 @@ from app.fgi.domain.entities import FGIState, FGIAnalysisResult
 from app.fgi.domain.services import FGIAnalysisService
 from app.fgi.api.progress_utils import update_fgi_progress
 from app.fgi.api.ws_router import ws_send_progress
+from app.utils.llm_budget import LLMBudget
+from app.utils.tokens import count_tokens, truncate_tokens
+import os
 import uuid
 
 
+# 예산이 빠듯할 때(시간 기준) 최종 요약에 넣는 청크 요약 토큰 상한 / 최종 요약 출력용으로 남겨둘 토큰
+FGI_DEGRADED_SUMMARY_CONTEXT_TOKENS = int(os.getenv("FGI_DEGRADED_SUMMARY_CONTEXT_TOKENS", "6000"))
+FGI_FINAL_SUMMARY_OUTPUT_RESERVE = int(os.getenv("FGI_FINAL_SUMMARY_OUTPUT_RESERVE", "2000"))
+
+
 class FGIAnalysisUseCase:
     """FGI 분석 유스케이스"""
     
@@ -34,13 +42,16 @@ class FGIAnalysisUseCase:
                 raise Exception("지원하지 않는 파일 형식입니다. DOCX 또는 TXT 파일을 사용해주세요.")
             
             # 3. FGI 분석 실행
-            result = await self._analyze_fgi(state, on_step, job_id)
+            budget = LLMBudget(f"fgi:{job_id}")
+            with budget.activate():
+                result = await self._analyze_fgi(state, on_step, job_id, budget)
             
             return FGIAnalysisResult(
                 success=True,
                 chunk_summaries=result["chunk_summaries"],
                 final_summary=result["final_summary"],
-                chunk_details=result["chunk_details"]
+                chunk_details=result["chunk_details"],
+                budget=budget.finish()
             )
             
         except Exception as e:
@@ -52,7 +63,7 @@ class FGIAnalysisUseCase:
                 error=str(e)
             )
     
-    async def _analyze_fgi(self, state: FGIState, on_step=None, job_id=None) -> Dict[str, Any]:
+    async def _analyze_fgi(self, state: FGIState, on_step=None, job_id=None, budget: Optional[LLMBudget] = None) -> Dict[str, Any]:
         """FGI 분석 실행 (내부 메서드)"""
         import asyncio
         if on_step:
@@ -91,6 +102,15 @@ class FGIAnalysisUseCase:
                 await update_fgi_progress(job_id, f'청크 {i+1}/{total} 분석 중...', i+1, total)
                 print(f'[FGI] WebSocket 메시지 전송: 청크 {i+1}/{total} 분석 중... (job_id: {job_id})')  # 디버깅 로그 추가
                 await ws_send_progress(job_id, {"progress": f"청크 {i+1}/{total} 분석 중...", "current": i+1, "total": total})
+            if budget is not None and budget.exhausted():
+                # 예산 소진: 남은 청크는 LLM 호출 없이 원문 일부만 남김
+                budget.degrade("skip_chunk")
+                chunk_summaries.append({
+                    "chunk_index": i,
+                    "summary": "예산 초과로 요약 생략",
+                    "original_text": chunk[:500] + "..." if len(chunk) > 500 else chunk
+                })
+                continue
             try:
                 summary = await self.fgi_service.analyze_chunk_with_llm(chunk, on_step)
                 chunk_summaries.append({
@@ -142,7 +162,7 @@ class FGIAnalysisUseCase:
             await update_fgi_progress(job_id, '최종 요약 생성 중...', total, total)
             print(f'[FGI] WebSocket 메시지 전송: 최종 요약 생성 중... (job_id: {job_id})')  # 디버깅 로그 추가
             await ws_send_progress(job_id, {"progress": "최종 요약 생성 중...", "current": total, "total": total})
-        all_summaries = '\n\n'.join([cs["summary"] for cs in chunk_summaries])
+        all_summaries = self._fit_summaries_to_budget([cs["summary"] for cs in chunk_summaries], budget)
         
         try:
             final_summary = await self.fgi_service.create_final_summary_with_llm(
@@ -167,6 +187,23 @@ class FGIAnalysisUseCase:
             "final_summary": final_summary
         }
     
+    def _fit_summaries_to_budget(self, summaries: List[str], budget: Optional[LLMBudget]) -> str:
+        """최종 요약 프롬프트가 남은 예산을 넘지 않도록 청크 요약을 균등하게 절단"""
+        joined = '\n\n'.join(summaries)
+        if budget is None or not summaries:
+            return joined
+        limits = []
+        remaining = budget.remaining_tokens()
+        if remaining is not None:
+            limits.append(remaining - FGI_FINAL_SUMMARY_OUTPUT_RESERVE)
+        if budget.prefers_fast_mode():
+            limits.append(FGI_DEGRADED_SUMMARY_CONTEXT_TOKENS)
+        if not limits or count_tokens(joined) <= min(limits):
+            return joined
+        per_summary = max(50, min(limits) // len(summaries))
+        budget.degrade("truncate_context")
+        return '\n\n'.join(truncate_tokens(summary, per_summary) for summary in summaries)
+
     async def extract_guide_subjects(self, file_content: bytes) -> List[str]:
         """가이드 주제 추출"""
         try:
@@ -225,7 +225,7 @@ class GroupAnalysisService:
                 {"role": "system", "content": "당신은 FGI 분석 전문가입니다. 그룹별 분석 결과를 비교하여 인사이트를 도출하는 전문가입니다."},
                 {"role": "user", "content": prompt}
             ]
-            result_text = await self.openai_client.call(messages, model="gpt-4", temperature=0.3)
+            result_text = await self.openai_client.call(messages, temperature=0.3, route="group.topic_compare")
             
             # JSON 파싱 시도
             try:
@@ -275,7 +275,7 @@ class GroupAnalysisService:
                 {"role": "system", "content": "당신은 FGI 분석 전문가입니다. 주제별 분석 결과를 종합하여 전체적인 인사이트를 도출하는 전문가입니다."},
                 {"role": "user", "content": prompt}
             ]
-            result_text = await self.openai_client.call(messages, model="gpt-4", temperature=0.3)
+            result_text = await self.openai_client.call(messages, temperature=0.3, route="group.final_comparison")
             
             # JSON 파싱 시도
             try:
@@ -18,7 +18,7 @@ class FGIRagService:
             {"role": "system", "content": "FGI 회의록 기반 전문가. context에 없는 내용은 모른다고 답해."},
             {"role": "user", "content": prompt}
         ]
-        return await self.llm_client.call(messages)
+        return await self.llm_client.call(messages, route="rag.analyze_topic")
 
     def _build_prompt(self, topic: str, context: str, analysis_tone: str) -> str:
         if analysis_tone == "키워드 중심":
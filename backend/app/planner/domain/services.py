@@ -33,7 +33,7 @@ class PlannerService:
             {"role": "user", "content": prompt}
         ]
         
-        content = await self.openai_client.call(messages)
+        content = await self.openai_client.call(messages, route="planner.intro")
         print('[Planner] introAgentNode 응답', content)
         
         state.generated_objective = content
@@ -64,7 +64,7 @@ class PlannerService:
             {"role": "user", "content": prompt}
         ]
         
-        content = await self.openai_client.call(messages)
+        content = await self.openai_client.call(messages, route="planner.audience")
         print('[Planner] audienceAgentNode 응답', content)
         
         state.audience = content
@@ -96,7 +96,7 @@ class PlannerService:
             {"role": "user", "content": prompt}
         ]
         
-        content = await self.openai_client.call(messages)
+        content = await self.openai_client.call(messages, route="planner.structure")
         print('[Planner] structureAgentNode 응답', content)
         
         state.structure = content
@@ -129,7 +129,7 @@ class PlannerService:
             {"role": "user", "content": prompt}
         ]
         
-        content = await self.openai_client.call(messages)
+        content = await self.openai_client.call(messages, route="planner.questions")
         print('[Planner] questionAgentNode 응답', content)
         
         state.questions = content
@@ -161,7 +161,7 @@ class PlannerService:
             {"role": "user", "content": prompt}
         ]
         
-        content = await self.openai_client.call(messages)
+        content = await self.openai_client.call(messages, route="planner.analysis")
         print('[Planner] analysisAgentNode 응답', content)
         
         state.analysis = content
@@ -198,7 +198,7 @@ class PlannerService:
             {"role": "user", "content": prompt}
         ]
         
-        content = await self.openai_client.call(messages)
+        content = await self.openai_client.call(messages, route="planner.checklist")
         print('[Planner] surveyValidationChecklistNode 응답', content)
         
         # 빈 응답 처리
@@ -5,6 +5,9 @@ import os
 from dotenv import load_dotenv
 from pydantic import SecretStr
 
+from app.utils.llm_gateway import get_llm_gateway
+from app.utils.llm_resilience import LLMError
+
 load_dotenv()
 
 
@@ -12,23 +15,21 @@ class OpenAIClient:
     """OpenAI LLM 클라이언트"""
     
     def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.3):
-        self.llm = ChatOpenAI(
-            model=model,
-            temperature=temperature,
-            api_key=SecretStr(os.getenv("OPENAI_API_KEY"))
-        )
+        self.default_model = model
+        self.default_temperature = temperature
     
-    async def call(self, messages: List[Dict[str, str]], model: str = "gpt-4o-mini", temperature: float = 0.3) -> str:
-        """OpenAI API 호출"""
+    async def call(self, messages: list[dict[str, str]], model: str = "gpt-4o-mini", temperature: float = 0.3, route: str = None) -> str:
+        """OpenAI API 호출 (공용 LLM gateway 경유, route: 노드별 모델/타임아웃/hedge 설정 이름)"""
         try:
-            langchain_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                else:
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
-            
-            response = await self.llm.ainvoke(langchain_messages)
-            return response.content.strip()
+            # model, temperature 파라미터를 우선 사용, 없으면 기본값 사용
+            return await get_llm_gateway().chat(
+                messages,
+                model=model or self.default_model,
+                temperature=temperature if temperature is not None else self.default_temperature,
+                route=route
+            )
+        except LLMError:
+            # transient/fatal 구분과 route 정보를 유지한 채 전달
+            raise
         except Exception as e:
             raise Exception(f"OpenAI API 호출 실패: {str(e)}") 
\ No newline at end of file
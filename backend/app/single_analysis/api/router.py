@@ -1,9 +1,13 @@
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+from collections import OrderedDict
+from typing import Dict
+import hashlib
 from app.single_analysis.domain.use_cases import TableAnalysisUseCase
 from app.single_analysis.domain.services import TableAnalysisService
 from app.single_analysis.infra.openai_client import OpenAIClient
 from app.single_analysis.infra.excel_loader import ExcelLoader
 from app.single_analysis.infra.statistical_test import StatisticalTester
+from app.single_analysis.application.job_manager import table_analysis_jobs
 
 router = APIRouter(prefix="", tags=["single-analysis"])
 
@@ -76,6 +80,11 @@ async def parse_table(
         print(f"[parse] 오류 발생: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# 워크북 해시별 추천 결과 캐시 (같은 파일 재업로드 시 재분류하지 않음)
+_test_type_map_cache: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+_TEST_TYPE_MAP_CACHE_MAX = 64
+
+
 @router.post("/recommend-test-types")
 async def recommend_test_types(
     file: UploadFile = File(...),
@@ -86,7 +95,6 @@ async def recommend_test_types(
     """통계 검정 방법 추천 엔드포인트"""
     try:
         excel_loader = ExcelLoader()
-        openai_client = OpenAIClient()
         file_content = await file.read()
         
         # 파일 파싱
@@ -103,60 +111,33 @@ async def recommend_test_types(
                 "test_type_map": test_type_map
             }
         
-        # 통계 검정 사용 시 LLM으로 추천
-        test_type_map = {}
-        for key in question_keys:
-            if key in tables and key in question_texts:
-                table = tables[key]
-                question_text = question_texts[key]
-                
-                # LLM으로 통계 검정 방법 추천
-                prompt = f"""
-당신은 통계 전문가입니다.
-
-아래는 설문 문항과 열 이름 목록입니다.
-
-문항: {question_text}
-열 이름: {', '.join(table.columns.tolist())}
-
-당신의 임무는, 이 문항이 아래 중 어떤 통계 분석 유형에 해당하는지 분류하는 것입니다.
-
-📋 분류 기준:
-
-1️⃣ **manual** (복수응답/다중응답/순위형):
-    - 한 응답자가 여러 항목을 선택하거나, 여러 순위를 동시에 응답하는 경우
-    - 예시: "복수응답", "다중응답", "1+2순위", "1+2+3순위", "ranking", "우선순위(1+2)", "다중선택", "모두선택"
-    - 문항에 "복수", "다중", "multiple", "ranking" 등이 포함된 경우
-
-2️⃣ **ft_test** (연속형 수치 응답):
-    - 문항이 1~5점 척도, 평균, 비율, 점수 등 숫자 기반으로 요약되어 있는 경우
-    - 예시 열 이름: "평균", "만족도 점수", "~% 비율", "5점 척도", "평균 점수", "관심도 평균"
-    - "전혀 관심이 없다", "매우 관심 있다" 등은 실제로는 선택지이지만, 빈도나 비율로 수치화되었을 경우 → 연속형으로 판단
-
-3️⃣ **chi_square** (범주형 선택 응답):
-    - 문항이 응답자들이 특정 항목을 **선택**하거나 **다중선택**한 결과일 경우
-    - 예시 열 이름: "주요 이용시설", "선택 이유", "가장 많이 선택한 장소", "다중 응답"
-    - 단일 선택 문항 (한 명이 한 항목만 선택하는 경우)
-
-아래 중 하나로만 답변하세요(설명 없이):
-- manual
-- ft_test  
-- chi_square
-"""
-                
-                messages = [
-                    {"role": "system", "content": "당신은 통계 분석 전문가입니다."},
-                    {"role": "user", "content": prompt}
-                ]
-                
-                response = await openai_client.call(messages)
-                test_type = response.strip().lower()
-                
-                # 응답 검증
-                if test_type not in ["manual", "ft_test", "chi_square"]:
-                    test_type = "ft_test"  # 기본값
-                
-                test_type_map[key] = test_type
+        cache_key = hashlib.sha256(file_content).hexdigest() + ":" + lang
+        cached = _test_type_map_cache.get(cache_key)
+        if cached is not None:
+            _test_type_map_cache.move_to_end(cache_key)
+            print(f"[recommend_test_types] 워크북 캐시 사용 ({len(cached)}개 질문)")
+            return {
+                "success": True,
+                "test_type_map": dict(cached),
+                "cached": True
+            }
+        
+        # 통계 검정 사용 시: 로컬 분류기 → 저신뢰 질문만 샤드 단위 다중 질문 프롬프트로 동시 분류
+        service = TableAnalysisService(OpenAIClient(), excel_loader, StatisticalTester())
+        question_infos = [
+            {
+                "key": key,
+                "text": question_texts[key],
+                "columns": [str(c) for c in tables[key].columns.tolist()]
+            }
+            for key in question_keys
+            if key in tables and key in question_texts
+        ]
+        test_type_map = await service.decide_batch_test_types(question_infos, lang)
+        
+        _test_type_map_cache[cache_key] = dict(test_type_map)
+        while len(_test_type_map_cache) > _TEST_TYPE_MAP_CACHE_MAX:
+            _test_type_map_cache.popitem(last=False)
         
         return {
             "success": True,
@@ -194,4 +175,59 @@ async def analyze_table(
         result = await use_case.execute(file_content, file.filename or "unknown_file", options)
         return result
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@router.post("/analyze/submit")
+async def submit_table_analysis(
+    file: UploadFile = File(...),
+    analysis_type: bool = Form(True),
+    selected_key: str = Form(""),
+    lang: str = Form("한국어"),
+    user_id: str = Form(None),
+    use_statistical_test: str = Form("true")
+):
+    """테이블 분석 비동기 제출 (job_id 즉시 반환, 진행상황은 /ws/table-analysis-progress/{job_id})"""
+    try:
+        service = TableAnalysisService(OpenAIClient(), ExcelLoader(), StatisticalTester())
+        use_case = TableAnalysisUseCase(service)
+        use_statistical_test_bool = use_statistical_test.lower() == "true"
+        file_content = await file.read()
+        file_name = file.filename or "unknown_file"
+
+        async def runner(on_step):
+            options = {
+                "analysis_type": analysis_type,
+                "selected_key": selected_key,
+                "lang": lang,
+                "user_id": user_id,
+                "use_statistical_test": use_statistical_test_bool,
+                "on_step": on_step
+            }
+            return await use_case.execute(file_content, file_name, options, use_statistical_test=use_statistical_test_bool)
+
+        job = table_analysis_jobs.submit(runner, user_id=user_id)
+        return {"success": True, "job_id": job.id, "status": job.status}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/analyze/status")
+async def get_table_analysis_status(job_id: str = Query(...)):
+    """테이블 분석 job 상태 조회 (polling)"""
+    job = table_analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="해당 job_id의 분석 작업이 없습니다.")
+    return {"success": True, **job.snapshot()}
+
+
+@router.get("/analyze/result")
+async def get_table_analysis_result(job_id: str = Query(...)):
+    """완료된 테이블 분석 결과 조회"""
+    job = table_analysis_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="해당 job_id의 분석 작업이 없습니다.")
+    if job.status == "error":
+        return {"success": False, "job_id": job.id, "status": job.status, "error": job.error}
+    if job.status != "done":
+        raise HTTPException(status_code=409, detail=f"분석이 아직 완료되지 않았습니다. (status: {job.status})")
+    return {"success": True, "job_id": job.id, "status": job.status, "result": job.result}
@@ -0,0 +1,119 @@
+from typing import Dict, Any, Optional, Callable, Awaitable, List
+from datetime import datetime
+import asyncio
+import os
+import time
+import uuid
+from app.single_analysis.api.ws_router import ws_send_table_progress
+
+
+# 동시에 실행되는 단일 분석 job 수 상한 / 완료된 job 보관 시간
+TABLE_ANALYSIS_MAX_JOBS = int(os.getenv("TABLE_ANALYSIS_MAX_JOBS", "4"))
+TABLE_ANALYSIS_JOB_TTL_SECONDS = int(os.getenv("TABLE_ANALYSIS_JOB_TTL_SECONDS", "3600"))
+
+
+class TableAnalysisJob:
+    """단일 테이블 분석 비동기 job"""
+    def __init__(self, **kwargs):
+        self.id = kwargs.get("id", str(uuid.uuid4()))
+        self.user_id = kwargs.get("user_id", None)
+        self.status = kwargs.get("status", "pending")  # pending, running, done, error
+        self.steps: List[str] = kwargs.get("steps", [])
+        self.result: Optional[Dict[str, Any]] = kwargs.get("result", None)
+        self.error: Optional[str] = kwargs.get("error", None)
+        self.created_at = kwargs.get("created_at", datetime.utcnow())
+        self.updated_at = kwargs.get("updated_at", datetime.utcnow())
+        self.finished_at: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "steps": list(self.steps),
+            "current_step": self.steps[-1] if self.steps else None,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "updated_at": self.updated_at.isoformat(),
+        }
+
+
+class TableAnalysisJobManager:
+    """단일 분석 job을 백그라운드 태스크로 실행하고 진행상황을 WebSocket으로 push"""
+
+    def __init__(self, max_concurrent_jobs: int = TABLE_ANALYSIS_MAX_JOBS, ttl_seconds: int = TABLE_ANALYSIS_JOB_TTL_SECONDS):
+        self.jobs: Dict[str, TableAnalysisJob] = {}
+        self.ttl_seconds = ttl_seconds
+        self._slots = asyncio.Semaphore(max_concurrent_jobs)
+
+    def get(self, job_id: str) -> Optional[TableAnalysisJob]:
+        return self.jobs.get(job_id)
+
+    def submit(self, runner: Callable[[Callable[[str], None]], Awaitable[Dict[str, Any]]], user_id: Optional[str] = None) -> TableAnalysisJob:
+        """runner(on_step)를 백그라운드에서 실행하고 job을 즉시 반환"""
+        self._prune()
+        job = TableAnalysisJob(user_id=user_id)
+        self.jobs[job.id] = job
+        job.task = asyncio.create_task(self._run(job, runner))
+        return job
+
+    async def _push(self, job: TableAnalysisJob, data: Dict[str, Any]) -> None:
+        try:
+            await ws_send_table_progress(job.id, data)
+        except Exception as e:
+            print(f"[table_analysis_job] WebSocket 전송 실패 (job_id: {job.id}): {e}")
+
+    async def _run(self, job: TableAnalysisJob, runner) -> None:
+        loop = asyncio.get_running_loop()
+
+        def on_step(message: str) -> None:
+            job.steps.append(message)
+            job.updated_at = datetime.utcnow()
+            loop.create_task(self._push(job, {
+                "job_id": job.id,
+                "status": job.status,
+                "step": message,
+                "current": len(job.steps)
+            }))
+
+        async with self._slots:
+            job.status = "running"
+            job.updated_at = datetime.utcnow()
+            await self._push(job, {"job_id": job.id, "status": "running", "current": 0})
+            try:
+                result = await runner(on_step)
+                if result.get("success"):
+                    job.status = "done"
+                    job.result = result.get("result")
+                else:
+                    job.status = "error"
+                    job.error = result.get("error", "분석 실패")
+            except Exception as e:
+                print(f"[table_analysis_job] 실행 오류 (job_id: {job.id}): {e}")
+                job.status = "error"
+                job.error = str(e)
+            finally:
+                job.updated_at = datetime.utcnow()
+                job.finished_at = time.monotonic()
+                job.task = None
+        await self._push(job, {
+            "job_id": job.id,
+            "status": job.status,
+            "done": job.status == "done",
+            "error": job.error,
+            "current": len(job.steps)
+        })
+
+    def _prune(self) -> None:
+        """TTL이 지난 완료 job 정리"""
+        now = time.monotonic()
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job.finished_at is not None and now - job.finished_at > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
+
+
+# 프로세스 단위 job 레지스트리
+table_analysis_jobs = TableAnalysisJobManager()
@@ -14,13 +14,18 @@ class AgentState:
         self.selected_key = kwargs.get("selected_key", "")
         self.anchor = kwargs.get("anchor", [])
         self.linearized_table = kwargs.get("linearized_table", "")
+        self.linearized_table_stats = kwargs.get("linearized_table_stats", {})
         self.numeric_analysis = kwargs.get("numeric_analysis", "")
         self.table_analysis = kwargs.get("table_analysis", "")
         self.revised_analysis = kwargs.get("revised_analysis", "")
         self.hallucination_check = kwargs.get("hallucination_check", "")
         self.hallucination_reject_num = kwargs.get("hallucination_reject_num", 0)
         self.feedback = kwargs.get("feedback", "")
+        self.fact_check_mismatches = kwargs.get("fact_check_mismatches", [])
         self.polishing_result = kwargs.get("polishing_result", "")
+        self.speculative_polish = kwargs.get("speculative_polish", None)  # used, cancelled, failed
+        self.analysis_mode = kwargs.get("analysis_mode", "full")  # full, fast
+        self.fast_verdict = kwargs.get("fast_verdict", None)  # accept, reject
         self.generated_hypotheses = kwargs.get("generated_hypotheses", "")
         self.uploaded_file = kwargs.get("uploaded_file", None)
         self.raw_data_file = kwargs.get("raw_data_file", None)
@@ -40,6 +45,34 @@ class AgentState:
         self.user_id = kwargs.get("user_id", None)
         self.survey_data = kwargs.get("survey_data", None)
         self.use_statistical_test = kwargs.get("use_statistical_test", True)
+        self.context = kwargs.get("context", None)  # AnalysisContext (배치 job 단위로 한 번 파싱한 입력)
+
+
+class AnalysisContext:
+    """job 단위로 한 번만 파싱해 질문별 파이프라인이 공유하는 입력 (통계표, 키 인덱스, raw data, demo 매핑)
+
+    질문별 파이프라인은 읽기만 하므로 동시에 실행되는 질문들이 같은 객체를 공유해도 된다.
+    """
+    def __init__(self, **kwargs):
+        self.file_name = kwargs.get("file_name", "")
+        self.tables: Dict[str, pd.DataFrame] = kwargs.get("tables", {})
+        self.question_texts: Dict[str, str] = kwargs.get("question_texts", {})
+        self.question_keys: List[str] = kwargs.get("question_keys", [])
+        self.raw_data: Optional[pd.DataFrame] = kwargs.get("raw_data", None)  # DATA 시트 (컬럼명 정규화)
+        self.demo_mapping: Dict[str, str] = kwargs.get("demo_mapping", {})  # DEMO 시트
+        self.key_index: Dict[str, str] = {self.index_key(key): key for key in self.question_keys}
+
+    @staticmethod
+    def index_key(key: str) -> str:
+        return str(key).strip().replace('-', '_').replace('.', '_').upper()
+
+    def lookup_key(self, key: str) -> Optional[str]:
+        """정규화 키로 즉시 조회 (없으면 None → 호출부에서 유사도 매칭)"""
+        return self.key_index.get(self.index_key(key))
+
+    @property
+    def has_raw_data(self) -> bool:
+        return self.raw_data is not None
 
 
 class TableAnalysisRequest(BaseModel):
@@ -0,0 +1,223 @@
+from typing import List, Dict, Any, Set, Optional
+from dataclasses import dataclass, field
+import re
+import pandas as pd
+
+
+# 숫자 뒤에 붙으면 수치가 아닌 서수/개수/날짜로 보는 접미사
+ORDINAL_SUFFIX_PATTERN = r"\s*(순위|위|개|가지|번째|차|단계|년|월|일|분기|대(?!비))"
+# 그룹 간 차이(%p) 표현
+DIFF_SUFFIX_PATTERN = r"\s*(%\s*p|%\s*포인트|포인트|pp)"
+NUMBER_PATTERN = r"(?<![\w.])(\d+(?:\.\d+)?)(?!\d)"
+# 문장 경계 (소수점은 제외)
+SENTENCE_SPLIT_PATTERN = r"[!?。\n]|\.(?!\d)"
+
+
+@dataclass
+class FactCheckResult:
+    """로컬 수치/그룹 검증 결과"""
+    verdict: str  # pass, fail, inconclusive
+    mismatches: List[str] = field(default_factory=list)
+    numbers_checked: int = 0
+    numbers_verified: int = 0
+    groups_checked: int = 0
+
+    def feedback(self, lang: str = "한국어") -> str:
+        """수정 노드에 전달할 피드백 문자열"""
+        if not self.mismatches:
+            return ""
+        header = "표/통계 결과와 일치하지 않는 내용:" if lang == "한국어" else "Statements inconsistent with the table/test results:"
+        return header + "\n" + "\n".join(f"- {m}" for m in self.mismatches)
+
+
+class NumericFactChecker:
+    """초안에 언급된 숫자와 그룹명을 파싱된 표와 ft_test_result에 대조하는 로컬 검증기
+
+    숫자는 같은 문장에 언급된 그룹의 행(과 그 그룹의 검정 결과)에 대조하고, 그룹 언급은 유의성에 대조한다.
+    숫자가 하나 이상 있고 모든 숫자와 그룹 언급이 확인된 경우에만 pass, 표 어디에도 없는 숫자나 잘못된 그룹 언급은 fail,
+    그 밖에 확인할 수 없는 내용이 있으면 inconclusive를 반환하여 LLM 감사로 넘긴다.
+    """
+
+    def __init__(self, group_column: str = "대분류", sub_group_column: str = "소분류"):
+        self.group_column = group_column
+        self.sub_group_column = sub_group_column
+
+    @staticmethod
+    def _norm(text: Any) -> str:
+        return re.sub(r"\s+", "", str(text)) if text is not None else ""
+
+    def _records(self, ft_test_result) -> List[Dict[str, Any]]:
+        if isinstance(ft_test_result, pd.DataFrame):
+            return ft_test_result.to_dict(orient="records")
+        if isinstance(ft_test_result, list):
+            return [r for r in ft_test_result if isinstance(r, dict)]
+        return []
+
+    @staticmethod
+    def _record_numbers(record: Dict[str, Any]) -> Set[float]:
+        numbers: Set[float] = set()
+        for value in record.values():
+            if isinstance(value, (int, float)) and not pd.isna(value):
+                numbers.add(float(value))
+            else:
+                for token in re.findall(NUMBER_PATTERN, str(value)):
+                    numbers.add(float(token))
+        return numbers
+
+    def _label_rows(self, table: pd.DataFrame) -> Dict[str, Dict[str, Any]]:
+        """정규화된 그룹 라벨 -> {group: 상위 대분류, rows: 행 번호 목록} (대분류는 소속 행 전체, '전체' 포함)"""
+        labels: Dict[str, Dict[str, Any]] = {}
+        if self.group_column not in table.columns:
+            return labels
+        has_sub = self.sub_group_column in table.columns
+        for idx in range(len(table)):
+            group = self._norm(table[self.group_column].iloc[idx])
+            if not group or group == "nan":
+                continue
+            labels.setdefault(group, {"group": group, "rows": []})["rows"].append(idx)
+            if has_sub:
+                sub = self._norm(table[self.sub_group_column].iloc[idx])
+                if sub and sub != "nan" and sub != group:
+                    labels.setdefault(sub, {"group": group, "rows": []})["rows"].append(idx)
+        return labels
+
+    def _significance(self, records: List[Dict[str, Any]]) -> Dict[str, bool]:
+        """검정 결과의 대분류 라벨별 유의성 (manual 결과의 '대분류 - 소분류'는 대분류로 합침)"""
+        significance: Dict[str, bool] = {}
+        for record in records:
+            label = str(record.get("대분류", ""))
+            if not label:
+                continue
+            group = self._norm(label.split(" - ")[0])
+            significant = bool(str(record.get("유의성", "")).strip())
+            significance[group] = significance.get(group, False) or significant
+        return significance
+
+    def _matches(self, value: float, decimals: int, known) -> bool:
+        tolerance = 0.5 * (10 ** -decimals) + 1e-9
+        return any(abs(value - k) <= tolerance for k in known)
+
+    def verify(self, draft: str, table: Optional[pd.DataFrame], ft_test_result=None, lang: str = "한국어") -> FactCheckResult:
+        """초안 검증 (pass: LLM 감사 생략, fail: 불일치 목록과 함께 수정, inconclusive: LLM 감사)"""
+        if not draft or table is None or not isinstance(table, pd.DataFrame) or table.empty:
+            return FactCheckResult(verdict="inconclusive")
+
+        records = self._records(ft_test_result)
+        labels = self._label_rows(table)
+        significance = self._significance(records)
+        mismatches: List[str] = []
+        unverified = False
+
+        # 행별 수치, 그룹별 검정 결과 수치, 표 전체 수치
+        numeric = table.apply(lambda col: pd.to_numeric(col, errors="coerce"))
+        value_columns = [c for c in numeric.columns if c not in (self.group_column, self.sub_group_column) and numeric[c].notna().any()]
+        row_values = [
+            {c: float(numeric[c].iloc[idx]) for c in value_columns if not pd.isna(numeric[c].iloc[idx])}
+            for idx in range(len(table))
+        ]
+        record_numbers: Dict[str, Set[float]] = {}
+        for record in records:
+            label = str(record.get("대분류", ""))
+            for part in [label.split(" - ")[0]] + ([label.split(" - ", 1)[1]] if " - " in label else []):
+                record_numbers.setdefault(self._norm(part), set()).update(self._record_numbers(record))
+        all_numbers: Set[float] = {v for row in row_values for v in row.values()}
+        for numbers in record_numbers.values():
+            all_numbers.update(numbers)
+        header_numbers = {float(t) for c in table.columns for t in re.findall(NUMBER_PATTERN, str(c))}
+
+        # 1. 문장마다 그룹 언급을 찾고 (긴 라벨부터, 매칭된 부분은 숫자 추출에서 제외) 숫자를 그 그룹의 행에 대조
+        mentioned_groups: Set[str] = set()
+        numbers_checked = 0
+        numbers_verified = 0
+        for sentence in re.split(SENTENCE_SPLIT_PATTERN, draft):
+            cited: List[str] = []
+            stripped = sentence
+            for label in sorted(labels.keys(), key=len, reverse=True):
+                if len(label) < 2 or label not in self._norm(stripped):
+                    continue
+                cited.append(label)
+                stripped = re.sub(r"\s*".join(map(re.escape, label)), " ", stripped)
+            mentioned_groups.update(labels[label]["group"] for label in cited if labels[label]["group"] != "전체")
+            cited_rows = sorted({idx for label in cited for idx in labels[label]["rows"]})
+            cited_numbers = {v for idx in cited_rows for v in row_values[idx].values()}
+            for label in cited:
+                cited_numbers.update(record_numbers.get(label, set()))
+
+            for match in re.finditer(NUMBER_PATTERN, stripped):
+                rest = stripped[match.end():]
+                if re.match(ORDINAL_SUFFIX_PATTERN, rest):
+                    continue
+                token = match.group(1)
+                value = float(token)
+                decimals = len(token.split(".")[1]) if "." in token else 0
+                numbers_checked += 1
+                if re.match(DIFF_SUFFIX_PATTERN, rest):
+                    # 차이값은 언급된 그룹 행끼리 같은 컬럼에서만 계산 (확인 안 되면 LLM 감사)
+                    diffs = {
+                        abs(row_values[a][c] - row_values[b][c])
+                        for i, a in enumerate(cited_rows) for b in cited_rows[i + 1:]
+                        for c in row_values[a].keys() & row_values[b].keys()
+                    }
+                    if self._matches(value, decimals, diffs):
+                        numbers_verified += 1
+                    else:
+                        unverified = True
+                    continue
+                if cited:
+                    if self._matches(value, decimals, cited_numbers):
+                        numbers_verified += 1
+                        continue
+                    # 그룹 하나만 언급된 문장의 숫자가 그 그룹 행에 없으면 다른 행의 값이어도 오류
+                    if len(cited) == 1 or not self._matches(value, decimals, all_numbers):
+                        mismatches.append(
+                            f"수치 {token}는 '{cited[0] if len(cited) == 1 else ', '.join(cited)}'의 표/검정 결과 값과 다름" if lang == "한국어"
+                            else f"Number {token} does not match the table/test results for '{cited[0] if len(cited) == 1 else ', '.join(cited)}'"
+                        )
+                    else:
+                        unverified = True
+                    continue
+                if self._matches(value, decimals, all_numbers) or self._matches(value, decimals, header_numbers):
+                    # 어느 그룹의 값인지 알 수 없음
+                    unverified = True
+                else:
+                    mismatches.append(
+                        f"수치 {token}는 표나 검정 결과에서 확인되지 않음" if lang == "한국어"
+                        else f"Number {token} does not appear in the table or test results"
+                    )
+
+        # 2. 그룹 언급 검증 (유의성 정보가 있는 그룹만 확인됨으로 봄)
+        has_significant = any(significance.values())
+        if has_significant:
+            sig_groups = {g for g, s in significance.items() if s}
+            for group in sorted(mentioned_groups):
+                if group in significance and not significance[group]:
+                    mismatches.append(
+                        f"'{group}'는 통계적으로 유의하지 않은 대분류인데 요약에 언급됨" if lang == "한국어"
+                        else f"'{group}' is not statistically significant but is mentioned"
+                    )
+            # 모든 대분류가 유의한 경우 '모두 중요' 요약이 허용되므로 누락 검사 생략
+            if len(sig_groups) < len(significance):
+                for group in sorted(sig_groups):
+                    if group in labels and group not in mentioned_groups:
+                        mismatches.append(
+                            f"통계적으로 유의한 대분류 '{group}'가 요약에 없음" if lang == "한국어"
+                            else f"Significant group '{group}' is missing from the summary"
+                        )
+        if any(not significance.get(group) for group in mentioned_groups):
+            unverified = True
+
+        groups_checked = len(mentioned_groups)
+        if mismatches:
+            verdict = "fail"
+        elif unverified or numbers_checked == 0 or numbers_verified < numbers_checked:
+            # 숫자 없이 그룹만 언급한 초안의 방향/비교 주장은 로컬에서 확인할 수 없으므로 LLM 감사
+            verdict = "inconclusive"
+        else:
+            verdict = "pass"
+        return FactCheckResult(
+            verdict=verdict,
+            mismatches=mismatches,
+            numbers_checked=numbers_checked,
+            numbers_verified=numbers_verified,
+            groups_checked=groups_checked
+        )
@@ -1,28 +1,53 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
-from app.single_analysis.domain.entities import AgentState
+from app.single_analysis.domain.entities import AgentState, AnalysisContext
 from app.single_analysis.infra.openai_client import OpenAIClient
 from app.single_analysis.infra.excel_loader import ExcelLoader
 from app.single_analysis.infra.statistical_test import StatisticalTester
+from app.single_analysis.domain.test_type_classifier import TestTypeClassifier, VALID_TEST_TYPES
+from app.single_analysis.domain.fact_checker import NumericFactChecker
+from app.single_analysis.domain.table_encoder import CompactTableEncoder
+from app.utils.tokens import count_tokens, truncate_tokens
+from app.utils.llm_resilience import LLMFatalError
+import asyncio
+import json
 import re
 
 
 class TableAnalysisService:
     """테이블 분석 비즈니스 로직 서비스"""
+
+    # decide_batch_test_types 다중 질문 프롬프트 샤드 크기
+    TEST_TYPE_SHARD_TOKEN_BUDGET = 1500
+    TEST_TYPE_SHARD_MAX_QUESTIONS = 40
+    # 응답에서 빠진 질문만 다시 묻는 횟수 / 잘림·컨텍스트 초과 시 줄일 수 있는 최소 샤드 예산
+    TEST_TYPE_REASK_ROUNDS = 2
+    TEST_TYPE_MIN_SHARD_TOKEN_BUDGET = 200
+    # 샤드 프롬프트에 넣는 질문 텍스트 최대 토큰 (긴 질문이 샤드 예산을 다 쓰지 않도록)
+    TEST_TYPE_QUESTION_MAX_TOKENS = 80
     
-    def __init__(self, openai_client: OpenAIClient, excel_loader: ExcelLoader, statistical_tester: StatisticalTester):
+    def __init__(self, openai_client: OpenAIClient, excel_loader: ExcelLoader, statistical_tester: StatisticalTester, table_token_budget: Optional[int] = None, compact_table: bool = True):
         self.openai_client = openai_client
         self.excel_loader = excel_loader
         self.statistical_tester = statistical_tester
+        self.test_type_classifier = TestTypeClassifier()
+        self.fact_checker = NumericFactChecker()
+        self.table_encoder = CompactTableEncoder(token_budget=table_token_budget)
+        self.compact_table = compact_table
     
     async def parse_table(self, state: AgentState, on_step=None) -> AgentState:
         """테이블 파서 노드""" 
         if on_step:
             on_step("📊 테이블 파서 노드 시작")
         
-        # 파일에서 테이블 파싱
-        if state.uploaded_file:
+        # 파일에서 테이블 파싱 (배치는 job context에 이미 파싱된 테이블 사용)
+        context = getattr(state, 'context', None)
+        if context is not None:
+            state.tables = context.tables
+            state.question_texts = context.question_texts
+            state.question_keys = context.question_keys
+        elif state.uploaded_file:
             parsed_data = self.excel_loader.load_survey_tables(
                 state.uploaded_file,
                 state.file_path
@@ -33,7 +58,9 @@ class TableAnalysisService:
         
         # 선택된 키 매칭
         if state.selected_key and state.tables:
-            matching_key = self.excel_loader.find_matching_key(state.selected_key, list(state.tables.keys()))
+            matching_key = context.lookup_key(state.selected_key) if context is not None else None
+            if matching_key is None:
+                matching_key = self.excel_loader.find_matching_key(state.selected_key, list(state.tables.keys()))
             if matching_key:
                 state.selected_key = matching_key
                 state.selected_table = state.tables[matching_key]
@@ -46,9 +73,16 @@ class TableAnalysisService:
                 state.selected_table = state.tables[state.selected_key]
                 state.selected_question = state.question_texts[state.selected_key]
         
-        # 테이블 선형화
+        # 테이블 선형화 (토큰 예산 기반 압축 인코딩)
         if state.selected_table is not None:
-            state.linearized_table = self.linearize_row_wise(state.selected_table)
+            if self.compact_table:
+                encoding = self.table_encoder.encode(state.selected_table)
+                state.linearized_table = encoding.text
+                state.linearized_table_stats = encoding.stats()
+            else:
+                state.linearized_table = self.linearize_row_wise(state.selected_table)
+                state.linearized_table_stats = {"tokens": count_tokens(state.linearized_table)}
+            print(f"[parse_table] 선형화 토큰: {state.linearized_table_stats['tokens']}")
         
         return state
     
@@ -149,11 +183,11 @@ class TableAnalysisService:
             {"role": "user", "content": prompt}
         ]
 
-        state.generated_hypotheses = await self.openai_client.call(messages)
+        state.generated_hypotheses = await self.openai_client.call(messages, route="generate_hypothesis")
         return state
     
     async def decide_test_type(self, state: AgentState, on_step=None) -> AgentState:
-        """통계 검정 방법 LLM 단일 분류 노드 (manual/ft_test/chi_square)"""
+        """통계 검정 방법 분류 노드 (manual/ft_test/chi_square, 로컬 분류기 저신뢰 시 LLM)"""
         if on_step:
             on_step("🧭 통계 검정 결정 노드 시작")
         
@@ -165,12 +199,22 @@ class TableAnalysisService:
             state.test_type = "manual"
             return state
         
-        # 통계 검정 사용 시: 기존 LLM 로직
+        # 통계 검정 사용 시: 로컬 분류기 우선, 저신뢰인 경우에만 LLM
         if state.selected_table is not None:
-            columns = state.selected_table.columns.tolist()
+            columns = [str(c) for c in state.selected_table.columns.tolist()]
             question_text = getattr(state, 'selected_question', "")
-            column_names_str = ", ".join(columns)
-            TEST_TYPE_PROMPT = """
+            decision = await self.test_type_classifier.decide(
+                question_text,
+                columns,
+                lambda: self._llm_decide_test_type(question_text, columns)
+            )
+            state.test_type = decision.test_type
+        return state
+
+    async def _llm_decide_test_type(self, question_text: str, columns: List[str]) -> str:
+        """LLM 단일 분류 호출 (원본 응답 반환)"""
+        column_names_str = ", ".join(columns)
+        TEST_TYPE_PROMPT = """
 당신은 통계 전문가입니다.
 
 아래는 설문 문항과 열 이름 목록입니다.
@@ -212,44 +256,32 @@ class TableAnalysisService:
 - ft_test  
 - chi_square
 """
-            prompt = TEST_TYPE_PROMPT.format(
-                question_text=question_text,
-                column_names=column_names_str
-            )
-            messages = [
-                {"role": "system", "content": "당신은 통계 전문가입니다."},
-                {"role": "user", "content": prompt}
-            ]
-            llm_result = await self.openai_client.call(messages)
-            llm_output = llm_result.strip().lower()
-            if "manual" in llm_output:
-                state.test_type = "manual"
-            elif "chi" in llm_output:
-                state.test_type = "chi_square"
-            elif "ft" in llm_output:
-                state.test_type = "ft_test"
-            else:
-                state.test_type = "unknown"
-        return state
+        prompt = TEST_TYPE_PROMPT.format(
+            question_text=question_text,
+            column_names=column_names_str
+        )
+        messages = [
+            {"role": "system", "content": "당신은 통계 전문가입니다."},
+            {"role": "user", "content": prompt}
+        ]
+        return await self.openai_client.call(messages, route="decide_test_type")
     
     async def run_statistical_analysis(self, state: AgentState, on_step=None) -> AgentState:
         """통계 분석 실행 노드"""
         if on_step:
             on_step("✅ F/T 분석 노드 시작")
         try:
-            from io import BytesIO
             use_statistical_test = getattr(state, 'use_statistical_test', True)
+            context = getattr(state, 'context', None)
+            has_context_raw_data = context is not None and context.has_raw_data
             
-            if use_statistical_test and hasattr(state, 'raw_data_file') and state.raw_data_file is not None:
-                # 통계 검정 사용 시: Raw Data를 사용한 통계 분석
-                print("[ft_analysis_node] raw_data_file exists - 통계 검정 사용")
-                raw_data_file = BytesIO(state.raw_data_file) if isinstance(state.raw_data_file, (bytes, bytearray)) else state.raw_data_file
-                raw_data = pd.read_excel(raw_data_file, sheet_name="DATA")
-                demo_df = pd.read_excel(raw_data_file, sheet_name="DEMO")
-                print(f"[ft_analysis_node] raw_data.columns: {raw_data.columns.tolist()}")
-                print(f"[ft_analysis_node] demo_df.columns: {demo_df.columns.tolist()}")
-                raw_data.columns = [col.replace("-", "_").strip() for col in raw_data.columns]
-                demo_mapping = self.statistical_tester.extract_demo_mapping_from_dataframe(demo_df)
+            if use_statistical_test and (has_context_raw_data or getattr(state, 'raw_data_file', None) is not None):
+                # 통계 검정 사용 시: Raw Data를 사용한 통계 분석 (배치는 job context에서 한 번 읽은 DATA/DEMO 사용)
+                if has_context_raw_data:
+                    raw_data, demo_mapping = context.raw_data, context.demo_mapping
+                else:
+                    print("[ft_analysis_node] raw_data_file exists - 통계 검정 사용")
+                    raw_data, demo_mapping = self.load_raw_data(state.raw_data_file)
                 print(f"[ft_analysis_node] demo_mapping: {demo_mapping}")
                 test_type = getattr(state, 'test_type', None)
                 question_key = getattr(state, 'selected_key', None)
@@ -291,8 +323,52 @@ class TableAnalysisService:
             # Set empty DataFrame on error
             state.ft_test_result = pd.DataFrame([])
             state.ft_test_summary = "통계 분석 중 오류가 발생했습니다."
+        self._keep_significant_rows(state)
         return state
+
+    def _keep_significant_rows(self, state: AgentState) -> None:
+        """압축 선형화에서 행이 생략되었으면 유의한 대분류 행을 남기도록 다시 인코딩"""
+        result = getattr(state, 'ft_test_result', None)
+        if not self.compact_table or not getattr(state, 'linearized_table_stats', {}).get("omitted_rows"):
+            return
+        if not isinstance(result, pd.DataFrame) or result.empty or "유의성" not in result.columns or "대분류" not in result.columns:
+            return
+        significant = result[result["유의성"].fillna("").astype(str).str.strip() != ""]
+        groups = {str(label).split(" - ")[0] for label in significant["대분류"]}
+        if not groups:
+            return
+        encoding = self.table_encoder.encode(state.selected_table, keep_groups=groups)
+        state.linearized_table = encoding.text
+        state.linearized_table_stats = encoding.stats()
+        print(f"[ft_analysis_node] 유의한 대분류 {len(groups)}개를 남기도록 표 재인코딩 (생략 {encoding.omitted_rows}행)")
     
+    def load_raw_data(self, raw_data_file) -> Tuple[pd.DataFrame, Dict[str, str]]:
+        """Raw Data 파일의 DATA 시트(컬럼명 정규화)와 DEMO 시트 매핑"""
+        from io import BytesIO
+        raw_data_file = BytesIO(raw_data_file) if isinstance(raw_data_file, (bytes, bytearray)) else raw_data_file
+        with pd.ExcelFile(raw_data_file) as workbook:
+            raw_data = pd.read_excel(workbook, sheet_name="DATA")
+            demo_df = pd.read_excel(workbook, sheet_name="DEMO")
+        print(f"[load_raw_data] raw_data.columns: {raw_data.columns.tolist()}")
+        print(f"[load_raw_data] demo_df.columns: {demo_df.columns.tolist()}")
+        raw_data.columns = [col.replace("-", "_").strip() for col in raw_data.columns]
+        return raw_data, self.statistical_tester.extract_demo_mapping_from_dataframe(demo_df)
+
+    def build_context(self, file_content: bytes, file_name: str, raw_data_content: Optional[bytes] = None) -> AnalysisContext:
+        """배치 job 입력을 한 번만 파싱 (통계표 + 선택적으로 Raw Data)"""
+        parsed = self.excel_loader.load_survey_tables(file_content, file_name)
+        raw_data, demo_mapping = (None, {})
+        if raw_data_content is not None:
+            raw_data, demo_mapping = self.load_raw_data(raw_data_content)
+        return AnalysisContext(
+            file_name=file_name,
+            tables=parsed["tables"],
+            question_texts=parsed["question_texts"],
+            question_keys=parsed["question_keys"],
+            raw_data=raw_data,
+            demo_mapping=demo_mapping
+        )
+
     async def extract_anchor(self, state: AgentState, on_step=None) -> AgentState:
         """앵커 추출 노드"""
         if on_step:
@@ -367,7 +443,7 @@ class TableAnalysisService:
             {"role": "user", "content": prompt}
         ]
         
-        state.table_analysis = await self.openai_client.call(messages)
+        state.table_analysis = await self.openai_client.call(messages, route="analyze_table")
         return state
     
     async def check_hallucination(self, state: AgentState, on_step=None) -> AgentState:
@@ -384,20 +460,34 @@ class TableAnalysisService:
         else:
             table_analysis = getattr(state, 'table_analysis', '')
         
-        prompt = self.HALLUCINATION_CHECK_PROMPT[lang].format(
-            selected_question=getattr(state, 'selected_question', ''),
-            linearized_table=getattr(state, 'linearized_table', ''),
-            ft_test_summary=str(getattr(state, 'ft_test_summary', '')),
-            table_analysis=table_analysis
+        # 로컬 수치/그룹 검증: 통과하거나 불일치가 확인되면 LLM 감사 생략
+        fact_check = self.fact_checker.verify(
+            table_analysis,
+            getattr(state, 'selected_table', None),
+            getattr(state, 'ft_test_result', None),
+            lang
         )
-        
-        messages = [
-            {"role": "system", "content": "당신은 통계 해석 결과를 검증하는 전문가입니다." if lang == "한국어" else "You are a statistical analysis auditor."},
-            {"role": "user", "content": prompt}
-        ]
-        
-        result = await self.openai_client.call(messages)
-        result_str = result.strip() if hasattr(result, 'strip') else str(result)
+        state.fact_check_mismatches = fact_check.mismatches
+        print(f"[check_hallucination] 로컬 검증: {fact_check.verdict} (숫자 {fact_check.numbers_checked}개 중 {fact_check.numbers_verified}개 확인, 그룹 {fact_check.groups_checked}개, 불일치 {len(fact_check.mismatches)}개)")
+        if fact_check.verdict == "pass":
+            result_str = "accept"
+        elif fact_check.verdict == "fail":
+            result_str = "reject: " + fact_check.feedback(lang)
+        else:
+            prompt = self.HALLUCINATION_CHECK_PROMPT[lang].format(
+                selected_question=getattr(state, 'selected_question', ''),
+                linearized_table=getattr(state, 'linearized_table', ''),
+                ft_test_summary=str(getattr(state, 'ft_test_summary', '')),
+                table_analysis=table_analysis
+            )
+            
+            messages = [
+                {"role": "system", "content": "당신은 통계 해석 결과를 검증하는 전문가입니다." if lang == "한국어" else "You are a statistical analysis auditor."},
+                {"role": "user", "content": prompt}
+            ]
+            
+            result = await self.openai_client.call(messages, route="check_hallucination")
+            result_str = result.strip() if hasattr(result, 'strip') else str(result)
         
         if result_str.lower().startswith("reject"):
             decision = "reject"
@@ -439,7 +529,7 @@ class TableAnalysisService:
             {"role": "user", "content": prompt}
         ]
         
-        result = await self.openai_client.call(messages)
+        result = await self.openai_client.call(messages, route="revise_analysis")
         new_revised_analysis = result.strip() if hasattr(result, 'strip') else str(result)
         
         # Append to revision history
@@ -461,6 +551,10 @@ class TableAnalysisService:
         hallucination_reject_num = getattr(state, 'hallucination_reject_num', 0)
         raw_summary = state.revised_analysis if hallucination_reject_num > 0 else state.table_analysis
         
+        state.polishing_result = await self._polish_text(raw_summary, lang)
+        return state 
+
+    async def _polish_text(self, raw_summary: str, lang: str) -> str:
         prompt = self.POLISHING_PROMPT[lang].format(raw_summary=raw_summary)
         
         messages = [
@@ -468,117 +562,151 @@ class TableAnalysisService:
             {"role": "user", "content": prompt}
         ]
         
-        result = await self.openai_client.call(messages)
-        polishing_result = result.strip() if hasattr(result, 'strip') else str(result)
-        state.polishing_result = polishing_result
-        return state 
+        result = await self.openai_client.call(messages, route="polish_sentence")
+        return result.strip() if hasattr(result, 'strip') else str(result)
 
-    async def decide_batch_test_types(self, question_infos: list, lang: str = "한국어") -> dict:
+    async def fast_analyze(self, state: AgentState, on_step=None) -> AgentState:
+        """fast 모드: 분석/자체 검증/문장 다듬기를 한 번의 구조화 출력 호출로 수행
+
+        자체 검증이 reject이거나, 응답 파싱 실패, 로컬 수치 검증 fail이면 state.fast_verdict를 reject로 두어
+        use case가 전체 체인으로 다시 실행하도록 함.
+        """
+        if on_step:
+            on_step("⚡ fast 분석 노드 시작 (분석+검증+다듬기 단일 호출)")
+
+        lang = getattr(state, 'lang', '한국어')
+        prompt = self.FAST_ANALYSIS_PROMPT[lang].format(
+            selected_question=getattr(state, 'selected_question', ''),
+            linearized_table=getattr(state, 'linearized_table', ''),
+            ft_test_summary=str(getattr(state, 'ft_test_summary', '')),
+            anchor=getattr(state, 'anchor', '없음')
+        )
+        messages = [
+            {"role": "system", "content": "당신은 통계 분석 전문가입니다." if lang == "한국어" else "You are a statistical analysis expert."},
+            {"role": "user", "content": prompt}
+        ]
+
+        verdict = "reject"
+        try:
+            raw = await self.openai_client.call(messages, route="fast_analysis", json_mode=True)
+            parsed = self._parse_fast_result(raw)
+            analysis = str(parsed.get("analysis", "")).strip()
+            polished = str(parsed.get("polished", "")).strip()
+            if analysis and polished and str(parsed.get("verdict", "")).lower().startswith("accept"):
+                fact_check = self.fact_checker.verify(
+                    polished,
+                    getattr(state, 'selected_table', None),
+                    getattr(state, 'ft_test_result', None),
+                    lang
+                )
+                state.fact_check_mismatches = fact_check.mismatches
+                if fact_check.verdict != "fail":
+                    verdict = "accept"
+                    state.table_analysis = analysis
+                    state.polishing_result = polished
+                    state.hallucination_check = "accept"
+            print(f"[fast_analyze] 자체 검증: {parsed.get('verdict')}, 최종: {verdict}")
+        except Exception as e:
+            print(f"[fast_analyze] fast 모드 실패, 전체 체인으로 전환: {e}")
+
+        state.fast_verdict = verdict
+        return state
+
+    @staticmethod
+    def _parse_fast_result(raw: str) -> Dict[str, Any]:
+        text = raw.strip()
+        # ```json ... ``` 래핑 제거
+        fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.S)
+        if fenced:
+            text = fenced.group(1)
+        start, end = text.find("{"), text.rfind("}")
+        if start == -1 or end == -1:
+            raise ValueError("JSON 객체가 없는 응답")
+        parsed = json.loads(text[start:end + 1])
+        if not isinstance(parsed, dict):
+            raise ValueError("JSON 객체가 아닌 응답")
+        return parsed
+
+    async def check_hallucination_with_speculative_polish(self, state: AgentState, on_step=None) -> AgentState:
+        """환각 검증과 동시에 검증 대상 초안을 미리 다듬기 (accept면 결과 사용, reject면 취소)"""
+        lang = getattr(state, 'lang', '한국어')
+        if getattr(state, 'revised_analysis_history', None):
+            draft = state.revised_analysis_history[-1]
+        else:
+            draft = getattr(state, 'table_analysis', '')
+
+        polish_task = asyncio.create_task(self._polish_text(draft, lang))
+        try:
+            state = await self.check_hallucination(state, on_step)
+        except BaseException:
+            self._discard_polish_task(polish_task)
+            raise
+
+        if state.hallucination_check != "accept":
+            self._discard_polish_task(polish_task)
+            state.speculative_polish = "cancelled"
+            return state
+
+        if on_step:
+            on_step("💅 문장 다듬기 노드 시작 (검증과 병렬 실행)")
+        try:
+            state.polishing_result = await polish_task
+            state.speculative_polish = "used"
+        except Exception as e:
+            # 선행 다듬기가 실패하면 use case에서 일반 다듬기 노드로 다시 실행
+            print(f"[speculative_polish] 선행 다듬기 실패, 일반 경로로 재시도: {e}")
+            state.speculative_polish = "failed"
+        return state
+
+    @staticmethod
+    def _discard_polish_task(task: "asyncio.Task") -> None:
+        """버리는 선행 다듬기 태스크를 취소하고, 이미 실패한 경우 예외를 회수해 미회수 경고를 막는다"""
+        def _retrieve(t: "asyncio.Task") -> None:
+            if not t.cancelled():
+                exc = t.exception()
+                if exc is not None:
+                    print(f"[speculative_polish] 버린 선행 다듬기 실패 무시: {exc}")
+
+        task.cancel()
+        task.add_done_callback(_retrieve)
+
+    async def decide_batch_test_types(self, question_infos: list, lang: str = "한국어", shard_token_budget: Optional[int] = None) -> dict:
         """배치 분석용: 여러 질문에 대해 통계 검정 방법을 일괄 결정"""
         try:
-            # 1. manual 판정 (복수응답/순위/다중 등 키워드)
-            manual_keys = set()
+            # 1. 로컬 분류기 (키워드 + 컬럼 패턴 + 시그니처 메모)
+            decided = {}
+            pending_decisions = {}
             non_manual_questions = []
             for q in question_infos:
                 key, text, columns = q['key'], q['text'], q['columns']
-                if self.rule_based_test_type_decision(text) == 'manual':
-                    manual_keys.add(key)
+                decision = self.test_type_classifier.classify(text, columns)
+                if decision.source == "cache" or self.test_type_classifier.is_confident(decision):
+                    decided[key] = decision.test_type
+                elif self.rule_based_test_type_decision(text) == 'manual':
+                    decided[key] = 'manual'
                 else:
+                    pending_decisions[key] = decision
                     non_manual_questions.append(q)
+            print(f"[decide_batch_test_types] 로컬 결정 {len(decided)}개, LLM 분류 대상 {len(non_manual_questions)}개")
             
-            # 2. LLM 프롬프트 생성 (복수응답 아닌 질문들)
-            prompt_lines = []
-            for q in non_manual_questions:
-                col_str = ', '.join(q['columns'])
-                prompt_lines.append(f"{q['key']}: {col_str}")
-            prompt_body = '\n'.join(prompt_lines)
+            # 2. 저신뢰 질문을 토큰 예산 단위 샤드로 묶어 전역 limiter 아래 동시 호출
+            #    응답에서 빠진 질문만 다시 묻고, 잘림/컨텍스트 초과가 있으면 샤드 예산을 절반으로 줄여 재분할
+            llm_map = await self._classify_test_types_sharded(non_manual_questions, lang, shard_token_budget or self.TEST_TYPE_SHARD_TOKEN_BUDGET)
             
-            if lang == "한국어":
-                prompt = f"""
-                아래는 설문 통계표의 각 질문별 열 이름 목록입니다.
-                
-                당신의 임무는 각 질문에 대해 **가장 적합한 통계 검정 방법**(ft_test 또는 chi_square)을 결정하는 것입니다.
-                
-                - ft_test: 평균, 점수, 비율 등 연속형(수치형) 데이터에 적합
-                - chi_square: 항목 선택, 다중응답 등 범주형(선택형) 데이터에 적합
-                
-                아래 기준을 참고하세요:
-                - 열 이름에 '평균', '점수', '%', '비율' 등이 포함되어 있으면 ft_test
-                - 항목 선택, 다중응답, 범주형 선택지면 chi_square
-                
-                아래와 같은 형식으로만 답변하세요(설명 없이):
-                
-                예시:
-                Q1: ft_test
-                Q2: chi_square
-                Q3: ft_test
-                
-                질문별 열 목록:
-                {prompt_body}
-                
-                답변 형식:
-                Q1: ft_test
-                Q2: chi_square
-                ...
-                """
-            else:
-                prompt = f"""
-                Below are the column headers for each survey question.
+            # 3. 결과 병합 (LLM 결정은 시그니처 메모에 반영)
+            test_type_map = dict(decided)
+            for key, ttype in llm_map.items():
+                test_type_map[key] = ttype
+                if key in pending_decisions:
+                    self.test_type_classifier.resolve_with_llm(pending_decisions[key], ttype)
             
-                Your task is to determine the **most appropriate statistical test type** (ft_test or chi_square) for each question.
-                
-                - ft_test: Use for continuous/numeric data (mean, score, %, ratio, etc.)
-                - chi_square: Use for categorical/choice/multiple response data
-                
-                Guidelines:
-                - If column names include 'mean', 'score', '%', 'ratio', etc. → ft_test
-                - If the question is about selecting items, multiple responses, or categorical choices → chi_square
-                - If the question is multiple response/ranking, use 'manual' (already auto-classified)
-                
-                Please answer in the following format (no explanation):
-                
-                Example:
-                Q1: ft_test
-                Q2: chi_square
-                Q3: ft_test
-                
-                Question columns:
-                {prompt_body}
-                
-                Answer format:
-                Q1: ft_test
-                Q2: chi_square
-                ...
-                """
-            
-            # 3. LLM 호출 (없으면 모두 ft_test)
-            llm_result = None
-            if non_manual_questions:
-                messages = [
-                    {"role": "system", "content": "당신은 통계 전문가입니다." if lang == "한국어" else "You are a statistics expert."},
-                    {"role": "user", "content": prompt}
-                ]
-                try:
-                    llm_result = await self.openai_client.call(messages)
-                except Exception as e:
-                    print(f"[decide_batch_test_types] LLM 호출 실패: {e}")
-                    # fallback: 모두 ft_test
-                    llm_result = '\n'.join([f"{q['key']}: ft_test" for q in non_manual_questions])
-            
-            # 4. LLM 응답 파싱
-            test_type_map = {key: 'manual' for key in manual_keys}
-            if llm_result:
-                import re
-                for line in llm_result.splitlines():
-                    m = re.match(r"([\w\-]+):\s*(ft_test|chi_square)", line.strip(), re.I)
-                    if m:
-                        key, ttype = m.group(1), m.group(2).lower()
-                        test_type_map[key] = ttype
-            
-            # 5. 누락된 질문은 기본값(ft_test)
-            for q in question_infos:
-                if q['key'] not in test_type_map:
-                    test_type_map[q['key']] = 'ft_test'
+            # 4. 재질문 후에도 누락된 질문은 로컬 분류기 결정, 그것도 없으면 기본값(ft_test)
+            unresolved = [q['key'] for q in question_infos if q['key'] not in test_type_map]
+            if unresolved:
+                print(f"[decide_batch_test_types] LLM 응답 누락 {len(unresolved)}개, 로컬 분류 결과 사용: {unresolved[:10]}")
+            for key in unresolved:
+                decision = pending_decisions.get(key)
+                test_type_map[key] = decision.test_type if decision is not None and decision.test_type in VALID_TEST_TYPES else 'ft_test'
             
             return test_type_map
         except Exception as e:
@@ -586,6 +714,146 @@ class TableAnalysisService:
             # fallback: 모든 질문을 ft_test로 설정
             return {q["key"]: "ft_test" for q in question_infos}
 
+    async def _classify_test_types_sharded(self, questions: list, lang: str, token_budget: int) -> Dict[str, str]:
+        """샤드 동시 분류 + 누락 질문 재질문 (준비 시간은 전체 질문 수가 아니라 샤드 수/라운드 수에 비례)"""
+        result: Dict[str, str] = {}
+        remaining = list(questions)
+        max_questions = self.TEST_TYPE_SHARD_MAX_QUESTIONS
+        for round_index in range(self.TEST_TYPE_REASK_ROUNDS + 1):
+            if not remaining:
+                break
+            shards = self._pack_test_type_shards(remaining, token_budget, max_questions)
+            shard_results = await asyncio.gather(*[
+                self._classify_test_type_shard(shard, lang)
+                for shard in shards
+            ])
+            overflowed = False
+            for shard_map, shard_overflowed in shard_results:
+                result.update(shard_map)
+                overflowed = overflowed or shard_overflowed
+            remaining = [q for q in remaining if q['key'] not in result]
+            print(f"[decide_batch_test_types] {round_index + 1}차: 샤드 {len(shards)}개 (예산 {token_budget}토큰/{max_questions}문항), 누락 {len(remaining)}개")
+            if overflowed:
+                token_budget = max(self.TEST_TYPE_MIN_SHARD_TOKEN_BUDGET, token_budget // 2)
+                max_questions = max(1, max_questions // 2)
+        return result
+
+    @staticmethod
+    def _normalize_test_type_key(key: str) -> str:
+        """모델이 키를 다르게 적어도(대소문자, -, ., 공백) 같은 질문으로 매칭"""
+        return re.sub(r"[\s_\-.]", "", str(key)).upper()
+
+    def _test_type_prompt_line(self, question: dict) -> str:
+        text = truncate_tokens(" ".join(str(question.get('text') or '').split()), self.TEST_TYPE_QUESTION_MAX_TOKENS)
+        return f"{question['key']}: {text} | {', '.join(map(str, question['columns']))}"
+
+    def _pack_test_type_shards(self, questions: list, token_budget: int, max_questions: Optional[int] = None) -> List[list]:
+        """질문 목록을 프롬프트 토큰 예산과 최대 질문 수 안에서 샤드로 분할"""
+        max_questions = max_questions or self.TEST_TYPE_SHARD_MAX_QUESTIONS
+        shards = []
+        current = []
+        current_tokens = 0
+        for q in questions:
+            line_tokens = count_tokens(self._test_type_prompt_line(q)) + 1
+            if current and (current_tokens + line_tokens > token_budget or len(current) >= max_questions):
+                shards.append(current)
+                current = []
+                current_tokens = 0
+            current.append(q)
+            current_tokens += line_tokens
+        if current:
+            shards.append(current)
+        return shards
+
+    def _build_batch_test_type_prompt(self, prompt_body: str, lang: str) -> str:
+        # 고정 지시문을 앞에 두고 질문 목록을 마지막에 두어 샤드 간 prompt prefix가 캐시되도록 함
+        if lang == "한국어":
+            prompt = f"""
+            아래는 설문 통계표의 각 질문 텍스트와 열 이름 목록입니다 (형식: 질문 키: 질문 텍스트 | 열 이름).
+            
+            당신의 임무는 각 질문에 대해 **가장 적합한 통계 검정 방법**(ft_test 또는 chi_square)을 결정하는 것입니다.
+            
+            - ft_test: 평균, 점수, 비율 등 연속형(수치형) 데이터에 적합
+            - chi_square: 항목 선택, 다중응답 등 범주형(선택형) 데이터에 적합
+            
+            아래 기준을 참고하세요:
+            - 질문 텍스트가 만족도/동의 정도/점수 평가를 묻거나, 열 이름에 '평균', '점수', '%', '비율' 등이 포함되어 있으면 ft_test
+            - 항목 선택, 다중응답, 범주형 선택지면 chi_square
+            
+            목록의 모든 질문에 대해, 목록에 적힌 질문 키를 그대로 사용하여 한 줄에 하나씩 아래 형식으로만 답변하세요(설명 없이):
+            
+            예시:
+            Q1: ft_test
+            Q2: chi_square
+            Q3: ft_test
+            
+            ---
+            질문별 텍스트와 열 목록:
+            {prompt_body}
+            """
+        else:
+            prompt = f"""
+            Below are the question text and column headers for each survey question (format: key: question text | columns).
+        
+            Your task is to determine the **most appropriate statistical test type** (ft_test or chi_square) for each question.
+            
+            - ft_test: Use for continuous/numeric data (mean, score, %, ratio, etc.)
+            - chi_square: Use for categorical/choice/multiple response data
+            
+            Guidelines:
+            - If the question asks for a rating/agreement/score, or column names include 'mean', 'score', '%', 'ratio', etc. → ft_test
+            - If the question is about selecting items, multiple responses, or categorical choices → chi_square
+            - If the question is multiple response/ranking, use 'manual' (already auto-classified)
+            
+            Answer for every question in the list, one per line, using the question key exactly as listed, in the following format (no explanation):
+            
+            Example:
+            Q1: ft_test
+            Q2: chi_square
+            Q3: ft_test
+            
+            ---
+            Question text and columns:
+            {prompt_body}
+            """
+        
+        return prompt
+
+    async def _classify_test_type_shard(self, questions: list, lang: str) -> Tuple[Dict[str, str], bool]:
+        """샤드 하나를 다중 질문 프롬프트로 분류
+
+        (키 검증을 통과한 결과, 잘림/컨텍스트 초과 여부)를 반환. 실패한 질문은 호출부에서 재질문.
+        """
+        prompt_body = '\n'.join(self._test_type_prompt_line(q) for q in questions)
+        prompt = self._build_batch_test_type_prompt(prompt_body, lang)
+        messages = [
+            {"role": "system", "content": "당신은 통계 전문가입니다." if lang == "한국어" else "You are a statistics expert."},
+            {"role": "user", "content": prompt}
+        ]
+        try:
+            llm_result = await self.openai_client.call(messages, route="decide_batch_test_types")
+        except LLMFatalError as e:
+            print(f"[decide_batch_test_types] LLM 호출 실패 ({len(questions)}개 질문, {e.reason}): {e}")
+            return {}, e.reason == "context_length_exceeded"
+        except Exception as e:
+            print(f"[decide_batch_test_types] LLM 호출 실패 ({len(questions)}개 질문): {e}")
+            return {}, False
+        keys = {self._normalize_test_type_key(q['key']): q['key'] for q in questions}
+        shard_map = {}
+        for line in llm_result.splitlines():
+            m = re.match(r"[\s*\-•]*([\w\-.]+)\s*[:：]\s*(ft_test|chi_square)\b", line.strip(), re.I)
+            if not m:
+                continue
+            key = keys.get(self._normalize_test_type_key(m.group(1)))
+            if key is not None and key not in shard_map:
+                shard_map[key] = m.group(2).lower()
+        # 앞쪽 질문만 답하고 끝났으면 출력이 잘린 것으로 보고 다음 라운드에서 샤드를 더 작게 나눔
+        answered = [i for i, q in enumerate(questions) if q['key'] in shard_map]
+        truncated = bool(answered) and len(answered) < len(questions) and answered == list(range(len(answered)))
+        if len(shard_map) < len(questions):
+            print(f"[decide_batch_test_types] 샤드 응답 누락 {len(questions) - len(shard_map)}/{len(questions)}개{' (잘림)' if truncated else ''}")
+        return shard_map, truncated
+
     def rule_based_test_type_decision(self, question_text=""):
         """질문 텍스트에 복수응답/순위/다중 등 키워드가 있으면 manual, 아니면 None"""
         multi_response_keywords = [
@@ -803,6 +1071,7 @@ class TableAnalysisService:
         return "  ".join(summary)
 
     # --- PROMPT DEFINITIONS ---
+    # 고정 지침을 앞에, 문항별 데이터를 마지막에 두어 provider prefix cache가 문항 간에 재사용되도록 함
     TABLE_ANALYSIS_PROMPT = {
         "한국어": """
         당신은 통계 데이터를 바탕으로 인구집단 간 경향을 요약하는 데이터 분석 전문가입니다.
@@ -813,20 +1082,6 @@ class TableAnalysisService:
 
         ---
 
-        📝 설문 조사 질문:
-        {selected_question}
-
-        📊 표 데이터 (선형화된 형태):
-        {linearized_table}
-
-        📈 주요 항목 (변수들 중 가장 투표율이 높은 변수):
-        {anchor}
-
-        📈 통계 분석 결과 (통계적으로 유의미한 대분류):
-        {ft_test_summary}
-
-        ---
-
         ⚠️ 참고: 만약 통계 분석 결과가 존재하지 않거나 사용자가 분석을 진행하지 않기로 선택한 경우, 주요 항목(anchor)을 중심으로 경향을 파악하고 이를 기반으로 요약할 것.
 
         Let's think step by step.
@@ -846,27 +1101,27 @@ class TableAnalysisService:
         9. **특정 대분류가 가장 두드러진 차이를 보였을 경우**, 해당 경향을 강조할 것
         10. 숫자값을 직접 쓰지 말고 상대적인 경향만 언급할 것
         11. 통계적 유의미성으로 인해~~, 통계적으로 차이가 있어~~, 통계 결과가 없으므로~~ 이런식으로 통계 검정의 결과 유무에 대한 내용은 작성하지 말고, 통계 검정 결과가 있으면 해당 결과의 대분류를 중심으로 요약할 것.
-        """,
-        "English": """
-        You are a data analyst summarizing trends across population groups based on statistical data.
-        You must integrate the following two pieces of information to identify key patterns:
-
-        1️⃣ **Statistical Test Results (ft_test_summary)**: indicates which row groups (categories) showed statistically significant differences
-        2️⃣ **Key Variables (anchor)**: columns (features) that had the highest overall selection rate among respondents
 
         ---
 
-        📝 Survey Question:
+        📝 설문 조사 질문:
         {selected_question}
 
-        📊 Table Data (Linearized):
+        📊 표 데이터 (선형화된 형태):
         {linearized_table}
 
-        📈 Key Variables (most frequently selected):
+        📈 주요 항목 (변수들 중 가장 투표율이 높은 변수):
         {anchor}
 
-        📈 Statistical Test Results (significant groups):
+        📈 통계 분석 결과 (통계적으로 유의미한 대분류):
         {ft_test_summary}
+        """,
+        "English": """
+        You are a data analyst summarizing trends across population groups based on statistical data.
+        You must integrate the following two pieces of information to identify key patterns:
+
+        1️⃣ **Statistical Test Results (ft_test_summary)**: indicates which row groups (categories) showed statistically significant differences
+        2️⃣ **Key Variables (anchor)**: columns (features) that had the highest overall selection rate among respondents
 
         ---
 
@@ -887,29 +1142,30 @@ class TableAnalysisService:
         7. **Do not mention non-significant or excluded categories**
         8. If all row groups are significant and important, don’t describe each — state they were all important
         9. **If one group shows the most outstanding difference**, emphasize that
-        10. Avoid exact numerical values — describe only relative tendencies"""
-    }
-    HALLUCINATION_CHECK_PROMPT = {
-        "한국어": """
-        당신은 통계 해석 결과를 검증하는 전문가입니다.
+        10. Avoid exact numerical values — describe only relative tendencies
 
-        아래의 테이블 데이터와 통계 분석 결과(F/T-test 기반), 그리고 해당 결과를 바탕으로 작성된 요약 보고서가 주어집니다.
+        ---
 
-        📝 설문 문항:
+        📝 Survey Question:
         {selected_question}
 
-        📊 선형화된 테이블:
+        📊 Table Data (Linearized):
         {linearized_table}
 
-        📈 통계 분석 결과 (F/T-test 결과 요약):
-        {ft_test_summary}
+        📈 Key Variables (most frequently selected):
+        {anchor}
 
-        🧾 생성된 요약:
-        {table_analysis}
+        📈 Statistical Test Results (significant groups):
+        {ft_test_summary}
+"""
+    }
+    HALLUCINATION_CHECK_PROMPT = {
+        "한국어": """
+        당신은 통계 해석 결과를 검증하는 전문가입니다.
 
-        ---
+        아래의 테이블 데이터와 통계 분석 결과(F/T-test 기반), 그리고 해당 결과를 바탕으로 작성된 요약 보고서가 주어집니다.
 
-        이 요약이 위의 통계 분석 결과를 **정확하고 일관성 있게** 반영하고 있는지 평가해주세요.
+        이 요약이 아래 통계 분석 결과를 **정확하고 일관성 있게** 반영하고 있는지 평가해주세요.
 
         ⚠️ 주의 사항 (위반 시 우선 피드백 제공, 심각한 왜곡에 한해 reject):
         1. F/T-test에서 통계적으로 유의미한 차이가 확인된 대분류가 요약에 언급되지 않은 경우
@@ -921,27 +1177,27 @@ class TableAnalysisService:
         - 위 항목 위반 시 "reject: [이유]" 형식으로 출력
 
         ※ F/T-test 결과는 중요한 기준이지만, 사소한 누락은 reject 대신 피드백으로 처리해도 됩니다. 명백한 왜곡이나 중대한 누락 시에만 reject 하세요.
-        """,
-        "English": """
-You are a statistical analysis auditor.
 
-Below is a statistical summary table (linearized format), F/T-test results, and a summary report written based on them.
+        ---
 
-📝 Survey question:
-{selected_question}
+        📝 설문 문항:
+        {selected_question}
 
-📊 Linearized Table:
-{linearized_table}
+        📊 선형화된 테이블:
+        {linearized_table}
 
-📈 Statistical Test Summary (F/T-test):
-{ft_test_summary}
+        📈 통계 분석 결과 (F/T-test 결과 요약):
+        {ft_test_summary}
 
-🧾 Generated Summary Report:
-{table_analysis}
+        🧾 생성된 요약:
+        {table_analysis}
+        """,
+        "English": """
+You are a statistical analysis auditor.
 
----
+Below is a statistical summary table (linearized format), F/T-test results, and a summary report written based on them.
 
-Please evaluate whether the summary accurately and consistently reflects the statistical test results above.
+Please evaluate whether the summary accurately and consistently reflects the statistical test results below.
 
 ⚠️ Evaluation Guidelines (Provide feedback first. Only reject in cases of serious distortion):
 1. If a major category with statistically significant difference is missing in the summary
@@ -952,29 +1208,26 @@ Please evaluate whether the summary accurately and consistently reflects the sta
 - If any violations occur, return: "reject: [reason]"
 
 ※ F/T-test is a key basis, but minor omissions can be handled with feedback only. Use "reject" only for clear distortions or major omissions.
-"""}
-    REVISION_PROMPT = {
-        "한국어": """
-        당신은 통계 데이터를 바탕으로 인구집단 간 패턴과 경향성을 객관적으로 요약하는 데이터 분석 전문가입니다.
-
-        아래는 테이블 분석 결과에 대해 일부 잘못된 해석이 포함된 요약입니다. 피드백과 사전에 생성된 가설을 참고하여 잘못된 내용을 제거하고, 원본 데이터를 기반으로 수치 기반의 객관적 분석을 다시 작성할 것.
 
-        📊 표 데이터 (선형화된 형태):
-        {linearized_table}
+---
 
-        📈 주요 항목 (변수들 중 가장 투표율이 높은 변수):
-        {anchor}
+📝 Survey question:
+{selected_question}
 
-        📈 통계 분석 결과 (통계적으로 유의미한 대분류):
-        {ft_test_summary}
+📊 Linearized Table:
+{linearized_table}
 
-        📝 Reject된 보고서 (수정해야할 보고서):
-        {report_to_modify}
+📈 Statistical Test Summary (F/T-test):
+{ft_test_summary}
 
-        ❗ 피드백 (수정이 필요한 이유 또는 잘못된 부분):
-        {feedback}
+🧾 Generated Summary Report:
+{table_analysis}
+"""}
+    REVISION_PROMPT = {
+        "한국어": """
+        당신은 통계 데이터를 바탕으로 인구집단 간 패턴과 경향성을 객관적으로 요약하는 데이터 분석 전문가입니다.
 
-        ---
+        아래는 테이블 분석 결과에 대해 일부 잘못된 해석이 포함된 요약입니다. 피드백과 사전에 생성된 가설을 참고하여 잘못된 내용을 제거하고, 원본 데이터를 기반으로 수치 기반의 객관적 분석을 다시 작성할 것.
 
         Let's think step by step
 
@@ -994,28 +1247,28 @@ Please evaluate whether the summary accurately and consistently reflects the sta
         10. 숫자값을 직접 쓰지 말고 상대적인 경향만 언급할 것
         11. 이전 수정 버전의 문장 표현을 재사용하지 않고, 새로운 어휘와 구조로 작성할 것
         12. 추론 과정을 작성하지 말고 최종적으로 수정한 보고서만 출력하세요.
-        """,
-        "English": """
-        You are a data analyst who objectively summarizes population-level patterns based on statistical data.
 
-        Below is a summary that contains partially incorrect interpretations of a statistical table analysis. Based on the given feedback and hypotheses, revise the summary by removing inaccurate parts and rewrite a new objective analysis grounded in the data.
+        ---
 
-        📊 Table data (linearized):
+        📊 표 데이터 (선형화된 형태):
         {linearized_table}
 
-        📈 Key variables (most selected):
+        📈 주요 항목 (변수들 중 가장 투표율이 높은 변수):
         {anchor}
 
-        📈 Statistical analysis results (significant categories):
+        📈 통계 분석 결과 (통계적으로 유의미한 대분류):
         {ft_test_summary}
 
-        📝 Rejected summary (needs revision):
+        📝 Reject된 보고서 (수정해야할 보고서):
         {report_to_modify}
 
-        ❗ Feedback (reason for revision or incorrect points):
+        ❗ 피드백 (수정이 필요한 이유 또는 잘못된 부분):
         {feedback}
+        """,
+        "English": """
+        You are a data analyst who objectively summarizes population-level patterns based on statistical data.
 
-        ---
+        Below is a summary that contains partially incorrect interpretations of a statistical table analysis. Based on the given feedback and hypotheses, revise the summary by removing inaccurate parts and rewrite a new objective analysis grounded in the data.
 
         Let's think step by step
 
@@ -1035,6 +1288,23 @@ Please evaluate whether the summary accurately and consistently reflects the sta
         10. Do not mention actual numerical values, only describe relative trends
         11. Do not reuse previous sentence structures – use new wording and phrasing
         12. Do not explain the reasoning – only output the final revised summary
+
+        ---
+
+        📊 Table data (linearized):
+        {linearized_table}
+
+        📈 Key variables (most selected):
+        {anchor}
+
+        📈 Statistical analysis results (significant categories):
+        {ft_test_summary}
+
+        📝 Rejected summary (needs revision):
+        {report_to_modify}
+
+        ❗ Feedback (reason for revision or incorrect points):
+        {feedback}
         """}
     POLISHING_PROMPT = {
         "한국어": """
@@ -1095,4 +1365,84 @@ Please evaluate whether the summary accurately and consistently reflects the sta
 
         🎯 Polished final summary:
         """
-        } 
\ No newline at end of file
+        }
+    FAST_ANALYSIS_PROMPT = {
+        "한국어": """
+        당신은 통계 데이터를 바탕으로 인구집단 간 경향을 요약하고, 스스로 검증한 뒤 문장을 다듬는 데이터 분석 전문가입니다.
+        아래 세 단계를 한 번에 수행하고 결과를 JSON 객체 하나로만 출력하세요.
+
+        1단계 (analysis): 통계 분석 결과와 주요 항목(anchor)을 바탕으로 핵심 경향을 요약
+        - F/T test 결과에서 통계적으로 유의미한 대분류(p-value < 0.05, 유의성 별(*) 존재)만 중심으로 분석할 것
+        - 유의미한 대분류가 없으면 p-value가 작은 대분류 중 주요 항목에 해당하는 대분류만 언급할 것
+        - 인과 해석, 외부 배경지식, 주관적 추론은 금지. 표에서 직접 확인 가능한 사실만 서술할 것
+        - 유의성이 없거나 검정에서 제외된 항목은 언급하지 말 것
+        - 모든 대분류가 유의하면 각각 설명하지 말고 모든 대분류가 중요했다고만 언급할 것
+        - 숫자값을 직접 쓰지 말고 상대적인 경향만 음슴체로 서술할 것 (예: ~했음, ~로 나타났음)
+        - 통계 분석 결과가 없으면 주요 항목(anchor)을 중심으로 경향을 요약할 것
+
+        2단계 (verdict): 1단계 요약을 스스로 검증
+        - 유의미한 대분류가 누락되었거나, 경향/방향이 표와 다르게 서술되었으면 "reject"
+        - 그렇지 않으면 "accept"
+        - reject인 경우 issues에 이유를 적을 것
+
+        3단계 (polished): 1단계 요약을 의미 변경 없이 읽기 쉽게 다듬기
+        - 내용 추가/삭제 금지, 음슴체 유지, 중복 표현 제거, 단조로운 나열(~했음. ~했음.) 피하기
+        - 연관된 항목은 한 문장으로 묶고 특징적인 그룹 중심으로 간결하게 작성할 것
+
+        출력 형식 (JSON 외 다른 텍스트 금지):
+        {{"analysis": "1단계 요약", "verdict": "accept 또는 reject", "issues": "reject 이유 (없으면 빈 문자열)", "polished": "3단계 최종 요약"}}
+
+        ---
+
+        📝 설문 조사 질문:
+        {selected_question}
+
+        📊 표 데이터 (선형화된 형태):
+        {linearized_table}
+
+        📈 주요 항목 (변수들 중 가장 투표율이 높은 변수):
+        {anchor}
+
+        📈 통계 분석 결과 (통계적으로 유의미한 대분류):
+        {ft_test_summary}
+        """,
+        "English": """
+        You are a data analyst who summarizes trends across population groups, audits the summary yourself, and polishes it.
+        Perform the three steps below in one pass and output a single JSON object only.
+
+        Step 1 (analysis): summarize the key trends using the statistical test results and key variables (anchor)
+        - Focus only on row groups that are statistically significant (p-value < 0.05, marked with asterisk)
+        - If none are significant, mention only groups with small p-values that relate to the key variables
+        - No causal interpretation, external knowledge or speculation; describe only facts verifiable from the table
+        - Do not mention non-significant or excluded categories
+        - If all groups are significant, state that they were all important instead of describing each
+        - Avoid exact numerical values; describe relative tendencies only
+        - If there are no statistical results, summarize around the key variables (anchor)
+
+        Step 2 (verdict): audit the Step 1 summary
+        - Answer "reject" if a significant group is missing or a trend/direction contradicts the table
+        - Otherwise answer "accept"
+        - Put the reason for a reject in issues
+
+        Step 3 (polished): polish the Step 1 summary without changing its meaning
+        - No additions or deletions, keep a declarative tone, remove repetition, vary sentence structure
+        - Combine related findings and keep the summary focused on characteristic groups
+
+        Output format (no text other than the JSON):
+        {{"analysis": "Step 1 summary", "verdict": "accept or reject", "issues": "reason for reject (empty if none)", "polished": "Step 3 final summary"}}
+
+        ---
+
+        📝 Survey Question:
+        {selected_question}
+
+        📊 Table Data (Linearized):
+        {linearized_table}
+
+        📈 Key Variables (most frequently selected):
+        {anchor}
+
+        📈 Statistical Test Results (significant groups):
+        {ft_test_summary}
+        """
+    }
@@ -0,0 +1,181 @@
+from typing import List, Dict, Any, Optional, Tuple, Iterable
+from dataclasses import dataclass, field
+import os
+import pandas as pd
+import numpy as np
+from app.utils.tokens import count_tokens
+
+
+DEFAULT_TABLE_TOKEN_BUDGET = int(os.getenv("TABLE_TOKEN_BUDGET", "1500"))
+LABEL_COLUMNS = ["대분류", "소분류"]
+CASE_COLUMN = "사례수"
+# 원본 값의 소수점 자리를 판단할 때 보는 최대 자리 수
+MAX_SOURCE_PRECISION = 3
+
+
+@dataclass
+class TableEncoding:
+    """압축 선형화 결과와 토큰 통계"""
+    text: str
+    tokens: int
+    budget: int
+    precision: int
+    columns: List[str] = field(default_factory=list)
+    dropped_columns: List[str] = field(default_factory=list)
+    omitted_rows: int = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tokens": self.tokens,
+            "budget": self.budget,
+            "precision": self.precision,
+            "columns": len(self.columns),
+            "dropped_columns": self.dropped_columns,
+            "omitted_rows": self.omitted_rows,
+        }
+
+
+class CompactTableEncoder:
+    """토큰 예산에 맞춘 통계표 선형화
+
+    - 대분류는 그룹 헤더로 한 번만 쓰고 소분류 라벨을 행 이름으로 유지
+    - 연속 컬럼의 공통 문항 라벨은 헤더에 한 번만 표기
+    - 값이 모두 비었거나 다른 컬럼과 중복/상수인 컬럼 제거
+    - 원본 소수점 자리 그대로 쓰고, 예산 초과 시에만 소수점 자리 축소 → 사례수 제거 → 변동이 작은 컬럼 제거 → 행 생략 순으로 축소
+    - 행 생략 시 '전체' 행과 keep_groups(유의한 대분류 등) 행은 남김
+    """
+
+    def __init__(self, token_budget: Optional[int] = None, model: str = "gpt-4o-mini"):
+        self.token_budget = token_budget or DEFAULT_TABLE_TOKEN_BUDGET
+        self.model = model
+
+    def _value_columns(self, table: pd.DataFrame) -> Tuple[Dict[str, pd.Series], List[str]]:
+        """숫자 컬럼 추출 + 중복/상수 컬럼 제거"""
+        columns: Dict[str, pd.Series] = {}
+        redundant: List[str] = []
+        for col in table.columns:
+            if col in LABEL_COLUMNS:
+                continue
+            values = pd.to_numeric(table[col], errors="coerce")
+            if values.isna().all():
+                continue
+            if col != CASE_COLUMN and values.nunique(dropna=True) <= 1 and len(values.dropna()) > 1:
+                redundant.append(str(col))
+                continue
+            if any(values.equals(existing) for existing in columns.values()):
+                redundant.append(str(col))
+                continue
+            columns[str(col)] = values
+        return columns, redundant
+
+    @staticmethod
+    def _compact_headers(names: List[str]) -> List[str]:
+        """연속된 컬럼이 같은 첫 단어(문항 라벨)를 공유하면 첫 컬럼에만 [라벨]로 표기"""
+        heads = [n.split(" ", 1) if " " in n else [n, ""] for n in names]
+        headers: List[str] = []
+        for i, (head, rest) in enumerate(heads):
+            shares_prev = i > 0 and rest and heads[i - 1][1] and heads[i - 1][0] == head
+            shares_next = i + 1 < len(heads) and rest and heads[i + 1][1] and heads[i + 1][0] == head
+            if shares_prev:
+                headers.append(rest)
+            elif shares_next:
+                headers.append(f"[{head}] {rest}")
+            else:
+                headers.append(names[i])
+        return headers
+
+    @staticmethod
+    def _source_precision(columns: Dict[str, pd.Series]) -> int:
+        """원본 값의 최대 소수점 자리 수 (MAX_SOURCE_PRECISION까지)"""
+        precision = 0
+        for values in columns.values():
+            for value in values.dropna():
+                decimals = f"{float(value):.{MAX_SOURCE_PRECISION}f}".rstrip("0").split(".")[1]
+                precision = max(precision, len(decimals))
+                if precision == MAX_SOURCE_PRECISION:
+                    return precision
+        return precision
+
+    @staticmethod
+    def _norm(label) -> str:
+        return "" if label is None or (isinstance(label, float) and np.isnan(label)) else str(label).replace(" ", "").strip()
+
+    @staticmethod
+    def _fmt(value, precision: int) -> str:
+        if value is None or pd.isna(value):
+            return "-"
+        rounded = round(float(value), precision)
+        if precision == 0 or float(rounded).is_integer():
+            return str(int(round(rounded)))
+        return f"{rounded:.{precision}f}".rstrip("0")
+
+    def _render(self, table: pd.DataFrame, columns: Dict[str, pd.Series], precision: int, rows: Optional[List[int]] = None) -> Tuple[str, int]:
+        names = list(columns.keys())
+        lines = ["구분 | " + " | ".join(self._compact_headers(names))]
+
+        has_sub = "소분류" in table.columns
+        current_group = None
+        indices = range(len(table)) if rows is None else rows
+        omitted = len(table) - len(indices)
+        for idx in indices:
+            group = table["대분류"].iloc[idx] if "대분류" in table.columns else ""
+            group = "" if group is None or (isinstance(group, float) and np.isnan(group)) else str(group).strip()
+            sub = table["소분류"].iloc[idx] if has_sub else None
+            sub = "" if sub is None or (isinstance(sub, float) and np.isnan(sub)) else str(sub).strip()
+            values = " | ".join(self._fmt(columns[n].iloc[idx], precision) for n in names)
+            if sub:
+                if group != current_group:
+                    lines.append(f"[{group}]")
+                    current_group = group
+                lines.append(f"{sub} | {values}")
+            else:
+                current_group = None
+                lines.append(f"{group or '-'} | {values}")
+        if omitted:
+            lines.append(f"... ({omitted}행 생략)")
+        return "\n".join(lines), omitted
+
+    def encode(self, table: Optional[pd.DataFrame], token_budget: Optional[int] = None, keep_groups: Optional[Iterable[str]] = None) -> TableEncoding:
+        budget = token_budget or self.token_budget
+        if table is None or not isinstance(table, pd.DataFrame) or table.empty:
+            return TableEncoding(text="", tokens=0, budget=budget, precision=0)
+
+        table = table.reset_index(drop=True)
+        columns, dropped = self._value_columns(table)
+        if not columns:
+            return TableEncoding(text="", tokens=0, budget=budget, precision=0, dropped_columns=dropped)
+
+        # 1~2단계: 원본 소수점 자리부터 예산에 맞을 때까지 축소
+        for precision in range(self._source_precision(columns), -1, -1):
+            text, omitted = self._render(table, columns, precision)
+            tokens = count_tokens(text, self.model)
+            if tokens <= budget:
+                return TableEncoding(text, tokens, budget, precision, list(columns.keys()), dropped, omitted)
+
+        # 3단계: 사례수 제거
+        if CASE_COLUMN in columns and len(columns) > 1:
+            columns.pop(CASE_COLUMN)
+            dropped.append(CASE_COLUMN)
+        # 4단계: 그룹 간 변동이 작은 컬럼부터 제거
+        while len(columns) > 1:
+            text, omitted = self._render(table, columns, 0)
+            tokens = count_tokens(text, self.model)
+            if tokens <= budget:
+                return TableEncoding(text, tokens, budget, 0, list(columns.keys()), dropped, omitted)
+            weakest = min(columns.keys(), key=lambda n: float(columns[n].std(skipna=True) or 0.0))
+            columns.pop(weakest)
+            dropped.append(weakest)
+
+        # 5단계: 행 생략 (뒤쪽 행부터, '전체'와 keep_groups 행은 유지)
+        protected_groups = {"전체"} | {self._norm(g) for g in (keep_groups or [])}
+        group_column = table["대분류"] if "대분류" in table.columns else pd.Series([""] * len(table))
+        protected = [idx for idx in range(len(table)) if self._norm(group_column.iloc[idx]) in protected_groups]
+        others = [idx for idx in range(len(table)) if idx not in protected]
+        keep = len(others)
+        text, omitted = self._render(table, columns, 0)
+        tokens = count_tokens(text, self.model)
+        while tokens > budget and keep > 0:
+            keep = keep // 2 if tokens > budget * 2 else keep - 1
+            text, omitted = self._render(table, columns, 0, rows=sorted(protected + others[:keep]))
+            tokens = count_tokens(text, self.model)
+        return TableEncoding(text, tokens, budget, 0, list(columns.keys()), dropped, omitted)
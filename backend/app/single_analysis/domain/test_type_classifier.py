@@ -0,0 +1,206 @@
+from typing import List, Dict, Optional, Callable, Awaitable
+from dataclasses import dataclass, field
+from collections import OrderedDict
+import hashlib
+import re
+
+
+VALID_TEST_TYPES = ("manual", "ft_test", "chi_square")
+
+# 분류에 사용하지 않는 메타 컬럼
+META_COLUMNS = {"대분류", "소분류", "사례수", "대분류_소분류"}
+
+# 복수응답/다중응답/복수 순위 (확실한 manual)
+MANUAL_TEXT_PATTERNS = [
+    r"\d\s*\+\s*\d",
+    r"복수",
+    r"다중",
+    r"multiple",
+    r"ranking",
+    r"모두\s*선택",
+]
+# 연속형 수치 응답 (평균, 점수, 척도)
+FT_TEXT_PATTERNS = [r"평균", r"점수", r"척도", r"\d\s*점", r"mean", r"score"]
+# 범주형 단일 선택 응답
+CHI_TEXT_PATTERNS = [r"이유", r"선택", r"이용\s*시설", r"장소", r"reason"]
+
+FT_COLUMN_PATTERNS = [r"평균", r"점\s*척도", r"\d\s*점", r"mean", r"score"]
+# 척도형 선택지 컬럼 (평균 컬럼이 없어도 범주형으로 단정하지 않음)
+SCALE_COLUMN_PATTERNS = [r"그렇다", r"그렇지\s*않다", r"만족", r"보통", r"동의", r"likely", r"agree", r"satisf"]
+
+
+@dataclass
+class TestTypeDecision:
+    """통계 검정 방법 결정 결과"""
+    test_type: str
+    confidence: float
+    source: str = "rule"  # rule, cache, llm
+    signature: str = ""
+    reasons: List[str] = field(default_factory=list)
+
+
+# 컬럼 시그니처 -> 결정 (요청 간 공유되는 프로세스 단위 메모)
+_signature_cache: "OrderedDict[str, TestTypeDecision]" = OrderedDict()
+_SIGNATURE_CACHE_MAX = 2048
+
+
+class TestTypeClassifier:
+    """질문 텍스트 키워드 + 컬럼명 패턴 기반 통계 검정 방법 분류기
+
+    신뢰도가 임계값 이상이면 로컬 결정을 그대로 사용하고, 낮은 경우에만 LLM을 호출한다.
+    결정은 컬럼 시그니처 해시로 메모되므로 같은 템플릿의 문항은 다시 분류하지 않는다.
+    """
+
+    def __init__(self, confidence_threshold: float = 0.75):
+        self.confidence_threshold = confidence_threshold
+
+    @staticmethod
+    def normalize_test_type(raw: str) -> str:
+        """LLM 응답 문자열을 manual/ft_test/chi_square 중 하나로 정규화 (실패 시 unknown)"""
+        output = (raw or "").strip().lower()
+        if "manual" in output:
+            return "manual"
+        if "chi" in output:
+            return "chi_square"
+        if "ft" in output:
+            return "ft_test"
+        return "unknown"
+
+    def _content_columns(self, columns: List[str]) -> List[str]:
+        return [str(c).strip() for c in columns if str(c).strip() and str(c).strip() not in META_COLUMNS]
+
+    def _matched(self, patterns: List[str], text: str) -> List[str]:
+        return [p for p in patterns if re.search(p, text, re.I)]
+
+    def signature(self, question_text: str, columns: List[str]) -> str:
+        """컬럼 구성 + 질문 텍스트 특징으로 시그니처 해시 생성"""
+        text = question_text or ""
+        text_flags = (
+            self._matched(MANUAL_TEXT_PATTERNS, text)
+            + self._matched(FT_TEXT_PATTERNS, text)
+            + self._matched(CHI_TEXT_PATTERNS, text)
+            + (["순위"] if "순위" in text else [])
+        )
+        payload = "|".join(self._content_columns(columns)) + "#" + ",".join(text_flags)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+    def score(self, question_text: str, columns: List[str]) -> TestTypeDecision:
+        """키워드/컬럼 패턴 점수로 로컬 결정 (메모 미사용)"""
+        text = question_text or ""
+        content_columns = self._content_columns(columns)
+        scores: Dict[str, float] = {t: 0.0 for t in VALID_TEST_TYPES}
+        reasons: List[str] = []
+
+        # 1. 질문 텍스트 키워드
+        manual_hits = self._matched(MANUAL_TEXT_PATTERNS, text)
+        if manual_hits:
+            scores["manual"] += 4
+            reasons.append(f"text:manual({', '.join(manual_hits)})")
+        elif "순위" in text:
+            # "1순위"만 있는 경우는 단일 선택 → manual 아님
+            scores["chi_square"] += 1
+            reasons.append("text:single_rank")
+        ft_hits = self._matched(FT_TEXT_PATTERNS, text)
+        if ft_hits:
+            scores["ft_test"] += 1
+            reasons.append(f"text:ft({', '.join(ft_hits)})")
+        chi_hits = self._matched(CHI_TEXT_PATTERNS, text)
+        if chi_hits:
+            scores["chi_square"] += 1
+            reasons.append(f"text:chi({', '.join(chi_hits)})")
+
+        # 2. 컬럼명 패턴
+        if content_columns:
+            ft_cols = [c for c in content_columns if self._matched(FT_COLUMN_PATTERNS, c)]
+            pct_cols = [c for c in content_columns if c.endswith("%")]
+            multi_rank_cols = [c for c in content_columns if "순위" in c and re.search(r"\d\s*\+\s*\d", c)]
+            single_rank_cols = [c for c in content_columns if "순위" in c and c not in multi_rank_cols]
+            if ft_cols:
+                scores["ft_test"] += 2
+                reasons.append(f"columns:ft({len(ft_cols)})")
+            if pct_cols:
+                scores["ft_test"] += 1
+                reasons.append(f"columns:percent({len(pct_cols)})")
+            if multi_rank_cols:
+                scores["manual"] += 2
+                reasons.append(f"columns:multi_rank({len(multi_rank_cols)})")
+            elif single_rank_cols:
+                scores["chi_square"] += 1
+                reasons.append(f"columns:single_rank({len(single_rank_cols)})")
+            choice_cols = [c for c in content_columns if c not in ft_cols and c not in pct_cols and "순위" not in c]
+            scale_cols = [c for c in choice_cols if self._matched(SCALE_COLUMN_PATTERNS, c)]
+            if scale_cols:
+                # 척도 분포표는 평균 컬럼 없이도 ft_test일 수 있으므로 선택지 근거에서 제외 (다른 근거 없으면 LLM)
+                reasons.append(f"columns:scale({len(scale_cols)})")
+            # 복수응답 문항도 선택지 컬럼 형태이므로 manual 키워드가 있으면 범주형 근거로 보지 않음
+            # 선택지 컬럼만으로는 약한 근거 (단독이면 임계값 미만이 되어 LLM 확인)
+            elif not manual_hits and not ft_cols and not pct_cols and len(choice_cols) >= 2:
+                scores["chi_square"] += 1
+                reasons.append(f"columns:choices({len(choice_cols)})")
+
+        total = sum(scores.values())
+        best = max(VALID_TEST_TYPES, key=lambda t: scores[t])
+        # 근거가 하나뿐이면 신뢰도를 낮춤
+        confidence = (scores[best] / total) if total else 0.0
+        if total < 2:
+            confidence *= 0.5
+        return TestTypeDecision(
+            test_type=best if total else "unknown",
+            confidence=round(confidence, 3),
+            source="rule",
+            signature=self.signature(text, columns),
+            reasons=reasons
+        )
+
+    def classify(self, question_text: str, columns: List[str]) -> TestTypeDecision:
+        """메모 조회 후 로컬 분류"""
+        sig = self.signature(question_text, columns)
+        cached = _signature_cache.get(sig)
+        if cached is not None:
+            _signature_cache.move_to_end(sig)
+            return TestTypeDecision(
+                test_type=cached.test_type,
+                confidence=cached.confidence,
+                source="cache",
+                signature=sig,
+                reasons=cached.reasons
+            )
+        decision = self.score(question_text, columns)
+        if self.is_confident(decision):
+            self.remember(decision)
+        return decision
+
+    def is_confident(self, decision: TestTypeDecision) -> bool:
+        return decision.test_type in VALID_TEST_TYPES and decision.confidence >= self.confidence_threshold
+
+    def remember(self, decision: TestTypeDecision) -> None:
+        """시그니처별 결정 저장 (LRU)"""
+        if not decision.signature or decision.test_type not in VALID_TEST_TYPES:
+            return
+        _signature_cache[decision.signature] = decision
+        _signature_cache.move_to_end(decision.signature)
+        while len(_signature_cache) > _SIGNATURE_CACHE_MAX:
+            _signature_cache.popitem(last=False)
+
+    def resolve_with_llm(self, decision: TestTypeDecision, llm_output: str) -> TestTypeDecision:
+        """저신뢰 결정을 LLM 응답으로 확정하고 메모"""
+        test_type = self.normalize_test_type(llm_output)
+        if test_type not in VALID_TEST_TYPES:
+            return TestTypeDecision(test_type=test_type, confidence=0.0, source="llm", signature=decision.signature, reasons=decision.reasons)
+        resolved = TestTypeDecision(
+            test_type=test_type,
+            confidence=1.0,
+            source="llm",
+            signature=decision.signature,
+            reasons=decision.reasons + ["llm"]
+        )
+        self.remember(resolved)
+        return resolved
+
+    async def decide(self, question_text: str, columns: List[str], llm_fallback: Callable[[], Awaitable[str]]) -> TestTypeDecision:
+        """로컬 분류 → 저신뢰인 경우에만 llm_fallback 호출"""
+        decision = self.classify(question_text, columns)
+        if decision.source == "cache" or self.is_confident(decision):
+            return decision
+        llm_output = await llm_fallback()
+        return self.resolve_with_llm(decision, llm_output)
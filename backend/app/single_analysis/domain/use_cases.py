@@ -1,6 +1,8 @@
 from typing import Dict, Any, Optional
 from app.single_analysis.domain.entities import AgentState
 from app.single_analysis.domain.services import TableAnalysisService
+from app.utils.llm_budget import LLMBudget
+from app.utils.cancellation import CancellationToken, checkpoint
 
 class TableAnalysisUseCase:
     """테이블 분석 유스케이스"""
@@ -8,6 +10,14 @@ class TableAnalysisUseCase:
         self.service = service
 
     async def execute(self, file_content: bytes, file_name: str, options: Dict[str, Any] = None, raw_data_content: bytes = None, raw_data_filename: str = None, use_statistical_test: bool = True) -> Dict[str, Any]:
+        # 배치에서는 job 예산의 질문별 scope가 넘어옴
+        budget = (options.get("budget") if options else None) or LLMBudget("single_analysis")
+        # 배치 job이 취소되면 노드 사이와 LLM 호출 직전에 JobCancelled로 중단
+        cancel_token = (options.get("cancel_token") if options else None) or CancellationToken("single_analysis")
+        with budget.activate(), cancel_token.activate():
+            return await self._execute(file_content, file_name, options, raw_data_content, use_statistical_test, budget)
+
+    async def _execute(self, file_content: bytes, file_name: str, options: Optional[Dict[str, Any]], raw_data_content: Optional[bytes], use_statistical_test: bool, budget: LLMBudget) -> Dict[str, Any]:
         try:
             state = AgentState(
                 uploaded_file=file_content,
@@ -16,36 +26,69 @@ class TableAnalysisUseCase:
                 selected_key=options.get("selected_key", "") if options else "",
                 lang=options.get("lang", "한국어") if options else "한국어",
                 user_id=options.get("user_id") if options else None,
-                raw_data_file=raw_data_content
+                raw_data_file=raw_data_content,
+                context=options.get("context") if options else None
             )
             # use_statistical_test 설정
             state.use_statistical_test = use_statistical_test
             on_step = options.get("on_step") if options else None
+            # 환각 검증과 문장 다듬기를 병렬로 실행 (accept 시 LLM 왕복 1회 절약)
+            speculative_polish = options.get("speculative_polish", True) if options else True
+            # fast: 분석/검증/다듬기 단일 호출 (가설 생성 생략, 자체 검증 reject 시 전체 체인으로 전환)
+            state.analysis_mode = options.get("analysis_mode", "full") if options else "full"
+            if state.analysis_mode != "fast" and budget.prefers_fast_mode():
+                budget.degrade("fast_mode")
+                state.analysis_mode = "fast"
 
             state = await self.service.parse_table(state, on_step)
-            state = await self.service.generate_hypothesis(state, on_step)
-            state = await self.service.decide_test_type(state, on_step)
+            if state.analysis_mode != "fast":
+                checkpoint()
+                state = await self.service.generate_hypothesis(state, on_step)
+            # 배치는 job 시작 시 일괄 결정한 test_type을 넘김
+            preset_test_type = options.get("test_type") if options else None
+            if preset_test_type:
+                state.test_type = preset_test_type if state.use_statistical_test else "manual"
+            else:
+                state = await self.service.decide_test_type(state, on_step)
+            checkpoint()
             state = await self.service.run_statistical_analysis(state, on_step)
             state = await self.service.extract_anchor(state, on_step)
-            state = await self.service.analyze_table(state, on_step)
+            checkpoint()
+            if state.analysis_mode == "fast":
+                state = await self.service.fast_analyze(state, on_step)
+            if state.fast_verdict != "accept":
+                checkpoint()
+                state = await self.service.analyze_table(state, on_step)
 
-            # 환각 검증 및 수정 루프
-            max_revisions = 4
-            while state.hallucination_reject_num < max_revisions:
-                state = await self.service.check_hallucination(state, on_step)
+            # 환각 검증 및 수정 루프 (0이면 검증/수정 생략)
+            max_revisions = options.get("max_revisions", 4) if options else 4
+            while state.fast_verdict != "accept" and state.hallucination_reject_num < max_revisions:
+                checkpoint()
+                if speculative_polish:
+                    state = await self.service.check_hallucination_with_speculative_polish(state, on_step)
+                else:
+                    state = await self.service.check_hallucination(state, on_step)
                 if state.hallucination_check == "accept":
                     break
                 elif state.hallucination_check == "reject":
-                    if state.hallucination_reject_num >= 4:
+                    if state.hallucination_reject_num >= max_revisions:
                         if on_step:
                             on_step("⚠️ 거부 횟수 초과, 종료합니다.")
                         break
+                    if not budget.allows_revision():
+                        budget.degrade("skip_revision")
+                        if on_step:
+                            on_step("⚠️ 예산 사용량 초과로 수정 단계를 생략합니다.")
+                        break
+                    checkpoint()
                     state = await self.service.revise_analysis(state, on_step)
                     state.hallucination_reject_num += 1
                 else:
                     raise Exception(f"예상치 못한 결정: {state.hallucination_check}")
 
-            state = await self.service.polish_sentence(state, on_step)
+            if state.fast_verdict != "accept" and state.speculative_polish != "used":
+                checkpoint()
+                state = await self.service.polish_sentence(state, on_step)
 
             return {
                 "success": True,
@@ -57,6 +100,11 @@ class TableAnalysisUseCase:
                     "anchor": state.anchor,
                     "revised_analysis_history": state.revised_analysis_history,
                     "test_type": state.test_type,
+                    "table_encoding": state.linearized_table_stats,
+                    "speculative_polish": state.speculative_polish,
+                    "analysis_mode": state.analysis_mode,
+                    "fast_verdict": state.fast_verdict,
+                    "budget": budget.finish(),
                     "ft_test_result": state.ft_test_result.to_dict(orient="records") if hasattr(state.ft_test_result, "to_dict") else (state.ft_test_result if isinstance(state.ft_test_result, list) else []),
                 }
             }
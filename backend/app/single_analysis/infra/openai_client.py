@@ -5,6 +5,9 @@ import os
 from dotenv import load_dotenv
 from pydantic import SecretStr
 
+from app.utils.llm_gateway import get_llm_gateway
+from app.utils.llm_resilience import LLMError
+
 load_dotenv()
 
 
@@ -15,27 +18,19 @@ class OpenAIClient:
         self.default_model = model
         self.default_temperature = temperature
     
-    async def call(self, messages: list[dict[str, str]], model: str = "gpt-4o-mini", temperature: float = 0.3) -> str:
-        """OpenAI API 호출"""
+    async def call(self, messages: list[dict[str, str]], model: str = "gpt-4o-mini", temperature: float = 0.3, route: str = None, json_mode: bool = False) -> str:
+        """OpenAI API 호출 (공용 LLM gateway 경유, route: 노드별 모델/타임아웃/hedge 설정 이름, json_mode: JSON 응답 강제)"""
         try:
-            from langchain_openai import ChatOpenAI
-            from langchain_core.messages import SystemMessage, HumanMessage
-            from pydantic import SecretStr
-            import os
-            langchain_messages = []
-            for msg in messages:
-                if msg["role"] == "system":
-                    langchain_messages.append(SystemMessage(content=msg["content"]))
-                else:
-                    langchain_messages.append(HumanMessage(content=msg["content"]))
             # model, temperature 파라미터를 우선 사용, 없으면 기본값 사용
-            llm = ChatOpenAI(
+            return await get_llm_gateway().chat(
+                messages,
                 model=model or self.default_model,
                 temperature=temperature if temperature is not None else self.default_temperature,
-                api_key=SecretStr(os.getenv("OPENAI_API_KEY") or "")
+                route=route,
+                json_mode=json_mode
             )
-            response = await llm.ainvoke(langchain_messages)
-            # response.content가 string임을 보장
-            return str(response.content).strip()
+        except LLMError:
+            # transient/fatal 구분과 route 정보를 유지한 채 전달
+            raise
         except Exception as e:
             raise Exception(f"OpenAI API 호출 실패: {str(e)}") 
\ No newline at end of file
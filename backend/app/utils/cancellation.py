@@ -0,0 +1,101 @@
+from typing import Dict, Optional, Set
+from contextlib import contextmanager
+from contextvars import ContextVar
+import asyncio
+
+
+class JobCancelled(asyncio.CancelledError):
+    """취소된 job의 checkpoint에서 발생 (태스크 취소와 같은 경로로 처리되도록 CancelledError 하위 클래스)"""
+
+
+class CancellationToken:
+    """job 단위 협조적 취소 토큰
+
+    파이프라인은 노드 사이마다 raise_if_cancelled()로 확인하고, cancel()은 track()으로 등록된
+    태스크도 함께 취소해 진행 중인 LLM 호출까지 중단.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.cancelled = False
+        self.reason: Optional[str] = None
+        self._tasks: Set[asyncio.Task] = set()
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        if self.cancelled:
+            task.cancel()
+        return task
+
+    def cancel(self, reason: str = "cancelled") -> int:
+        """취소 표시 후 등록된 태스크 취소, 취소한 태스크 수 반환"""
+        self.cancelled = True
+        self.reason = reason
+        tasks = [task for task in self._tasks if not task.done()]
+        for task in tasks:
+            task.cancel()
+        return len(tasks)
+
+    def raise_if_cancelled(self) -> None:
+        if self.cancelled:
+            raise JobCancelled(f"{self.name}: {self.reason}")
+
+    @contextmanager
+    def activate(self):
+        """이 블록(과 여기서 생성된 태스크)의 LLM 호출 전에 이 토큰을 확인"""
+        token = _current_token.set(self)
+        try:
+            yield self
+        finally:
+            _current_token.reset(token)
+
+
+_current_token: ContextVar[Optional[CancellationToken]] = ContextVar("cancellation_token", default=None)
+
+
+def current_cancellation() -> Optional[CancellationToken]:
+    return _current_token.get()
+
+
+def checkpoint() -> None:
+    """현재 컨텍스트의 job이 취소되었으면 JobCancelled 발생"""
+    token = _current_token.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+class CancellationRegistry:
+    """프로세스 안에서 실행 중인 job의 취소 토큰/태스크 목록"""
+
+    def __init__(self):
+        self._tokens: Dict[str, CancellationToken] = {}
+
+    def token(self, job_id: str) -> CancellationToken:
+        """job의 토큰 (없으면 생성)"""
+        if job_id not in self._tokens:
+            self._tokens[job_id] = CancellationToken(job_id)
+        return self._tokens[job_id]
+
+    def cancel(self, job_id: str, reason: str = "cancelled") -> bool:
+        """이 프로세스에서 실행 중인 job이면 취소하고 True"""
+        token = self._tokens.get(job_id)
+        if token is None:
+            return False
+        cancelled_tasks = token.cancel(reason)
+        print(f"[cancellation] job {job_id} 취소 ({reason}, 태스크 {cancelled_tasks}개 중단)")
+        return True
+
+    def release(self, job_id: str) -> None:
+        """job 실행이 끝나면 토큰 제거"""
+        self._tokens.pop(job_id, None)
+
+    def active_jobs(self) -> Set[str]:
+        return set(self._tokens)
+
+
+_registry = CancellationRegistry()
+
+
+def get_cancellation_registry() -> CancellationRegistry:
+    return _registry
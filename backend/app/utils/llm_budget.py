@@ -0,0 +1,129 @@
+from typing import Dict, Any, Optional
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+import os
+import time
+
+
+# job 단위 LLM 사용량 상한 (0이면 무제한)
+LLM_JOB_MAX_TOKENS = int(os.getenv("LLM_JOB_MAX_TOKENS", "0"))
+LLM_JOB_MAX_SECONDS = float(os.getenv("LLM_JOB_MAX_SECONDS", "0"))
+# 상한 대비 사용 비율이 이 값을 넘으면 단계적으로 품질을 낮춤 (수정 루프 생략 -> fast 모드 -> 컨텍스트 절단)
+LLM_BUDGET_SKIP_REVISION_RATIO = float(os.getenv("LLM_BUDGET_SKIP_REVISION_RATIO", "0.6"))
+LLM_BUDGET_FAST_MODE_RATIO = float(os.getenv("LLM_BUDGET_FAST_MODE_RATIO", "0.8"))
+
+
+@dataclass
+class NodeSpend:
+    """노드(route)별 호출 수/토큰/소요 시간"""
+    calls: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    elapsed_ms: float = 0.0
+
+
+class LLMBudget:
+    """job 단위 토큰/시간 예산 (gateway가 현재 예산에 호출별 사용량을 기록)
+
+    scope()로 만든 하위 예산(배치의 질문별 등)은 사용량을 상위 예산에도 합산하고,
+    품질 저하 판단은 자신과 상위 중 더 많이 쓴 쪽을 따른다.
+    """
+
+    def __init__(self, name: str, max_tokens: Optional[int] = None, max_seconds: Optional[float] = None, parent: Optional["LLMBudget"] = None):
+        self.name = name
+        self.max_tokens = LLM_JOB_MAX_TOKENS if max_tokens is None and parent is None else max_tokens
+        self.max_seconds = LLM_JOB_MAX_SECONDS if max_seconds is None and parent is None else max_seconds
+        self.parent = parent
+        self.started = time.monotonic()
+        self.finished: Optional[float] = None
+        self.nodes: Dict[str, NodeSpend] = {}
+        self.degradations: Dict[str, int] = {}
+
+    def scope(self, name: str) -> "LLMBudget":
+        return LLMBudget(name, max_tokens=0, max_seconds=0, parent=self)
+
+    def record(self, node: str, prompt_tokens: int, completion_tokens: int, elapsed_ms: float) -> None:
+        spend = self.nodes.setdefault(node, NodeSpend())
+        spend.calls += 1
+        spend.prompt_tokens += prompt_tokens
+        spend.completion_tokens += completion_tokens
+        spend.elapsed_ms += elapsed_ms
+        if self.parent is not None:
+            self.parent.record(node, prompt_tokens, completion_tokens, elapsed_ms)
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(s.prompt_tokens + s.completion_tokens for s in self.nodes.values())
+
+    @property
+    def elapsed_s(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    def used_ratio(self) -> float:
+        """토큰/시간 상한 중 더 많이 쓴 쪽의 사용 비율 (상한이 없으면 0)"""
+        ratios = [0.0]
+        if self.max_tokens:
+            ratios.append(self.total_tokens / self.max_tokens)
+        if self.max_seconds:
+            ratios.append(self.elapsed_s / self.max_seconds)
+        if self.parent is not None:
+            ratios.append(self.parent.used_ratio())
+        return max(ratios)
+
+    def remaining_tokens(self) -> Optional[int]:
+        """남은 토큰 수 (상한이 없으면 None)"""
+        remaining = [self.max_tokens - self.total_tokens] if self.max_tokens else []
+        if self.parent is not None and self.parent.remaining_tokens() is not None:
+            remaining.append(self.parent.remaining_tokens())
+        return max(0, min(remaining)) if remaining else None
+
+    def allows_revision(self) -> bool:
+        return self.used_ratio() < LLM_BUDGET_SKIP_REVISION_RATIO
+
+    def prefers_fast_mode(self) -> bool:
+        return self.used_ratio() >= LLM_BUDGET_FAST_MODE_RATIO
+
+    def exhausted(self) -> bool:
+        return self.used_ratio() >= 1.0
+
+    def degrade(self, action: str) -> None:
+        """예산 때문에 적용한 품질 저하 기록 (skip_revision, fast_mode, truncate_context, skip_chunk)"""
+        self.degradations[action] = self.degradations.get(action, 0) + 1
+        if self.parent is not None:
+            self.parent.degrade(action)
+        print(f"[llm_budget] {self.name}: {action} (사용률 {self.used_ratio():.0%})")
+
+    def finish(self) -> Dict[str, Any]:
+        self.finished = time.monotonic()
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "max_tokens": self.max_tokens or None,
+            "max_seconds": self.max_seconds or None,
+            "prompt_tokens": sum(s.prompt_tokens for s in self.nodes.values()),
+            "completion_tokens": sum(s.completion_tokens for s in self.nodes.values()),
+            "total_tokens": self.total_tokens,
+            "elapsed_s": round(self.elapsed_s, 2),
+            "used_ratio": round(self.used_ratio(), 3),
+            "degradations": dict(self.degradations),
+            "nodes": {name: {**asdict(s), "elapsed_ms": round(s.elapsed_ms, 1)} for name, s in self.nodes.items()},
+        }
+
+    @contextmanager
+    def activate(self):
+        """이 블록(과 여기서 생성된 태스크)의 LLM 호출을 이 예산에 기록"""
+        token = _current_budget.set(self)
+        try:
+            yield self
+        finally:
+            _current_budget.reset(token)
+
+
+_current_budget: ContextVar[Optional[LLMBudget]] = ContextVar("llm_budget", default=None)
+
+
+def current_budget() -> Optional[LLMBudget]:
+    return _current_budget.get()
@@ -0,0 +1,331 @@
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+import asyncio
+import hashlib
+import json
+import os
+import time
+from dotenv import load_dotenv
+from app.utils.llm_routing import LLMRouter, LLMRoute
+from app.utils.llm_budget import current_budget
+from app.utils.cancellation import checkpoint
+from app.utils.llm_limiter import get_llm_semaphore
+from app.utils.tokens import count_tokens, count_message_tokens
+from app.utils.llm_resilience import (
+    CircuitBreaker, RetryMetrics, LLMTransientError, LLMCircuitOpenError,
+    classify_error, error_for_status, backoff_delay_s,
+)
+
+load_dotenv()
+
+
+# OpenAI 호환 엔드포인트 (로컬 stand-in 서버 사용 시 http://localhost:8100/v1)
+LLM_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+# 설정 시 실제 응답을 JSONL로 기록하여 stand-in 서버에서 재생
+LLM_RECORD_PATH = os.getenv("LLM_RECORD_PATH") or None
+# 동일 요청(같은 request_key)이 이미 진행 중이면 새로 보내지 않고 그 결과를 공유
+LLM_SINGLE_FLIGHT = os.getenv("LLM_SINGLE_FLIGHT", "true").lower() == "true"
+DEFAULT_CHAT_MODEL = "gpt-4o-mini"
+DEFAULT_EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def request_key(kind: str, model: str, payload: Any) -> str:
+    """녹화/재생용 요청 키 (kind + model + 메시지/입력의 sha256)"""
+    raw = json.dumps({"kind": kind, "model": model, "payload": payload}, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMGateway:
+    """모든 slice의 OpenAIClient가 공유하는 chat/embedding 호출 경로
+
+    base_url을 바꾸면 전체 파이프라인이 로컬 stand-in 서버로 향한다.
+    """
+
+    def __init__(self, base_url: Optional[str] = LLM_BASE_URL, record_path: Optional[str] = LLM_RECORD_PATH, router: Optional[LLMRouter] = None, single_flight: bool = LLM_SINGLE_FLIGHT):
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.record_path = record_path
+        self.single_flight = single_flight
+        # request_key -> (진행 중인 호출, 대기 중인 호출자 수)
+        self._inflight: Dict[str, List[Any]] = {}
+        self.router = router or LLMRouter()
+        self.breakers: Dict[str, CircuitBreaker] = {"chat": CircuitBreaker("chat"), "embedding": CircuitBreaker("embedding")}
+        self.retry_metrics = RetryMetrics()
+        self._chat_models: Dict[Tuple[str, float], Any] = {}
+
+    @property
+    def api_key(self) -> str:
+        # stand-in 서버는 키를 검사하지 않음
+        return os.getenv("OPENAI_API_KEY") or ("stand-in" if self.base_url else "")
+
+    @property
+    def embeddings_url(self) -> str:
+        return f"{self.base_url or 'https://api.openai.com/v1'}/embeddings"
+
+    def _chat_model(self, model: str, temperature: float):
+        """(model, temperature)별 ChatOpenAI 인스턴스 재사용"""
+        cache_key = (model, temperature)
+        if cache_key not in self._chat_models:
+            from langchain_openai import ChatOpenAI
+            kwargs: Dict[str, Any] = {
+                "model": model,
+                "temperature": temperature,
+                "api_key": self.api_key,
+                # 재시도/타임아웃은 route 설정에 따라 gateway에서 처리
+                "max_retries": 0,
+            }
+            if self.base_url:
+                kwargs["base_url"] = self.base_url
+            self._chat_models[cache_key] = ChatOpenAI(**kwargs)
+        return self._chat_models[cache_key]
+
+    @staticmethod
+    def _to_langchain(messages: List[Dict[str, str]]) -> list:
+        from langchain_core.messages import SystemMessage, HumanMessage
+        converted = []
+        for msg in messages:
+            if msg["role"] == "system":
+                converted.append(SystemMessage(content=msg["content"]))
+            else:
+                converted.append(HumanMessage(content=msg["content"]))
+        return converted
+
+    def _record(self, kind: str, model: str, payload: Any, response: Any, latency_ms: float) -> None:
+        if not self.record_path:
+            return
+        try:
+            with open(self.record_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({
+                    "key": request_key(kind, model, payload),
+                    "kind": kind,
+                    "model": model,
+                    "response": response,
+                    "latency_ms": round(latency_ms, 1),
+                }, ensure_ascii=False) + "\n")
+        except Exception as e:
+            print(f"[llm_gateway] 응답 기록 실패: {e}")
+
+    @staticmethod
+    def _usage(response: Any) -> Tuple[int, int, int]:
+        """(prompt, cached prompt, completion) 토큰 수 (응답에 usage가 없으면 0)"""
+        usage = (getattr(response, "response_metadata", None) or {}).get("token_usage") or {}
+        if usage:
+            details = usage.get("prompt_tokens_details") or {}
+            return int(usage.get("prompt_tokens") or 0), int(details.get("cached_tokens") or 0), int(usage.get("completion_tokens") or 0)
+        metadata = getattr(response, "usage_metadata", None) or {}
+        cached = (metadata.get("input_token_details") or {}).get("cache_read") or 0
+        return int(metadata.get("input_tokens") or 0), int(cached), int(metadata.get("output_tokens") or 0)
+
+    async def _hedged(self, factory: Callable[[], Awaitable[Any]], route: LLMRoute) -> Any:
+        """p95 예산을 넘기면 같은 요청을 한 번 더 보내고 먼저 성공한 응답 사용
+
+        어느 시점에 끝나든(호출자 취소/타임아웃 포함) 아직 진행 중인 요청은 모두 취소.
+        """
+        stats = self.router.stats_for(route)
+        primary = asyncio.ensure_future(factory())
+        backup = None
+        try:
+            hedge_delay = self.router.hedge_delay_s(route)
+            if hedge_delay is None:
+                return await primary
+            done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+            if done:
+                return primary.result()
+
+            # backup도 전역 동시성 슬롯을 하나 차지 (남은 슬롯이 없으면 hedge 없이 원 요청만 기다림)
+            semaphore = get_llm_semaphore()
+            if semaphore.locked():
+                return await primary
+            await semaphore.acquire()
+            stats.hedges += 1
+            backup = asyncio.ensure_future(factory())
+            backup.add_done_callback(lambda _: semaphore.release())
+            pending = {primary, backup}
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            stats.hedge_wins += 1
+                        return task.result()
+            # 둘 다 실패하면 원 요청의 오류를 전달
+            raise primary.exception()
+        finally:
+            for task in (primary, backup):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _call_route(self, route: LLMRoute, factory: Callable[[], Awaitable[Any]], kind: str = "chat", deadline_s: Optional[float] = None) -> Any:
+        """route의 타임아웃/재시도/hedge와 circuit breaker를 적용하고 지연 분포 기록
+
+        429/5xx/타임아웃/연결 오류만 지수 백오프(jitter)로 재시도하고, fatal 오류는 즉시 LLMFatalError로 실패.
+        """
+        stats = self.router.stats_for(route)
+        breaker = self.breakers[kind]
+        deadline_s = deadline_s or route.deadline_s
+        deadline = time.monotonic() + deadline_s if deadline_s else None
+        for attempt in range(route.max_retries + 1):
+            timeout = route.timeout_s
+            if deadline is not None:
+                timeout = min(timeout, deadline - time.monotonic())
+                if timeout <= 0:
+                    error = LLMTransientError(f"{route.name}: 호출 기한 {deadline_s}s 초과", route.name, reason="deadline")
+                    self.retry_metrics.record_failure(route.name, error)
+                    raise error
+            try:
+                probe = breaker.before_call(route.name)
+            except LLMCircuitOpenError as e:
+                self.retry_metrics.record_failure(route.name, e)
+                raise
+            stats.calls += 1
+            try:
+                # 전역 동시성 슬롯은 provider 호출 동안만 점유 (슬롯 대기 시간은 timeout/지연 통계에 넣지 않음)
+                async with get_llm_semaphore():
+                    started = time.perf_counter()
+                    result = await asyncio.wait_for(self._hedged(factory, route), timeout=timeout)
+                stats.observe((time.perf_counter() - started) * 1000)
+                breaker.record_success()
+                return result
+            except asyncio.TimeoutError:
+                stats.timeouts += 1
+                error = LLMTransientError(f"{route.name}: {timeout:.1f}s 내 응답 없음", route.name, reason="timeout")
+            except LLMCircuitOpenError:
+                if probe:
+                    breaker.release_probe()
+                raise
+            except Exception as e:
+                stats.failures += 1
+                error = classify_error(e, route.name)
+                error.__cause__ = e
+            except BaseException:
+                # 취소(polish/job 취소, 상위 기한, hedge 패배)는 provider 상태와 무관하므로 probe 자리만 반납
+                if probe:
+                    breaker.release_probe()
+                raise
+            breaker.record_failure(error)
+
+            if not isinstance(error, LLMTransientError) or attempt >= route.max_retries:
+                self.retry_metrics.record_failure(route.name, error)
+                print(f"[llm_gateway] {route.name} 호출 실패 ({error.reason}, {attempt + 1}회 시도): {error}")
+                raise error
+            delay = backoff_delay_s(attempt, error.__cause__ or error)
+            if deadline is not None:
+                delay = min(delay, max(0.0, deadline - time.monotonic()))
+            self.retry_metrics.record_retry(route.name, error)
+            print(f"[llm_gateway] {route.name} 재시도 {attempt + 1}/{route.max_retries} ({error.reason}, {delay:.2f}s 후)")
+            await asyncio.sleep(delay)
+
+    async def _coalesced(self, key: str, route: LLMRoute, call: Callable[[], Awaitable[Any]]) -> Any:
+        """같은 key의 호출이 진행 중이면 그 결과를 함께 기다림 (single-flight)
+
+        호출자 한 명이 취소돼도 다른 호출자를 위해 계속 진행하고, 모두 취소되면 호출도 취소.
+        """
+        if not self.single_flight:
+            return await call()
+        entry = self._inflight.get(key)
+        if entry is None:
+            task = asyncio.ensure_future(call())
+            entry = [task, 0]
+            self._inflight[key] = entry
+            task.add_done_callback(lambda _: self._inflight.pop(key, None) if self._inflight.get(key) is entry else None)
+        else:
+            self.router.stats_for(route).coalesced += 1
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and entry[1] == 1:
+                task.cancel()
+            raise
+        finally:
+            entry[1] -= 1
+
+    async def chat(self, messages: List[Dict[str, str]], model: str = DEFAULT_CHAT_MODEL, temperature: float = 0.3, route: Optional[str] = None, deadline_s: Optional[float] = None, json_mode: bool = False) -> str:
+        """chat completion 호출 후 content 문자열 반환 (route 설정이 model을 지정하면 우선, json_mode: JSON 객체 응답 강제)"""
+        # 취소된 job은 새 호출을 보내지 않음
+        checkpoint()
+        resolved = self.router.resolve(route)
+        model = resolved.model or model or DEFAULT_CHAT_MODEL
+        llm = self._chat_model(model, temperature)
+        if json_mode:
+            llm = llm.bind(response_format={"type": "json_object"})
+        langchain_messages = self._to_langchain(messages)
+
+        async def invoke() -> str:
+            started = time.perf_counter()
+            response = await self._call_route(resolved, lambda: llm.ainvoke(langchain_messages), "chat", deadline_s)
+            content = str(response.content).strip()
+            latency_ms = (time.perf_counter() - started) * 1000
+            prompt_tokens, cached_tokens, completion_tokens = self._usage(response)
+            self.router.stats_for(resolved).observe_usage(prompt_tokens, cached_tokens, completion_tokens)
+            budget = current_budget()
+            if budget is not None:
+                # usage를 주지 않는 엔드포인트는 토큰 수를 직접 계산
+                budget.record(
+                    resolved.name,
+                    prompt_tokens or count_message_tokens(messages, model),
+                    completion_tokens or count_tokens(content, model),
+                    latency_ms
+                )
+            self._record("chat", model, messages, content, latency_ms)
+            return content
+
+        key = request_key("chat", model, {"messages": messages, "temperature": temperature, "json_mode": json_mode})
+        return await self._coalesced(key, resolved, invoke)
+
+    async def _post_embedding(self, payload: Dict[str, Any]) -> List[float]:
+        import aiohttp
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+        async with aiohttp.ClientSession() as session:
+            async with session.post(self.embeddings_url, headers=headers, json=payload) as resp:
+                data = await resp.json(content_type=None)
+                if resp.status != 200:
+                    error = (data or {}).get("error") if isinstance(data, dict) else None
+                    raise error_for_status(resp.status, f"임베딩 API 오류: {data}", (error or {}).get("code"))
+                return data["data"][0]["embedding"]
+
+    async def embed(self, text: str, model: str = DEFAULT_EMBEDDING_MODEL, route: Optional[str] = "rag.embedding") -> List[float]:
+        """embedding 호출"""
+        checkpoint()
+        resolved = self.router.resolve(route)
+        model = resolved.model or model or DEFAULT_EMBEDDING_MODEL
+        payload = {"input": text, "model": model}
+
+        async def invoke() -> List[float]:
+            started = time.perf_counter()
+            embedding = await self._call_route(resolved, lambda: self._post_embedding(payload), "embedding")
+            latency_ms = (time.perf_counter() - started) * 1000
+            budget = current_budget()
+            if budget is not None:
+                budget.record(resolved.name, count_tokens(text, model), 0, latency_ms)
+            self._record("embedding", model, text, embedding, latency_ms)
+            return embedding
+
+        return await self._coalesced(request_key("embedding", model, text), resolved, invoke)
+
+    def metrics(self) -> Dict[str, Any]:
+        """route별 지연 분포/hedge/timeout/coalesced, 재시도 사유, circuit 상태"""
+        return {
+            "base_url": self.base_url,
+            "routes": self.router.metrics(),
+            "single_flight": {
+                "enabled": self.single_flight,
+                "in_flight": len(self._inflight),
+                "coalesced": sum(stats.coalesced for stats in self.router.stats.values()),
+            },
+            "retries": self.retry_metrics.summary(),
+            "circuits": {kind: breaker.snapshot() for kind, breaker in self.breakers.items()},
+        }
+
+
+_gateway: Optional[LLMGateway] = None
+
+
+def get_llm_gateway() -> LLMGateway:
+    """프로세스 공용 LLM gateway"""
+    global _gateway
+    if _gateway is None:
+        _gateway = LLMGateway()
+    return _gateway
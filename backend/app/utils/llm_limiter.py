@@ -0,0 +1,17 @@
+from typing import Optional
+import asyncio
+import os
+
+
+# 프로세스 전체에서 동시에 provider로 나가는 LLM 호출 수 상한 (gateway가 시도 단위로 획득)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+
+_semaphore: Optional[asyncio.Semaphore] = None
+
+
+def get_llm_semaphore() -> asyncio.Semaphore:
+    """전역 LLM 동시성 세마포어"""
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _semaphore
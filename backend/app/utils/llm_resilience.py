@@ -0,0 +1,200 @@
+from typing import Dict, Any, Optional
+from collections import defaultdict
+import asyncio
+import os
+import random
+import time
+
+
+# 지수 백오프 (base * 2^attempt, 상한 max, full jitter)
+LLM_BACKOFF_BASE_S = float(os.getenv("LLM_BACKOFF_BASE_S", "0.5"))
+LLM_BACKOFF_MAX_S = float(os.getenv("LLM_BACKOFF_MAX_S", "20"))
+# 연속 일시 오류가 threshold회 쌓이면 cooldown 동안 즉시 실패
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_COOLDOWN_S = float(os.getenv("LLM_BREAKER_COOLDOWN_S", "30"))
+
+TRANSIENT_STATUS = {408, 429}
+FATAL_ERROR_CODES = {"insufficient_quota", "context_length_exceeded", "invalid_api_key", "model_not_found"}
+
+
+class LLMError(Exception):
+    """LLM/embedding 호출 실패 (route, 사유 포함)"""
+
+    def __init__(self, message: str, route: Optional[str] = None, reason: str = "unknown", status: Optional[int] = None):
+        super().__init__(message)
+        self.route = route
+        self.reason = reason
+        self.status = status
+
+
+class LLMTransientError(LLMError):
+    """재시도하면 성공할 수 있는 오류 (429, 5xx, 타임아웃, 연결 오류)"""
+
+
+class LLMFatalError(LLMError):
+    """재시도해도 같은 결과인 오류 (인증, 잘못된 요청, 컨텍스트 초과, 할당량 소진)"""
+
+
+class LLMCircuitOpenError(LLMTransientError):
+    """provider 장애로 circuit이 열려 호출하지 않고 즉시 실패"""
+
+
+def _error_code(error: BaseException) -> Optional[str]:
+    code = getattr(error, "code", None)
+    if code:
+        return str(code)
+    body = getattr(error, "body", None)
+    if isinstance(body, dict):
+        return body.get("code") or (body.get("error") or {}).get("code")
+    return None
+
+
+def error_for_status(status: int, message: str, code: Optional[str] = None, route: Optional[str] = None) -> LLMError:
+    """HTTP 상태/오류 코드로 transient/fatal 판정"""
+    if code in FATAL_ERROR_CODES:
+        return LLMFatalError(message, route, reason=code, status=status)
+    if status == 429:
+        return LLMTransientError(message, route, reason="rate_limit", status=status)
+    if status >= 500 or status in TRANSIENT_STATUS:
+        return LLMTransientError(message, route, reason="server_error", status=status)
+    return LLMFatalError(message, route, reason=f"http_{status}", status=status)
+
+
+def classify_error(error: BaseException, route: Optional[str] = None) -> LLMError:
+    """예외를 transient/fatal LLMError로 변환"""
+    if isinstance(error, LLMError):
+        return error
+    message = str(error) or error.__class__.__name__
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError)):
+        return LLMTransientError(message, route, reason="timeout")
+
+    status = getattr(error, "status_code", None) or getattr(error, "status", None)
+    code = _error_code(error)
+    if isinstance(status, int):
+        return error_for_status(status, message, code, route)
+    if code in FATAL_ERROR_CODES:
+        return LLMFatalError(message, route, reason=code)
+
+    # openai.APIConnectionError/APITimeoutError, aiohttp.ClientError 등 네트워크 계열
+    name = error.__class__.__name__
+    if isinstance(error, (ConnectionError, OSError)) or "Connection" in name or "Timeout" in name or "ClientError" in name:
+        return LLMTransientError(message, route, reason="connection")
+    return LLMFatalError(message, route, reason="unexpected")
+
+
+def retry_after_s(error: BaseException) -> Optional[float]:
+    """429 응답의 Retry-After 헤더 (초)"""
+    response = getattr(error, "response", None) or getattr(getattr(error, "__cause__", None), "response", None)
+    headers = getattr(response, "headers", None)
+    if not headers:
+        return None
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay_s(attempt: int, error: Optional[BaseException] = None, base: float = LLM_BACKOFF_BASE_S, cap: float = LLM_BACKOFF_MAX_S) -> float:
+    """full jitter 지수 백오프 (Retry-After가 더 길면 그 값을 따름)"""
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    hinted = retry_after_s(error) if error is not None else None
+    if hinted is not None:
+        delay = max(delay, min(cap, hinted))
+    return delay
+
+
+class CircuitBreaker:
+    """연속 일시 오류 기반 circuit breaker (closed -> open -> half_open -> closed)"""
+
+    def __init__(self, name: str, threshold: int = LLM_BREAKER_THRESHOLD, cooldown_s: float = LLM_BREAKER_COOLDOWN_S):
+        self.name = name
+        self.threshold = threshold
+        self.cooldown_s = cooldown_s
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.open_count = 0
+        self._probe_in_flight = False
+
+    def before_call(self, route: Optional[str] = None) -> bool:
+        """호출 허용 여부 확인 (막히면 LLMCircuitOpenError), 이 호출이 half-open probe이면 True"""
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.cooldown_s:
+                raise LLMCircuitOpenError(f"{self.name} circuit open (provider 장애로 호출 중단)", route, reason="circuit_open")
+            self.state = "half_open"
+            self._probe_in_flight = False
+        if self.state == "half_open":
+            # half-open에서는 probe 한 건만 통과
+            if self._probe_in_flight:
+                raise LLMCircuitOpenError(f"{self.name} circuit half-open (probe 진행 중)", route, reason="circuit_open")
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """결과 없이 끝난(취소된) probe의 자리를 반납해 다음 호출이 다시 probe가 되도록 함"""
+        if self.state == "half_open":
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        if self.state == "open":
+            # open 이전에 출발한 요청의 성공은 복구 신호로 보지 않음 (half-open probe로만 닫힘)
+            return
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self, error: LLMError) -> None:
+        if not isinstance(error, LLMTransientError) or isinstance(error, LLMCircuitOpenError):
+            # fatal 오류는 provider 상태와 무관하므로 breaker에 반영하지 않음
+            if self.state == "half_open":
+                self._probe_in_flight = False
+            return
+        self.consecutive_failures += 1
+        if self.state == "half_open" or self.consecutive_failures >= self.threshold:
+            if self.state != "open":
+                self.open_count += 1
+                print(f"[llm_resilience] {self.name} circuit open ({self.consecutive_failures}회 연속 실패)")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+            self._probe_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "open_count": self.open_count,
+        }
+
+
+class RetryMetrics:
+    """기능(feature)/route별 재시도와 실패 사유 집계"""
+
+    def __init__(self):
+        self.retries: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.failures: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    @staticmethod
+    def feature_of(route: Optional[str]) -> str:
+        """route 접두어가 기능 이름 (fgi.chunk_summary -> fgi, 접두어 없으면 single_analysis)"""
+        if not route or route == "default":
+            return "default"
+        return route.split(".", 1)[0] if "." in route else "single_analysis"
+
+    def record_retry(self, route: str, error: LLMError) -> None:
+        self.retries[route][error.reason] += 1
+
+    def record_failure(self, route: str, error: LLMError) -> None:
+        self.failures[route][error.reason] += 1
+
+    def summary(self) -> Dict[str, Any]:
+        by_feature: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for route, reasons in self.retries.items():
+            for reason, count in reasons.items():
+                by_feature[self.feature_of(route)][reason] += count
+        return {
+            "retries_by_feature": {k: dict(v) for k, v in by_feature.items()},
+            "retries_by_route": {k: dict(v) for k, v in self.retries.items()},
+            "failures_by_route": {k: dict(v) for k, v in self.failures.items()},
+        }
@@ -0,0 +1,156 @@
+from typing import Dict, Any, Optional
+from collections import deque
+from dataclasses import dataclass, field, asdict
+import json
+import os
+
+
+# 노드별 라우팅 설정 override (JSON 파일 경로, {"route명": {"model": ..., "timeout_s": ...}})
+LLM_ROUTES_PATH = os.getenv("LLM_ROUTES_PATH") or None
+# 관측 p95로 hedge 시점을 정할 때 필요한 최소 표본 수
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+DEFAULT_ROUTE = "default"
+
+
+@dataclass
+class LLMRoute:
+    """파이프라인 노드별 모델/타임아웃/재시도/hedge 설정"""
+    name: str
+    model: Optional[str] = None  # None이면 호출자가 넘긴 모델 사용
+    timeout_s: float = 60.0
+    max_retries: int = 2
+    p95_budget_ms: Optional[float] = None  # 이 시간을 넘기면 hedge 요청 발송 (None이면 관측 p95 사용)
+    hedge: bool = True
+    deadline_s: Optional[float] = None  # 재시도/백오프를 포함한 전체 호출 기한 (None이면 시도별 timeout만 적용)
+
+
+@dataclass
+class RouteStats:
+    """route별 지연 분포와 hedge/timeout/coalesced 집계"""
+    samples: deque = field(default_factory=lambda: deque(maxlen=512))
+    calls: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    hedges: int = 0
+    hedge_wins: int = 0
+    coalesced: int = 0  # 진행 중인 동일 요청에 합쳐져 provider로 나가지 않은 호출 수
+    prompt_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def observe_usage(self, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> None:
+        self.prompt_tokens += prompt_tokens
+        self.cached_prompt_tokens += cached_tokens
+        self.completion_tokens += completion_tokens
+
+    def observe(self, latency_ms: float) -> None:
+        self.samples.append(latency_ms)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * (len(ordered) - 1)))))
+        return ordered[index]
+
+    def summary(self) -> Dict[str, Any]:
+        def _round(value):
+            return round(value, 1) if value is not None else None
+        return {
+            "calls": self.calls,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "coalesced": self.coalesced,
+            "samples": len(self.samples),
+            "p50_ms": _round(self.percentile(0.5)),
+            "p95_ms": _round(self.percentile(0.95)),
+            "p99_ms": _round(self.percentile(0.99)),
+            "max_ms": _round(max(self.samples) if self.samples else None),
+            "prompt_tokens": self.prompt_tokens,
+            "cached_prompt_tokens": self.cached_prompt_tokens,
+            "uncached_prompt_tokens": self.prompt_tokens - self.cached_prompt_tokens,
+            "cached_ratio": round(self.cached_prompt_tokens / self.prompt_tokens, 3) if self.prompt_tokens else None,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+# 기본 라우팅 테이블 (모델은 기존 호출부 기본값 유지, 짧은 분류/검증 노드는 예산을 짧게)
+DEFAULT_ROUTES: Dict[str, LLMRoute] = {r.name: r for r in [
+    LLMRoute(DEFAULT_ROUTE),
+    # 단일 분석
+    LLMRoute("generate_hypothesis", timeout_s=60, p95_budget_ms=15000),
+    LLMRoute("decide_test_type", timeout_s=20, max_retries=2, p95_budget_ms=3000),
+    LLMRoute("decide_batch_test_types", timeout_s=90, max_retries=1, hedge=False),
+    LLMRoute("analyze_table", timeout_s=90, p95_budget_ms=25000),
+    LLMRoute("check_hallucination", timeout_s=45, p95_budget_ms=8000),
+    LLMRoute("revise_analysis", timeout_s=90, p95_budget_ms=25000),
+    LLMRoute("polish_sentence", timeout_s=60, p95_budget_ms=12000),
+    LLMRoute("fast_analysis", timeout_s=90, p95_budget_ms=25000),
+    # FGI / RAG
+    LLMRoute("fgi.chunk_summary", timeout_s=90, p95_budget_ms=20000),
+    LLMRoute("fgi.final_summary", timeout_s=180, max_retries=1, hedge=False),
+    LLMRoute("fgi.extract_subjects", timeout_s=60, p95_budget_ms=15000),
+    LLMRoute("rag.analyze_topic", timeout_s=90, p95_budget_ms=25000),
+    LLMRoute("rag.embedding", timeout_s=20, max_retries=2, hedge=False),
+    # FGI 그룹 비교
+    LLMRoute("group.topic_compare", model="gpt-4", timeout_s=120, p95_budget_ms=40000),
+    LLMRoute("group.final_comparison", model="gpt-4", timeout_s=180, max_retries=1, hedge=False),
+    # 설문 설계
+    LLMRoute("planner.intro", timeout_s=60, p95_budget_ms=15000),
+    LLMRoute("planner.audience", timeout_s=60, p95_budget_ms=15000),
+    LLMRoute("planner.structure", timeout_s=60, p95_budget_ms=15000),
+    LLMRoute("planner.questions", timeout_s=120, p95_budget_ms=30000),
+    LLMRoute("planner.analysis", timeout_s=60, p95_budget_ms=15000),
+    LLMRoute("planner.checklist", timeout_s=60, p95_budget_ms=15000),
+]}
+
+
+class LLMRouter:
+    """route 이름 -> 설정 조회와 route별 지연 기록"""
+
+    def __init__(self, routes: Optional[Dict[str, LLMRoute]] = None, overrides_path: Optional[str] = LLM_ROUTES_PATH):
+        self.routes: Dict[str, LLMRoute] = dict(routes or DEFAULT_ROUTES)
+        self.stats: Dict[str, RouteStats] = {}
+        if overrides_path:
+            self.load_overrides(overrides_path)
+
+    def load_overrides(self, path: str) -> None:
+        try:
+            with open(path, encoding="utf-8") as f:
+                overrides = json.load(f)
+        except Exception as e:
+            print(f"[llm_routing] 라우팅 설정 로드 실패 ({path}): {e}")
+            return
+        for name, values in overrides.items():
+            base = asdict(self.routes.get(name, LLMRoute(name)))
+            base.update({k: v for k, v in values.items() if k in base and k != "name"})
+            self.routes[name] = LLMRoute(**base)
+
+    def resolve(self, route: Optional[str]) -> LLMRoute:
+        name = route or DEFAULT_ROUTE
+        if name not in self.routes:
+            # 미등록 route는 default 설정을 이름만 바꿔 사용 (지연은 별도 집계)
+            self.routes[name] = LLMRoute(**{**asdict(self.routes[DEFAULT_ROUTE]), "name": name})
+        return self.routes[name]
+
+    def stats_for(self, route: LLMRoute) -> RouteStats:
+        return self.stats.setdefault(route.name, RouteStats())
+
+    def hedge_delay_s(self, route: LLMRoute) -> Optional[float]:
+        """hedge 요청을 보낼 시점 (설정 예산 우선, 없으면 충분한 표본의 관측 p95)"""
+        if not route.hedge:
+            return None
+        if route.p95_budget_ms:
+            return route.p95_budget_ms / 1000
+        stats = self.stats.get(route.name)
+        if stats and len(stats.samples) >= HEDGE_MIN_SAMPLES:
+            return stats.percentile(0.95) / 1000
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            name: {**self.stats_for(self.routes[name]).summary(), "model": self.routes[name].model}
+            for name in self.routes if name in self.stats
+        }
@@ -0,0 +1,59 @@
+from typing import Optional
+from functools import lru_cache
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """tiktoken 인코딩 (미설치 시 None)"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # 인코딩 파일을 받을 수 없는 환경(오프라인 등)에서는 근사치 사용
+        print(f"[tokens] tiktoken 인코딩 로드 실패, 근사치 사용: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken 없이 토큰 수 근사 (ASCII 4자당 1토큰, 한글 등 비ASCII는 1자당 1토큰)"""
+    if not text:
+        return 0
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def count_tokens(text: str, model: Optional[str] = "gpt-4o-mini") -> int:
+    """프롬프트 토큰 수 계산"""
+    if not text:
+        return 0
+    encoding = _get_encoding(model or "gpt-4o-mini")
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text))
+
+
+def count_message_tokens(messages: list, model: Optional[str] = "gpt-4o-mini") -> int:
+    """chat 메시지 목록의 토큰 수 (메시지당 오버헤드 4토큰 포함)"""
+    return sum(count_tokens(str(m.get("content", "")), model) + 4 for m in messages)
+
+
+def truncate_tokens(text: str, max_tokens: int, model: Optional[str] = "gpt-4o-mini") -> str:
+    """text를 max_tokens 이내로 자름 (tiktoken이 없으면 근사치 기준)"""
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    encoding = _get_encoding(model or "gpt-4o-mini")
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens])
+    # 근사치: 비율만큼 잘라낸 뒤 넘치면 조금씩 줄임
+    cut = int(len(text) * max_tokens / estimate_tokens(text))
+    while cut > 0 and estimate_tokens(text[:cut]) > max_tokens:
+        cut = int(cut * 0.9)
+    return text[:cut]
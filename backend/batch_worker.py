@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Survey AI 배치 분석 worker
+
+BATCH_QUEUE_BACKEND(sqlite/postgres/supabase) 큐에 등록된 배치 질문을 lease로 가져와 분석.
+웹 서버와 별도로 원하는 수만큼(supabase 큐는 여러 호스트에서도) 실행하며, 재시작 시 만료된 lease의 질문부터 이어서 처리.
+각 worker는 종료된 job을 마무리하는 coordinator도 함께 실행.
+"""
+
+import argparse
+import asyncio
+import signal
+from dotenv import load_dotenv
+
+# 환경변수 로드
+load_dotenv()
+
+from app.batch_analysis.application.job_coordinator import BatchJobCoordinator
+from app.batch_analysis.application.queue_worker import BatchQueueWorker, BATCH_WORKER_CONCURRENCY
+from app.batch_analysis.application.workflow import TableAnalysisWorkflow
+from app.batch_analysis.domain.services import BatchAnalysisService
+from app.batch_analysis.infra.batch_analysis_repository import BatchAnalysisRepository
+from app.batch_analysis.infra.work_queue import get_work_queue, BATCH_QUEUE_BACKEND
+
+
+async def main(args) -> None:
+    queue = get_work_queue()
+    if queue is None:
+        raise SystemExit("BATCH_QUEUE_BACKEND가 inline이면 worker가 필요 없습니다 (sqlite, postgres 또는 supabase로 설정).")
+    service = BatchAnalysisService(BatchAnalysisRepository(), TableAnalysisWorkflow())
+    worker = BatchQueueWorker(queue, service, worker_id=args.worker_id, concurrency=args.concurrency)
+
+    # SIGTERM/SIGINT 시 새 질문을 받지 않고 진행 중인 lease를 반납한 뒤 종료
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, stop.set)
+
+    print(f"🚀 Starting batch analysis worker ({BATCH_QUEUE_BACKEND} queue)")
+    tasks = [worker.run(stop)]
+    if not args.no_coordinator:
+        tasks.append(BatchJobCoordinator(queue, service).run(stop))
+    await asyncio.gather(*tasks)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="배치 분석 큐 worker")
+    parser.add_argument("--worker-id", default=None, help="lease 소유자 이름 (기본: 호스트:pid:임의값)")
+    parser.add_argument("--concurrency", type=int, default=BATCH_WORKER_CONCURRENCY, help="동시에 처리할 질문 수")
+    parser.add_argument("--no-coordinator", action="store_true", help="종료된 job 마무리 확인을 이 worker에서 하지 않음")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+단일 분석 파이프라인 변형별 품질/지연 오프라인 평가
+
+고정된 통계표 코퍼스를 TableAnalysisService 변형(fast 모드, 수정 횟수, 선형화 방식 등)으로 분석하고
+변형별 지연, 토큰 수, LLM 호출 수와 기준 변형 대비 인용 수치/그룹 일치도를 보고한다.
+LLM은 로컬 stand-in 서버(합성 또는 LLM_RECORD_PATH로 기록한 응답 재생)를 사용하므로 실제 토큰을 쓰지 않는다.
+
+사용 예:
+    # 합성 코퍼스 + 프로세스 내 stand-in 서버
+    python eval_analysis_modes.py --stub --variants full,fast,no_audit
+    # 기록된 응답 재생 + 실제 통계표
+    python eval_analysis_modes.py --stub --recordings recorded.jsonl --corpus tables/ --output eval.json
+    # 이미 떠 있는 stand-in 서버 사용
+    python eval_analysis_modes.py --base-url http://localhost:8100/v1 --corpus survey.xlsx
+"""
+
+from typing import List, Dict, Any, Optional, Set
+import argparse
+import asyncio
+import io
+import json
+import os
+import random
+import re
+import statistics
+import time
+
+import pandas as pd
+
+from app.single_analysis.domain.services import TableAnalysisService
+from app.single_analysis.domain.use_cases import TableAnalysisUseCase
+from app.single_analysis.domain.fact_checker import NumericFactChecker, NUMBER_PATTERN
+from app.single_analysis.infra.openai_client import OpenAIClient
+from app.single_analysis.infra.excel_loader import ExcelLoader
+from app.single_analysis.infra.statistical_test import StatisticalTester
+from app.utils.llm_budget import LLMBudget
+import app.utils.llm_gateway as llm_gateway
+
+
+# 변형 이름 -> TableAnalysisService 생성 인자 / use case options (첫 번째 변형이 일치도 기준)
+VARIANTS: Dict[str, Dict[str, Any]] = {
+    "full": {"service": {}, "options": {}},
+    "row_wise": {"service": {"compact_table": False}, "options": {}},
+    "one_revision": {"service": {}, "options": {"max_revisions": 1}},
+    "no_audit": {"service": {}, "options": {"max_revisions": 0}},
+    "sequential_polish": {"service": {}, "options": {"speculative_polish": False}},
+    "fast": {"service": {}, "options": {"analysis_mode": "fast"}},
+}
+
+SYNTHETIC_GROUPS = {
+    "성별": ["남자", "여자"],
+    "연령": ["20대", "30대", "40대", "50대 이상"],
+    "지역": ["수도권", "충청권", "영남권", "호남권"],
+    "직업": ["사무직", "생산직", "자영업", "학생", "기타"],
+}
+SYNTHETIC_QUESTIONS = [
+    ("매우 만족", "만족", "보통", "불만족", "매우 불만족", "평균"),
+    ("있다", "없다"),
+    ("1순위", "2순위", "3순위"),
+    ("매우 관심있다", "관심있다", "보통", "관심없다", "전혀 관심없다", "평균"),
+]
+
+
+def build_synthetic_workbook(questions: int = 8, seed: int = 7) -> bytes:
+    """ExcelLoader가 읽는 통계표 시트 형식의 고정 합성 코퍼스 (seed가 같으면 항상 같은 표)"""
+    rng = random.Random(seed)
+    rows: List[List[Any]] = []
+    for q in range(questions):
+        options = SYNTHETIC_QUESTIONS[q % len(SYNTHETIC_QUESTIONS)]
+        rows.append([f"A{q + 1}. 합성 질문 {q + 1}에 대한 응답"])
+        rows.append([None, None, None] + [None] * len(options))
+        rows.append([None, None, "사례수"] + list(options))
+        rows.append(["전체", "전체", 1000] + _synthetic_shares(rng, options))
+        for group, subs in SYNTHETIC_GROUPS.items():
+            for i, sub in enumerate(subs):
+                rows.append([group if i == 0 else None, sub, rng.randint(80, 400)] + _synthetic_shares(rng, options))
+        rows.append(["* 단위 : %"])
+    width = max(len(r) for r in rows)
+    df = pd.DataFrame([r + [None] * (width - len(r)) for r in rows])
+    buffer = io.BytesIO()
+    with pd.ExcelWriter(buffer, engine="openpyxl") as writer:
+        df.to_excel(writer, sheet_name="통계표", header=False, index=False)
+    return buffer.getvalue()
+
+
+def _synthetic_shares(rng: random.Random, options) -> List[float]:
+    shares = [rng.uniform(1, 10) for o in options if o != "평균"]
+    total = sum(shares)
+    values = [round(s / total * 100, 1) for s in shares]
+    if "평균" in options:
+        values.append(round(rng.uniform(2.0, 4.5), 2))
+    return values
+
+
+def load_corpus(paths: List[str], synthetic_questions: int, seed: int) -> List[Dict[str, Any]]:
+    """[{name, content}] (경로가 없으면 합성 코퍼스 한 개)"""
+    files: List[str] = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(os.path.join(path, f) for f in sorted(os.listdir(path)) if f.endswith((".xlsx", ".xls")))
+        else:
+            files.append(path)
+    if not files:
+        return [{"name": f"synthetic_seed{seed}.xlsx", "content": build_synthetic_workbook(synthetic_questions, seed)}]
+    corpus = []
+    for file in files:
+        with open(file, "rb") as f:
+            corpus.append({"name": os.path.basename(file), "content": f.read()})
+    return corpus
+
+
+def cited_facts(text: str, table: Optional[pd.DataFrame], checker: NumericFactChecker) -> Dict[str, Set[str]]:
+    """요약 문장에 인용된 수치와 그룹 라벨"""
+    text = text or ""
+    labels = checker._group_labels(table)
+    normalized = checker._norm(text)
+    groups = {label for label in labels if len(label) >= 2 and label in normalized}
+    return {"numbers": set(re.findall(NUMBER_PATTERN, text)), "groups": groups}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> Optional[float]:
+    if not a and not b:
+        return None
+    return len(a & b) / len(a | b)
+
+
+def _mean(values: List[Optional[float]]) -> Optional[float]:
+    values = [v for v in values if v is not None]
+    return round(statistics.mean(values), 3) if values else None
+
+
+def _percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))], 2)
+
+
+async def run_variant(name: str, spec: Dict[str, Any], corpus: List[Dict[str, Any]], lang: str, max_questions: Optional[int]) -> List[Dict[str, Any]]:
+    """변형 하나로 코퍼스의 모든 질문을 순차 분석 (질문별 지연/토큰/호출 수/결과)"""
+    excel_loader = ExcelLoader()
+    service = TableAnalysisService(OpenAIClient(), excel_loader, StatisticalTester(), **spec.get("service", {}))
+    use_case = TableAnalysisUseCase(service)
+    runs = []
+    for workbook in corpus:
+        parsed = excel_loader.load_survey_tables(workbook["content"], workbook["name"])
+        keys = parsed["question_keys"][:max_questions] if max_questions else parsed["question_keys"]
+        for key in keys:
+            budget = LLMBudget(f"eval:{name}:{key}", max_tokens=0, max_seconds=0)
+            options = {
+                "analysis_type": True,
+                "selected_key": key,
+                "lang": lang,
+                # raw data 없이 표만으로 분석 (manual)
+                "use_statistical_test": False,
+                "budget": budget,
+                **spec.get("options", {}),
+            }
+            started = time.perf_counter()
+            result = await use_case.execute(workbook["content"], workbook["name"], options, use_statistical_test=False)
+            elapsed = time.perf_counter() - started
+            spend = budget.summary()
+            runs.append({
+                "workbook": workbook["name"],
+                "question_key": key,
+                "table": parsed["tables"].get(key),
+                "latency_s": round(elapsed, 3),
+                "llm_calls": sum(node["calls"] for node in spend["nodes"].values()),
+                "prompt_tokens": spend["prompt_tokens"],
+                "completion_tokens": spend["completion_tokens"],
+                "nodes": spend["nodes"],
+                "success": result.get("success", False),
+                "error": result.get("error"),
+                "result": result.get("result") or {},
+            })
+            print(f"[eval] {name} {workbook['name']}:{key} {elapsed:.2f}s, 호출 {runs[-1]['llm_calls']}회")
+    return runs
+
+
+def summarize(variants: Dict[str, List[Dict[str, Any]]], lang: str) -> Dict[str, Any]:
+    """변형별 지연/토큰/호출 수, 로컬 수치 검증 통과율, 기준 변형 대비 인용 수치/그룹 일치도"""
+    checker = NumericFactChecker()
+    baseline_name = next(iter(variants))
+    baseline = {(r["workbook"], r["question_key"]): r for r in variants[baseline_name]}
+    report = {"baseline": baseline_name, "variants": {}}
+    for name, runs in variants.items():
+        latencies = [r["latency_s"] for r in runs if r["success"]]
+        number_agreement, group_agreement, verdicts = [], [], []
+        for run in runs:
+            if not run["success"]:
+                continue
+            text = run["result"].get("polishing_result") or ""
+            check = checker.verify(text, run["table"], run["result"].get("ft_test_result"), lang)
+            verdicts.append(check.verdict)
+            base = baseline.get((run["workbook"], run["question_key"]))
+            if base is None or not base["success"]:
+                continue
+            facts = cited_facts(text, run["table"], checker)
+            base_facts = cited_facts(base["result"].get("polishing_result") or "", base["table"], checker)
+            number_agreement.append(jaccard(facts["numbers"], base_facts["numbers"]))
+            group_agreement.append(jaccard(facts["groups"], base_facts["groups"]))
+        report["variants"][name] = {
+            "questions": len(runs),
+            "errors": sum(1 for r in runs if not r["success"]),
+            "latency_p50_s": _percentile(latencies, 0.5),
+            "latency_p95_s": _percentile(latencies, 0.95),
+            "latency_total_s": round(sum(latencies), 2),
+            "mean_llm_calls": _mean([r["llm_calls"] for r in runs]),
+            "mean_prompt_tokens": _mean([r["prompt_tokens"] for r in runs]),
+            "mean_completion_tokens": _mean([r["completion_tokens"] for r in runs]),
+            "fact_check": {v: verdicts.count(v) for v in ("pass", "fail", "inconclusive")},
+            "number_agreement": _mean(number_agreement),
+            "group_agreement": _mean(group_agreement),
+        }
+    return report
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    columns = ["variant", "n", "err", "p50_s", "p95_s", "calls", "prompt_tok", "compl_tok", "fact pass/fail", "num_agree", "grp_agree"]
+    lines = []
+    for name, v in report["variants"].items():
+        lines.append([
+            name, v["questions"], v["errors"], v["latency_p50_s"], v["latency_p95_s"], v["mean_llm_calls"],
+            v["mean_prompt_tokens"], v["mean_completion_tokens"],
+            f"{v['fact_check']['pass']}/{v['fact_check']['fail']}", v["number_agreement"], v["group_agreement"],
+        ])
+    widths = [max(len(str(c)), *(len(str(line[i])) for line in lines)) for i, c in enumerate(columns)]
+    print(f"\n기준 변형: {report['baseline']}")
+    print("  ".join(str(c).ljust(w) for c, w in zip(columns, widths)))
+    for line in lines:
+        print("  ".join(str(c).ljust(w) for c, w in zip(line, widths)))
+
+
+async def start_stub(port: int, profile: Optional[str], recordings: Optional[str]):
+    """llm_stub_server 앱을 같은 이벤트 루프에서 실행"""
+    import uvicorn
+    from llm_stub_server import create_app, load_profile, load_recordings
+    server = uvicorn.Server(uvicorn.Config(create_app(load_profile(profile), load_recordings(recordings)), host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def main(args) -> None:
+    names = [v.strip() for v in args.variants.split(",") if v.strip()]
+    unknown = [v for v in names if v not in VARIANTS]
+    if unknown:
+        raise SystemExit(f"알 수 없는 변형: {unknown} (사용 가능: {', '.join(VARIANTS)})")
+
+    stub = None
+    base_url = args.base_url
+    if args.stub:
+        stub = await start_stub(args.stub_port, args.profile, args.recordings)
+        base_url = f"http://127.0.0.1:{args.stub_port}/v1"
+    if not base_url:
+        raise SystemExit("--stub 또는 --base-url(OPENAI_BASE_URL)이 필요합니다. 실제 API로는 평가하지 않습니다.")
+    # 변형 간 응답 공유를 막기 위해 single-flight 없이 새 gateway 사용
+    llm_gateway._gateway = llm_gateway.LLMGateway(base_url=base_url, record_path=None, single_flight=False)
+
+    try:
+        corpus = load_corpus(args.corpus, args.synthetic_questions, args.seed)
+        variants = {}
+        for name in names:
+            variants[name] = await run_variant(name, VARIANTS[name], corpus, args.lang, args.max_questions)
+        report = summarize(variants, args.lang)
+        report["corpus"] = [w["name"] for w in corpus]
+        report["gateway"] = llm_gateway.get_llm_gateway().metrics()
+        print_report(report)
+        if args.output:
+            report["runs"] = {
+                name: [{k: v for k, v in run.items() if k != "table"} for run in runs]
+                for name, runs in variants.items()
+            }
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+            print(f"결과 저장: {args.output}")
+    finally:
+        if stub is not None:
+            server, task = stub
+            server.should_exit = True
+            await task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="단일 분석 파이프라인 변형별 품질/지연 오프라인 평가")
+    parser.add_argument("--corpus", nargs="*", default=[], help="통계표 xlsx 파일 또는 디렉터리 (없으면 합성 코퍼스)")
+    parser.add_argument("--variants", default="full,fast,one_revision,no_audit", help=f"쉼표 구분 ({', '.join(VARIANTS)})")
+    parser.add_argument("--lang", default="한국어")
+    parser.add_argument("--max-questions", type=int, default=None, help="workbook당 평가할 질문 수")
+    parser.add_argument("--synthetic-questions", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--base-url", default=os.getenv("OPENAI_BASE_URL"))
+    parser.add_argument("--stub", action="store_true", help="llm_stub_server를 프로세스 내에서 실행")
+    parser.add_argument("--stub-port", type=int, default=int(os.getenv("LLM_STUB_PORT", "8100")))
+    parser.add_argument("--profile", default=os.getenv("LLM_STUB_PROFILE"))
+    parser.add_argument("--recordings", default=os.getenv("LLM_STUB_RECORDINGS"))
+    parser.add_argument("--output", default=None, help="상세 결과 JSON 경로")
+    asyncio.run(main(parser.parse_args()))
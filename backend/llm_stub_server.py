@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+OpenAI 호환 로컬 stand-in 서버 (chat completions / embeddings)
+
+실제 토큰을 쓰지 않고 파이프라인을 부하 테스트/벤치마크하기 위한 서버.
+- LLM_RECORD_PATH로 기록한 응답(JSONL)을 요청 키로 재생하고, 없으면 결정적 합성 응답을 반환
+- 지연 분포(fixed/uniform/normal/lognormal + 출력 토큰당/캐시되지 않은 입력 토큰당 지연), 오류율, 429 버스트를 프로파일로 설정
+- provider prefix cache를 흉내 내어 이전 요청과 공유하는 프롬프트 prefix를 usage.prompt_tokens_details.cached_tokens로 보고
+
+사용 예:
+    python llm_stub_server.py --port 8100 --recordings recorded.jsonl --profile profile.json
+    OPENAI_BASE_URL=http://localhost:8100/v1 python start_server.py
+
+프로파일(JSON) 예:
+    {
+        "seed": 7,
+        "chat_latency": {"distribution": "lognormal", "median_ms": 900, "sigma": 0.5, "per_output_token_ms": 6, "per_uncached_input_token_ms": 0.1},
+        "embedding_latency": {"distribution": "normal", "median_ms": 120, "sigma": 0.3},
+        "error_rate": 0.01,
+        "rate_limit_rate": 0.02,
+        "rate_limit_burst": {"every_s": 60, "length_s": 5},
+        "synthetic_output_tokens": 150,
+        "embedding_dim": 1536,
+        "prefix_cache": {"enabled": true, "min_tokens": 1024, "block_tokens": 128},
+        "rules": [{"contains": "요약", "response": "고정 응답"}]
+    }
+"""
+
+from typing import List, Dict, Any, Optional
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import time
+import uuid
+from collections import deque
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+import uvicorn
+
+from app.utils.llm_gateway import request_key
+from app.utils.tokens import count_tokens, count_message_tokens
+
+
+DEFAULT_PROFILE: Dict[str, Any] = {
+    "seed": None,
+    "chat_latency": {"distribution": "lognormal", "median_ms": 800, "sigma": 0.5, "per_output_token_ms": 5, "per_uncached_input_token_ms": 0.1},
+    "embedding_latency": {"distribution": "lognormal", "median_ms": 100, "sigma": 0.3, "per_output_token_ms": 0},
+    "error_rate": 0.0,
+    "rate_limit_rate": 0.0,
+    "rate_limit_burst": {"every_s": 0, "length_s": 0},
+    "synthetic_output_tokens": 120,
+    "embedding_dim": 1536,
+    # OpenAI 방식: 1024토큰 이상 공통 prefix를 128토큰 단위로 캐시
+    "prefix_cache": {"enabled": True, "min_tokens": 1024, "block_tokens": 128},
+    "rules": [],
+}
+
+# 파이프라인이 기대하는 출력 형식에 맞춘 기본 합성 규칙 (앞에서부터 매칭)
+BUILTIN_RULES: List[Dict[str, Any]] = [
+    {"all": ['"verdict"', '"polished"'], "response": json.dumps({
+        "analysis": "[stand-in] 주요 그룹에서 상대적으로 높은 경향 보였음.",
+        "verdict": "accept",
+        "issues": "",
+        "polished": "[stand-in] 주요 그룹에서 상대적으로 높은 경향이 확인됐음.",
+    }, ensure_ascii=False)},
+    {"all": ['"accept"', '"reject'], "response": "accept"},
+    {"all": ["manual", "ft_test", "chi_square", "JSON"], "response": "{}"},
+    {"all": ["manual", "ft_test", "chi_square"], "response": "ft_test"},
+    {"all": ["JSON"], "response": "{}"},
+]
+
+SYNTHETIC_SENTENCE = "합성 응답 문장입니다. 실제 모델 출력이 아닌 stand-in 서버의 결정적 텍스트입니다."
+
+
+class StubState:
+    """녹화 응답, 프로파일, 호출 통계"""
+
+    def __init__(self, profile: Dict[str, Any], recordings: Dict[str, Any]):
+        self.profile = profile
+        self.recordings = recordings
+        self.random = random.Random(profile.get("seed"))
+        self.started_at = time.monotonic()
+        self.prompt_history: deque = deque(maxlen=256)
+        self.stats: Dict[str, int] = {"chat": 0, "embedding": 0, "replayed": 0, "synthetic": 0, "errors": 0, "rate_limited": 0}
+
+
+def load_profile(path: Optional[str]) -> Dict[str, Any]:
+    profile = json.loads(json.dumps(DEFAULT_PROFILE))
+    if path:
+        with open(path, encoding="utf-8") as f:
+            for key, value in json.load(f).items():
+                if isinstance(value, dict) and isinstance(profile.get(key), dict):
+                    profile[key].update(value)
+                else:
+                    profile[key] = value
+    return profile
+
+
+def load_recordings(path: Optional[str]) -> Dict[str, Any]:
+    """LLMGateway가 기록한 JSONL (key -> response, 같은 키는 마지막 기록 사용)"""
+    recordings: Dict[str, Any] = {}
+    if not path or not os.path.exists(path):
+        return recordings
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                recordings[record["key"]] = record["response"]
+            except (json.JSONDecodeError, KeyError):
+                continue
+    return recordings
+
+
+def sample_latency_ms(rng: random.Random, spec: Dict[str, Any], output_tokens: int = 0, uncached_input_tokens: int = 0) -> float:
+    median = float(spec.get("median_ms", 0))
+    sigma = float(spec.get("sigma", 0))
+    distribution = spec.get("distribution", "fixed")
+    if distribution == "lognormal":
+        base = median * math.exp(rng.gauss(0, sigma)) if median > 0 else 0.0
+    elif distribution == "normal":
+        base = max(0.0, rng.gauss(median, median * sigma))
+    elif distribution == "uniform":
+        base = rng.uniform(median * (1 - sigma), median * (1 + sigma))
+    else:
+        base = median
+    return (
+        base
+        + float(spec.get("per_output_token_ms", 0)) * output_tokens
+        + float(spec.get("per_uncached_input_token_ms", 0)) * uncached_input_tokens
+    )
+
+
+def cached_prefix_tokens(state: "StubState", messages: List[Dict[str, Any]], model: str) -> int:
+    """최근 요청들과 공유하는 가장 긴 prefix의 토큰 수 (min_tokens 미만이면 0, block 단위 내림)"""
+    spec = state.profile.get("prefix_cache") or {}
+    prompt = "".join(f"{m.get('role')}:{m.get('content', '')}\n" for m in messages)
+    if not spec.get("enabled"):
+        return 0
+    longest = ""
+    for previous in state.prompt_history:
+        common = os.path.commonprefix([previous, prompt])
+        if len(common) > len(longest):
+            longest = common
+    state.prompt_history.append(prompt)
+    tokens = count_tokens(longest, model)
+    if tokens < int(spec.get("min_tokens", 1024)):
+        return 0
+    block = int(spec.get("block_tokens", 128))
+    return tokens // block * block
+
+
+def synthetic_chat(messages: List[Dict[str, Any]], profile: Dict[str, Any]) -> str:
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    for rule in list(profile.get("rules", [])) + BUILTIN_RULES:
+        needles = rule.get("all") or [rule.get("contains", "")]
+        if all(n and n in prompt for n in needles):
+            return rule["response"]
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:8]
+    target = int(profile.get("synthetic_output_tokens", 120))
+    text = f"[{digest}] "
+    while count_tokens(text) < target:
+        text += SYNTHETIC_SENTENCE + " "
+    return text.strip()
+
+
+def synthetic_embedding(text: str, dim: int) -> List[float]:
+    """텍스트 해시 기반 결정적 단위 벡터 (같은 입력이면 같은 벡터)"""
+    rng = random.Random(int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:16], 16))
+    vector = [rng.gauss(0, 1) for _ in range(dim)]
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+def error_response(state: StubState) -> Optional[JSONResponse]:
+    """429 버스트 구간 / 무작위 429 / 무작위 5xx"""
+    profile = state.profile
+    burst = profile.get("rate_limit_burst") or {}
+    every, length = float(burst.get("every_s", 0)), float(burst.get("length_s", 0))
+    in_burst = every > 0 and length > 0 and (time.monotonic() - state.started_at) % every < length
+    if in_burst or state.random.random() < float(profile.get("rate_limit_rate", 0)):
+        state.stats["rate_limited"] += 1
+        return JSONResponse(
+            status_code=429,
+            headers={"retry-after": "1"},
+            content={"error": {"message": "Rate limit reached (stand-in)", "type": "rate_limit_error", "code": "rate_limit_exceeded"}}
+        )
+    if state.random.random() < float(profile.get("error_rate", 0)):
+        state.stats["errors"] += 1
+        return JSONResponse(
+            status_code=500,
+            content={"error": {"message": "Internal server error (stand-in)", "type": "server_error", "code": None}}
+        )
+    return None
+
+
+def create_app(profile: Dict[str, Any], recordings: Dict[str, Any]) -> FastAPI:
+    app = FastAPI(title="LLM stand-in")
+    state = StubState(profile, recordings)
+    app.state.stub = state
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "gpt-4o-mini")
+        messages = body.get("messages", [])
+        state.stats["chat"] += 1
+
+        # gateway는 system 외 메시지를 user로 보내므로 같은 형태로 키 계산
+        key_messages = [{"role": m.get("role"), "content": m.get("content")} for m in messages]
+        content = state.recordings.get(request_key("chat", model, key_messages))
+        if content is not None:
+            state.stats["replayed"] += 1
+        else:
+            state.stats["synthetic"] += 1
+            content = synthetic_chat(messages, state.profile)
+
+        prompt_tokens = count_message_tokens(messages, model)
+        cached_tokens = min(prompt_tokens, cached_prefix_tokens(state, messages, model))
+        completion_tokens = count_tokens(content, model)
+        latency_ms = sample_latency_ms(state.random, state.profile["chat_latency"], completion_tokens, prompt_tokens - cached_tokens)
+        await asyncio.sleep(latency_ms / 1000)
+        error = error_response(state)
+        if error is not None:
+            return error
+        return {
+            "id": f"chatcmpl-stub-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens},
+            },
+        }
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        model = body.get("model", "text-embedding-3-small")
+        inputs = body.get("input", "")
+        inputs = inputs if isinstance(inputs, list) else [inputs]
+        state.stats["embedding"] += 1
+
+        data = []
+        for index, text in enumerate(inputs):
+            vector = state.recordings.get(request_key("embedding", model, text))
+            if vector is not None:
+                state.stats["replayed"] += 1
+            else:
+                state.stats["synthetic"] += 1
+                vector = synthetic_embedding(str(text), int(state.profile.get("embedding_dim", 1536)))
+            data.append({"object": "embedding", "index": index, "embedding": vector})
+
+        await asyncio.sleep(sample_latency_ms(state.random, state.profile["embedding_latency"]) / 1000)
+        error = error_response(state)
+        if error is not None:
+            return error
+        prompt_tokens = sum(count_tokens(str(t), model) for t in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": model,
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens},
+        }
+
+    @app.get("/stats")
+    async def stats():
+        return {"stats": state.stats, "recordings": len(state.recordings), "profile": state.profile}
+
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="OpenAI 호환 로컬 stand-in 서버")
+    parser.add_argument("--host", default=os.getenv("LLM_STUB_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("LLM_STUB_PORT", "8100")))
+    parser.add_argument("--recordings", default=os.getenv("LLM_STUB_RECORDINGS"))
+    parser.add_argument("--profile", default=os.getenv("LLM_STUB_PROFILE"))
+    args = parser.parse_args()
+
+    stub_app = create_app(load_profile(args.profile), load_recordings(args.recordings))
+    print(f"🧪 LLM stand-in: http://{args.host}:{args.port}/v1 (OPENAI_BASE_URL로 지정)")
+    uvicorn.run(stub_app, host=args.host, port=args.port, log_level="warning")
@@ -18,6 +18,9 @@ from app.fgi_rag.api.router import router as fgi_rag_router
 from app.fgi_rag.api.ws_router import ws_router as fgi_subject_ws_router
 from app.fgi_group_analysis.api.group_analysis_router import router as fgi_group_analysis_router
 from app.fgi_group_analysis.api.ws_router import ws_router as fgi_group_analysis_ws_router
+from app.single_analysis.api.ws_router import ws_router as table_analysis_ws_router
+from app.batch_analysis.api.ws_router import ws_router as batch_analysis_ws_router
+from app.utils.llm_gateway import get_llm_gateway
 
 app = FastAPI(title="Survey AI Backend", version="1.0.0")
 # CORS 설정
@@ -42,6 +45,8 @@ app.include_router(fgi_ws_router)
 app.include_router(planner_ws_router)
 app.include_router(fgi_subject_ws_router)
 app.include_router(fgi_group_analysis_ws_router)
+app.include_router(table_analysis_ws_router)
+app.include_router(batch_analysis_ws_router)
 
 @app.get("/")
 async def root():
@@ -51,6 +56,11 @@ async def root():
 async def health_check():
     return {"status": "healthy", "architecture": "feature-sliced-clean-architecture"}
 
+@app.get("/health/llm")
+async def llm_health_check():
+    """LLM route별 지연 분포(p50/p95/p99), hedge/timeout 집계"""
+    return get_llm_gateway().metrics()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000) 
\ No newline at end of file
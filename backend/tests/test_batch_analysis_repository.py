@@ -0,0 +1,151 @@
+import asyncio
+
+from app.batch_analysis.infra.batch_analysis_repository import BatchAnalysisRepository
+
+
+class _Response:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    """테스트에 필요한 만큼만 흉내 낸 PostgREST 쿼리 빌더"""
+
+    def __init__(self, store, table):
+        self.store = store
+        self.rows = store.tables.setdefault(table, [])
+        self.op = "select"
+        self.filters = []
+        self.window = None
+
+    def select(self, columns):
+        self.op = "select"
+        return self
+
+    def update(self, data):
+        self.op, self.data = "update", data
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        # PostgREST bulk upsert는 모든 행의 키 구성이 같아야 함
+        if len({tuple(sorted(row)) for row in rows}) > 1:
+            raise ValueError("All object keys must match")
+        self.op, self.data = "upsert", rows
+        return self
+
+    def eq(self, key, value):
+        self.filters.append(lambda row: row.get(key) == value)
+        return self
+
+    @property
+    def not_(self):
+        self.negate = True
+        return self
+
+    def is_(self, key, value):
+        negate, self.negate = getattr(self, "negate", False), False
+        self.filters.append(lambda row: (row.get(key) is None) != negate)
+        return self
+
+    def gte(self, key, value):
+        self.filters.append(lambda row: row.get(key) is not None and row[key] >= value)
+        return self
+
+    def order(self, key):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end)
+        return self
+
+    def execute(self):
+        self.store.calls += 1
+        if self.op == "upsert":
+            for data in self.data:
+                row = next((r for r in self.rows if r["job_id"] == data["job_id"] and r["question_key"] == data["question_key"]), None)
+                if row is None:
+                    self.rows.append(dict(data))
+                else:
+                    row.update(data)
+            return _Response(self.data)
+        matched = [row for row in self.rows if all(f(row) for f in self.filters)]
+        if self.op == "update":
+            for row in matched:
+                row.update(self.data)
+        if self.window is not None:
+            matched = matched[self.window[0]:self.window[1] + 1]
+        return _Response([dict(row) for row in matched])
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.tables = {}
+        self.calls = 0
+
+    def table(self, name):
+        return _Query(self, name)
+
+
+def _repository(supabase) -> BatchAnalysisRepository:
+    repository = BatchAnalysisRepository.__new__(BatchAnalysisRepository)
+    repository.supabase = supabase
+    return repository
+
+
+def test_upsert_results_keeps_existing_values_for_none_fields():
+    supabase = FakeSupabase()
+    supabase.tables["batch_analysis_results"] = [
+        {"job_id": "job-1", "question_key": "q1", "status": "running", "question": "Q1 문항", "error": None},
+        {"job_id": "job-1", "question_key": "q2", "status": "running", "question": "Q2 문항", "error": None},
+    ]
+    repository = _repository(supabase)
+
+    asyncio.run(repository.upsert_results("job-1", [
+        {"question_key": "q1", "status": "done", "result": {"ok": True}, "error": None, "question": None},
+        {"question_key": "q2", "status": "error", "result": None, "error": "boom", "question": None},
+    ]))
+
+    rows = {row["question_key"]: row for row in supabase.tables["batch_analysis_results"]}
+    assert rows["q1"]["status"] == "done" and rows["q1"]["result"] == {"ok": True}
+    assert rows["q1"]["question"] == "Q1 문항"
+    assert rows["q2"]["status"] == "error" and rows["q2"]["error"] == "boom"
+    assert rows["q2"]["question"] == "Q2 문항"
+    assert "result" not in rows["q2"]
+
+
+def test_get_result_status_map_reads_every_page():
+    supabase = FakeSupabase()
+    supabase.tables["batch_analysis_results"] = [
+        {"job_id": "job-1", "question_key": f"q{i:02d}", "status": "done" if i % 2 else "pending"} for i in range(25)
+    ] + [{"job_id": "job-2", "question_key": "q00", "status": "done"}]
+    repository = _repository(supabase)
+
+    status_map = asyncio.run(repository.get_result_status_map("job-1", page_size=10))
+
+    assert len(status_map) == 25
+    assert status_map["q24"] == "pending" and status_map["q01"] == "done"
+    assert supabase.calls == 3
+
+
+def test_progress_queries_read_every_page():
+    supabase = FakeSupabase()
+    supabase.tables["batch_analysis_results"] = [
+        {
+            "job_id": "job-1",
+            "question_key": f"q{i:02d}",
+            "status": "done" if i % 3 else "running",
+            "error": None,
+            "result": {"i": i} if i % 3 else None,
+            "updated_at": f"2026-01-01T00:00:{i:02d}+00:00",
+        }
+        for i in range(25)
+    ]
+    repository = _repository(supabase)
+
+    states = asyncio.run(repository.get_result_states("job-1", page_size=10))
+    changed = asyncio.run(repository.get_results_changed_since("job-1", None, page_size=4))
+    since = asyncio.run(repository.get_results_changed_since("job-1", "2026-01-01T00:00:20+00:00", page_size=2))
+
+    assert len(states) == 25
+    assert [row["question_key"] for row in changed] == [f"q{i:02d}" for i in range(25) if i % 3]
+    assert [row["question_key"] for row in since] == ["q20", "q22", "q23"]
@@ -0,0 +1,76 @@
+import pandas as pd
+
+from app.single_analysis.domain.fact_checker import NumericFactChecker
+
+
+def _table():
+    return pd.DataFrame({
+        "대분류": ["전체", "성별", "성별", "연령", "연령"],
+        "소분류": ["", "남성", "여성", "20대", "30대"],
+        "사례수": [1000, 480, 520, 400, 600],
+        "만족": [45.2, 52.3, 38.7, 44.0, 46.1],
+        "불만족": [54.8, 47.7, 61.3, 56.0, 53.9],
+    })
+
+
+def _records():
+    return [
+        {"대분류": "성별", "t-value": 3.21, "p-value": 0.001, "유의성": "***"},
+        {"대분류": "연령", "t-value": 0.42, "p-value": 0.67, "유의성": ""},
+    ]
+
+
+def test_group_numbers_verified_pass():
+    draft = "남성의 만족 비율은 52.3%로 여성(38.7%)보다 높았음. 성별에 따라 만족도 차이가 유의하였음."
+    result = NumericFactChecker().verify(draft, _table(), _records())
+    assert result.verdict == "pass", result.mismatches
+    assert result.numbers_verified == result.numbers_checked == 2
+
+
+def test_planted_number_fails():
+    draft = "남성의 만족 비율은 57.9%로 여성보다 높았음. 성별 차이가 유의하였음."
+    result = NumericFactChecker().verify(draft, _table(), _records())
+    assert result.verdict == "fail"
+    assert any("57.9" in m for m in result.mismatches)
+
+
+def test_number_from_other_group_fails():
+    # 52.3은 남성 값인데 여성 값으로 언급
+    draft = "여성의 만족 비율은 52.3%로 가장 높았음. 성별 차이가 유의하였음."
+    result = NumericFactChecker().verify(draft, _table(), _records())
+    assert result.verdict == "fail"
+
+
+def test_planted_integer_not_matched_by_pairwise_difference():
+    # 14는 남성-여성 만족 차이(13.6)에 가깝지만 일반 수치로 언급되면 확인되지 않아야 함
+    draft = "만족 응답은 14%에 불과했음."
+    result = NumericFactChecker().verify(draft, _table(), _records())
+    assert result.verdict == "fail"
+
+
+def test_non_significant_group_fails():
+    draft = "20대의 만족 비율은 44.0%였음. 성별 차이도 유의하였음."
+    result = NumericFactChecker().verify(draft, _table(), _records())
+    assert result.verdict == "fail"
+
+
+def test_unbound_or_dated_numbers_are_inconclusive():
+    draft = "2023년 조사에서 만족 응답이 52.3%로 나타났음."
+    result = NumericFactChecker().verify(draft, _table(), None)
+    assert result.verdict == "inconclusive"
+    assert not result.mismatches
+
+
+def test_difference_between_cited_groups():
+    draft = "남성과 여성의 만족 비율은 13.6%p 차이가 났으며 성별 차이가 유의하였음."
+    result = NumericFactChecker().verify(draft, _table(), _records())
+    assert result.verdict == "pass", result.mismatches
+
+
+def test_group_only_draft_without_numbers_is_inconclusive():
+    # 수치 없이 유의한 그룹의 비교만 서술한 초안은 방향을 확인할 수 없으므로 LLM 감사로 넘김
+    draft = "여성이 남성보다 만족 비율이 상대적으로 더 높은 경향을 보였음. 성별에 따른 차이가 유의하였음."
+    result = NumericFactChecker().verify(draft, _table(), _records())
+    assert result.verdict == "inconclusive"
+    assert result.numbers_checked == 0
+    assert not result.mismatches
@@ -0,0 +1,117 @@
+import asyncio
+
+from app.utils.llm_gateway import LLMGateway
+from app.utils.llm_routing import LLMRouter, LLMRoute
+
+
+def _gateway(route: LLMRoute) -> LLMGateway:
+    return LLMGateway(base_url="http://stand-in/v1", router=LLMRouter(routes={"default": route, route.name: route}, overrides_path=None))
+
+
+def test_hedged_cancels_primary_when_caller_cancelled_before_hedge():
+    route = LLMRoute("hedge_test", p95_budget_ms=5000)
+    gateway = _gateway(route)
+    started = []
+
+    async def factory():
+        task = asyncio.current_task()
+        started.append(task)
+        await asyncio.sleep(10)
+        return "late"
+
+    async def main():
+        call = asyncio.ensure_future(gateway._hedged(factory, route))
+        await asyncio.sleep(0.1)
+        call.cancel()
+        await asyncio.gather(call, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        # asyncio.run 종료 시 정리되기 전에 확인
+        return [task.cancelled() for task in started]
+
+    assert asyncio.run(main()) == [True]
+
+
+def test_hedged_cancels_loser_after_backup_wins():
+    route = LLMRoute("hedge_test", p95_budget_ms=50)
+    gateway = _gateway(route)
+    started = []
+
+    async def factory():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10 if len(started) == 1 else 0.01)
+        return len(started)
+
+    async def main():
+        result = await gateway._hedged(factory, route)
+        await asyncio.sleep(0.01)
+        return result, started[0].cancelled()
+
+    assert asyncio.run(main()) == (2, True)
+    assert gateway.router.stats_for(route).hedge_wins == 1
+
+
+def test_cancelled_half_open_probe_does_not_lock_breaker():
+    route = LLMRoute("breaker_test", max_retries=0, hedge=False)
+    gateway = _gateway(route)
+    breaker = gateway.breakers["chat"]
+    breaker.cooldown_s = 0
+    breaker.state = "open"
+    breaker.opened_at = 0
+
+    async def slow():
+        await asyncio.sleep(10)
+
+    async def ok():
+        return "ok"
+
+    async def main():
+        probe = asyncio.ensure_future(gateway._call_route(route, slow))
+        await asyncio.sleep(0.05)
+        assert breaker.state == "half_open"
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        return await gateway._call_route(route, ok)
+
+    assert asyncio.run(main()) == "ok"
+    assert breaker.state == "closed"
+
+
+def test_conflict_is_not_transient():
+    from app.utils.llm_resilience import error_for_status, LLMFatalError
+
+    assert isinstance(error_for_status(409, "conflict"), LLMFatalError)
+
+
+def test_hedge_backup_takes_its_own_limiter_slot(monkeypatch):
+    import app.utils.llm_limiter as llm_limiter
+
+    route = LLMRoute("hedge_test", p95_budget_ms=50)
+    gateway = _gateway(route)
+    started = []
+
+    async def factory():
+        started.append(asyncio.current_task())
+        await asyncio.sleep(10 if len(started) == 1 else 0.1)
+        return len(started)
+
+    async def main(slots):
+        semaphore = asyncio.Semaphore(slots)
+        monkeypatch.setattr(llm_limiter, "_semaphore", semaphore)
+        # 호출자(_call_route)가 잡은 슬롯
+        await semaphore.acquire()
+        call = asyncio.ensure_future(gateway._hedged(factory, route))
+        await asyncio.sleep(0.08)
+        in_use = slots - semaphore._value
+        if len(started) < 2:
+            call.cancel()
+            await asyncio.gather(call, return_exceptions=True)
+            return len(started), in_use, None
+        result = await call
+        await asyncio.sleep(0)
+        return len(started), in_use, semaphore._value
+
+    # 슬롯이 남아 있으면 backup이 슬롯 하나를 더 쓰고 끝나면 반납
+    assert asyncio.run(main(2)) == (2, 2, 1)
+    started.clear()
+    # 남은 슬롯이 없으면 hedge를 보내지 않음
+    assert asyncio.run(main(1)) == (1, 1, None)
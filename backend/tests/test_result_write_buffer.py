@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+from app.batch_analysis.infra.result_write_buffer import ResultWriteBuffer
+
+
+class FlakyRepository:
+    """처음 failures번의 기록은 실패하는 결과 저장소"""
+
+    def __init__(self, failures: int):
+        self.failures = failures
+        self.upserts = []
+
+    async def update_results_status_bulk(self, job_id, keys, status, lease_owner=None):
+        pass
+
+    async def upsert_results(self, job_id, rows, lease_owner=None):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RuntimeError("db down")
+        self.upserts.append(rows)
+
+
+def _buffer(repository) -> ResultWriteBuffer:
+    writes = ResultWriteBuffer(repository, "job-1", flush_interval_s=60)
+    writes.set_result("q1", "done", result={"ok": True})
+    return writes
+
+
+def test_close_retries_failed_final_flush():
+    repository = FlakyRepository(failures=2)
+    writes = _buffer(repository)
+
+    asyncio.run(writes.close(retries=3, backoff_s=0))
+
+    assert [row["question_key"] for rows in repository.upserts for row in rows] == ["q1"]
+
+
+def test_close_raises_when_final_flush_keeps_failing():
+    repository = FlakyRepository(failures=10)
+    writes = _buffer(repository)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(writes.close(retries=2, backoff_s=0))
+
+    assert repository.failures == 7
+    assert "q1" in writes._pending
@@ -0,0 +1,40 @@
+import asyncio
+import gc
+
+from app.single_analysis.domain.entities import AgentState
+from app.single_analysis.domain.services import TableAnalysisService
+
+
+def test_rejected_draft_retrieves_failed_polish_exception():
+    service = TableAnalysisService.__new__(TableAnalysisService)
+
+    async def failing_polish(draft, lang):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            # 취소 도중 정리 단계에서 다른 예외로 끝나는 경우
+            raise RuntimeError("polish cleanup boom")
+
+    async def reject(state, on_step=None):
+        await asyncio.sleep(0.01)
+        state.hallucination_check = "reject"
+        return state
+
+    service._polish_text = failing_polish
+    service.check_hallucination = reject
+    unretrieved = []
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        loop.set_exception_handler(lambda _loop, ctx: unretrieved.append(ctx))
+        state = AgentState(table_analysis="초안", lang="한국어")
+        state = await service.check_hallucination_with_speculative_polish(state)
+        await asyncio.sleep(0.01)
+        gc.collect()
+        await asyncio.sleep(0)
+        return state
+
+    state = asyncio.run(main())
+    gc.collect()
+    assert state.speculative_polish == "cancelled"
+    assert unretrieved == []
@@ -0,0 +1,39 @@
+-- 배치 분석 결과 일괄 기록 지원
+-- 코드에서 이미 사용하는 question 컬럼
+ALTER TABLE batch_analysis_results ADD COLUMN IF NOT EXISTS question TEXT;
+
+-- upsert(on_conflict = job_id, question_key)를 위한 unique index
+-- 기존 중복 행은 (완료된 결과 > 최근 updated_at > 최근 created_at > id) 순으로 한 행만 남기고,
+-- 나머지는 지우기 전에 batch_analysis_results_duplicates로 옮겨 둠
+CREATE TABLE IF NOT EXISTS batch_analysis_results_duplicates (LIKE batch_analysis_results INCLUDING DEFAULTS);
+ALTER TABLE batch_analysis_results_duplicates ADD COLUMN IF NOT EXISTS archived_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+ALTER TABLE batch_analysis_results_duplicates ENABLE ROW LEVEL SECURITY;
+
+DO $$
+DECLARE
+  archived INTEGER;
+BEGIN
+  WITH ranked AS (
+    SELECT id, ROW_NUMBER() OVER (
+      PARTITION BY job_id, question_key
+      ORDER BY (status = 'done' AND result IS NOT NULL) DESC,
+               updated_at DESC NULLS LAST,
+               created_at DESC NULLS LAST,
+               id DESC
+    ) AS rn
+    FROM batch_analysis_results
+  ),
+  removed AS (
+    DELETE FROM batch_analysis_results r
+    USING ranked
+    WHERE r.id = ranked.id AND ranked.rn > 1
+    RETURNING r.*
+  )
+  INSERT INTO batch_analysis_results_duplicates
+  SELECT removed.*, NOW() FROM removed;
+  GET DIAGNOSTICS archived = ROW_COUNT;
+  RAISE NOTICE 'batch_analysis_results: 중복 행 %건을 batch_analysis_results_duplicates로 옮김', archived;
+END $$;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_batch_analysis_results_job_question
+  ON batch_analysis_results(job_id, question_key);
@@ -0,0 +1,24 @@
+-- 여러 worker가 결과 테이블에서 직접 질문을 lease하기 위한 컬럼 (BATCH_QUEUE_BACKEND=supabase)
+ALTER TABLE batch_analysis_results ADD COLUMN IF NOT EXISTS lease_owner TEXT;
+ALTER TABLE batch_analysis_results ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP WITH TIME ZONE;
+ALTER TABLE batch_analysis_results ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+-- claim(pending 조회)과 만료 lease 회수(running + lease_expires_at) 조회용
+CREATE INDEX IF NOT EXISTS idx_batch_analysis_results_status_lease
+  ON batch_analysis_results(status, lease_expires_at);
+
+-- worker가 job을 다시 파싱할 수 있도록 보관하는 요청/입력 파일 (base64), 모든 질문이 끝나면 status = finished
+CREATE TABLE IF NOT EXISTS batch_analysis_job_inputs (
+  job_id UUID PRIMARY KEY REFERENCES batch_analysis_jobs(id) ON DELETE CASCADE,
+  request_data JSONB NOT NULL,
+  file_content TEXT,
+  raw_data_content TEXT,
+  status TEXT NOT NULL DEFAULT 'queued',
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_batch_analysis_job_inputs_status
+  ON batch_analysis_job_inputs(status, created_at);
+
+-- worker는 service key로 접근하므로 사용자 정책은 두지 않음
+ALTER TABLE batch_analysis_job_inputs ENABLE ROW LEVEL SECURITY;